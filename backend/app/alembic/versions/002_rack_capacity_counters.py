@@ -0,0 +1,54 @@
+"""Add denormalized capacity counters to racks
+
+Revision ID: 002_rack_capacity_counters
+Revises: 001_initial
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002_rack_capacity_counters"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "racks",
+        sa.Column("used_units", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "racks",
+        sa.Column("current_power_w", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Backfill from the existing placements
+    op.execute(
+        """
+        UPDATE racks SET
+            used_units = COALESCE((
+                SELECT SUM(devices.units_required)
+                FROM rack_placements
+                JOIN devices ON devices.id = rack_placements.device_id
+                WHERE rack_placements.rack_id = racks.id
+            ), 0),
+            current_power_w = COALESCE((
+                SELECT SUM(devices.power_w)
+                FROM rack_placements
+                JOIN devices ON devices.id = rack_placements.device_id
+                WHERE rack_placements.rack_id = racks.id
+            ), 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("racks") as batch_op:
+        batch_op.drop_column("current_power_w")
+        batch_op.drop_column("used_units")
@@ -0,0 +1,49 @@
+"""Index placement unit spans and forbid overlaps on Postgres
+
+Revision ID: 003_placement_span_index
+Revises: 002_rack_capacity_counters
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003_placement_span_index"
+down_revision: Union[str, None] = "002_rack_capacity_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_rack_placements_rack_span",
+        "rack_placements",
+        ["rack_id", "start_unit", "end_unit"],
+        unique=False,
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Two placements in the same rack may not share a unit, even when
+        # written by concurrent transactions
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute(
+            """
+            ALTER TABLE rack_placements
+            ADD CONSTRAINT ex_rack_placements_no_overlap
+            EXCLUDE USING gist (
+                rack_id WITH =,
+                int4range(start_unit, end_unit, '[]') WITH &&
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE rack_placements DROP CONSTRAINT ex_rack_placements_no_overlap"
+        )
+    op.drop_index("ix_rack_placements_rack_span", table_name="rack_placements")
@@ -0,0 +1,50 @@
+"""Add distribution_jobs table for background distribution runs
+
+Revision ID: 004_distribution_jobs
+Revises: 003_placement_span_index
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_distribution_jobs"
+down_revision: Union[str, None] = "003_placement_span_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "distribution_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False
+        ),
+        sa.Column("request", sa.JSON(), nullable=False),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column(
+            "error", sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_distribution_jobs_status"), "distribution_jobs", ["status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_distribution_jobs_status"), table_name="distribution_jobs"
+    )
+    op.drop_table("distribution_jobs")
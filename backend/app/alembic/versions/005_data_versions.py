@@ -0,0 +1,34 @@
+"""Add data_versions counters shared by all server and worker processes
+
+Revision ID: 005_data_versions
+Revises: 004_distribution_jobs
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_data_versions"
+down_revision: Union[str, None] = "004_distribution_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    data_versions = op.create_table(
+        "data_versions",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Seeded, so that bumping it is always a plain UPDATE
+    op.bulk_insert(data_versions, [{"name": "distribution", "version": 0}])
+
+
+def downgrade() -> None:
+    op.drop_table("data_versions")
@@ -0,0 +1,29 @@
+"""Add heartbeat_at to distribution_jobs to detect orphaned runs
+
+Revision ID: 006_distribution_job_heartbeat
+Revises: 005_data_versions
+Create Date: 2026-10-17
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_distribution_job_heartbeat"
+down_revision: Union[str, None] = "005_data_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "distribution_jobs",
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("distribution_jobs", "heartbeat_at")
@@ -0,0 +1,85 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol
+
+
+class CacheBackend(Protocol):
+    """
+    Storage for cached results.
+
+    Keys embed whatever version makes them stale, so a backend never has to
+    invalidate anything itself. ``LocalCache`` keeps entries in the process;
+    a shared implementation (for example Redis ``GET``/``SET EX``) lets all
+    server processes reuse each other's results.
+    """
+
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any, weight: int = 1) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry time to live.
+
+    Both the number of entries and their total ``weight`` (an approximate
+    size given by the caller) are bounded; an entry heavier than
+    ``max_weight`` on its own is not stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        max_weight: float = math.inf,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.max_weight = max_weight
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, weight, value), least recently used first
+        self._entries: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, value: Any, weight: int = 1) -> None:
+        if self.maxsize <= 0 or weight > self.max_weight:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, weight, value)
+            self.weight += weight
+            while len(self._entries) > self.maxsize or self.weight > self.max_weight:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def _remove(self, key: str) -> None:
+        self.weight -= self._entries.pop(key)[1]
@@ -13,6 +13,25 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str | None = None
     POSTGRES_DB: str | None = None
 
+    # Engine and connection pool tuning, applied to both the sync and async
+    # engine. Each worker process holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections per engine.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Processes used by POST /distribution/calculate-batch; 0 means one per CPU
+    DISTRIBUTION_WORKERS: int = 0
+    # In-process cache of /distribution/calculate results; size 0 disables it
+    DISTRIBUTION_CACHE_SIZE: int = 128
+    DISTRIBUTION_CACHE_TTL: float = 300.0
+    # Devices over all cached results (about 1 KB each); larger results are
+    # not cached
+    DISTRIBUTION_CACHE_MAX_DEVICES: int = 50_000
+
     @computed_field
     @property
     def DATABASE_URL(self) -> str:
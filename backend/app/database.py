@@ -1,21 +1,142 @@
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import Any, TypeVar
+
 from app.config import settings
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from tenacity import (Retrying, retry_if_exception, stop_after_attempt,
+                      wait_random_exponential)
+
+T = TypeVar("T")
+
+# Maximum number of bound parameters per IN (...) clause. Keeps batched
+# lookups well below the SQLite (32766) and Postgres (65535) parameter limits.
+IN_CLAUSE_CHUNK_SIZE = 1000
+
+# Attempts for a write transaction that lost a lock or serialization race
+TRANSACTION_RETRY_ATTEMPTS = 5
+# Postgres serialization_failure and deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+# Session.info key collecting the tables written in the current transaction
+_WRITTEN_TABLES_KEY = "written_tables"
+_write_listeners: list[Callable[[Session, set[str]], None]] = []
+
+
+class PoolStats:
+    """Cumulative checkout counters of one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+
+    def record(self, waited: bool, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+            if timed_out:
+                self.timeouts += 1
+
+
+class _InstrumentedPoolMixin:
+    """Counts checkouts and the ones that had to queue for a connection."""
+
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        # Nothing idle and no overflow headroom left: this checkout queues
+        waited = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(True, time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(waited, time.perf_counter() - start, timed_out=False)
+        return entry
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_metrics(pool: Pool) -> dict[str, Any]:
+    """Point-in-time pool usage plus the cumulative checkout counters."""
+    metrics: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # Negative while the pool has not grown to its full size yet
+        "overflow": max(pool.overflow(), 0),
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        metrics.update(
+            checkouts=stats.checkouts,
+            waits=stats.waits,
+            wait_seconds=round(stats.wait_seconds, 6),
+            timeouts=stats.timeouts,
+        )
+    return metrics
+
 
 db_url = str(settings.DATABASE_URL)
+# psycopg serves both engines; SQLite needs the aiosqlite driver for async
+async_db_url = db_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
 connect_args = {}
-engine_kwargs = {}
+engine_kwargs = {
+    "echo": settings.DB_ECHO,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    # Compiled SQL cache per engine; 0 disables it
+    "query_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+}
 
 if db_url.startswith("sqlite"):
     connect_args["check_same_thread"] = False
 else:
-    engine_kwargs["pool_size"] = 5
-    engine_kwargs["max_overflow"] = 10
     engine_kwargs["pool_pre_ping"] = True
 
 engine = create_engine(
     db_url,
     connect_args=connect_args,
-    echo=settings.DEBUG,
+    poolclass=InstrumentedQueuePool,
+    **engine_kwargs,
+)
+
+# Async engine for I/O-bound endpoints that should not occupy a threadpool
+# worker while waiting on the database. It keeps its own connection pool.
+async_engine = create_async_engine(
+    async_db_url,
+    poolclass=InstrumentedAsyncQueuePool,
     **engine_kwargs,
 )
 
@@ -27,3 +148,98 @@ def create_db_and_tables():
 def get_db():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+def chunked(values: Sequence[T], size: int = IN_CLAUSE_CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether ``error`` is a lock/serialization failure worth retrying."""
+    if not isinstance(error, OperationalError):
+        return False
+    if getattr(error.orig, "sqlstate", None) in RETRYABLE_SQLSTATES:
+        return True
+    # SQLite reports a busy write lock this way once its busy timeout expires
+    return "database is locked" in str(error.orig)
+
+
+def on_writes_before_commit(listener: Callable[[Session, set[str]], None]) -> None:
+    """
+    Call ``listener`` with the session and the names of the tables it wrote
+    to, just before each commit that wrote any. The listener runs inside the
+    transaction being committed, so whatever it writes commits (or fails)
+    together with the writes that triggered it.
+
+    Covers ORM flushes and DML statements run through a session
+    (``db.execute(insert(Device), ...)``); writes made on a bare connection
+    are not seen.
+    """
+    _write_listeners.append(listener)
+
+
+def uncommitted_writes(session: OrmSession) -> set[str]:
+    """Names of the tables written in the session's current transaction."""
+    session.flush()
+    return set(session.info.get(_WRITTEN_TABLES_KEY, ()))
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _track_flushed_tables(session: OrmSession, _flush_context: Any) -> None:
+    tables = session.info.setdefault(_WRITTEN_TABLES_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _track_dml_tables(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            state.session.info.setdefault(_WRITTEN_TABLES_KEY, set()).add(table.name)
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _notify_writes_before_commit(session: OrmSession) -> None:
+    # Pending changes would otherwise only be flushed after this hook
+    session.flush()
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if tables:
+        for listener in _write_listeners:
+            listener(session, tables)
+    # Writes of the listeners themselves are not reported again
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_rolled_back_writes(session: OrmSession) -> None:
+    # Only a real rollback; a released savepoint keeps the outer writes
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
+
+
+def run_with_retry(db: Session, operation: Callable[[], T]) -> T:
+    """
+    Run a write transaction, rolling back and retrying it on lock or
+    serialization failures with jittered exponential backoff.
+    """
+    for attempt in Retrying(
+        retry=retry_if_exception(is_retryable_error),
+        stop=stop_after_attempt(TRANSACTION_RETRY_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=0.01, max=0.5),
+        reraise=True,
+    ):
+        with attempt:
+            try:
+                return operation()
+            except OperationalError:
+                db.rollback()
+                raise
+    raise AssertionError("unreachable")
@@ -1,6 +1,12 @@
 from fastapi import HTTPException, status
 
 
+class BadRequestError(HTTPException):
+
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
 class NotFoundError(HTTPException):
 
     def __init__(self, detail: str = "Resource not found"):
@@ -1,7 +1,23 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from app.config import settings
-from app.routers import (device_router, distribution_router, placement_router,
-                         rack_router)
+from app.database import async_engine, engine, pool_metrics
+from app.routers import (device_router, distribution_router, export_router,
+                         placement_router, rack_router)
+from app.services import distribution_job_service, distribution_service
 from fastapi import APIRouter, FastAPI
+from sqlmodel import Session
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    with Session(engine) as db:
+        distribution_job_service.recover_jobs(db)
+    yield
+    distribution_job_service.cancel_queued_jobs()
+    distribution_service.shutdown_executor()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -9,6 +25,7 @@ app = FastAPI(
     description="REST API for managing data center racks and devices",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # API v1 router
@@ -17,6 +34,7 @@ api_v1_router.include_router(device_router.router)
 api_v1_router.include_router(rack_router.router)
 api_v1_router.include_router(placement_router.router)
 api_v1_router.include_router(distribution_router.router)
+api_v1_router.include_router(export_router.router)
 app.include_router(api_v1_router)
 
 
@@ -26,3 +44,18 @@ def health_check():
         "status": "healthy",
         "database": "connected",
     }
+
+
+@app.get("/api/v1/metrics", tags=["Health"])
+def metrics():
+    return {
+        "pools": {
+            "sync": pool_metrics(engine.pool),
+            "async": pool_metrics(async_engine.pool),
+        },
+        "pool_limits": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        },
+    }
@@ -1,11 +1,23 @@
 # Models package
 # Import all models to register them with SQLModel metadata
+from app.models.bulk import BulkImportResponse, BulkRowError
+from app.models.data_version import DataVersion
 from app.models.device import (Device, DeviceBase, DeviceCreate, DeviceRead,
                                DeviceUpdate)
-from app.models.distribution import (DeviceInDistribution, DistributionRequest,
-                                     DistributionResponse, RackDistribution,
-                                     UnplacedDevice)
-from app.models.placement import (PlacementCreate, PlacementRead,
+from app.models.distribution import (DeviceInDistribution, DeviceSelector,
+                                     DistributionApplyRequest,
+                                     DistributionApplyResponse,
+                                     DistributionBatchRequest,
+                                     DistributionBatchResponse,
+                                     DistributionRebalanceRequest,
+                                     DistributionRebalanceResponse,
+                                     DistributionRequest, DistributionResponse,
+                                     IdRange, RackDistribution, RackSelector,
+                                     RebalanceMove, UnplacedDevice)
+from app.models.distribution_job import (DistributionJob,
+                                         DistributionJobDetail,
+                                         DistributionJobRead)
+from app.models.placement import (FreeSlot, PlacementCreate, PlacementRead,
                                   PlacementReadWithDevice, RackPlacement)
 from app.models.rack import (Rack, RackBase, RackCreate, RackRead,
                              RackReadWithPower, RackUpdate)
@@ -31,10 +43,30 @@ __all__ = [
     "PlacementCreate",
     "PlacementRead",
     "PlacementReadWithDevice",
+    "FreeSlot",
     # Distribution models
     "DistributionRequest",
+    "IdRange",
+    "DeviceSelector",
+    "RackSelector",
     "DeviceInDistribution",
     "UnplacedDevice",
     "RackDistribution",
     "DistributionResponse",
+    "DistributionApplyRequest",
+    "DistributionApplyResponse",
+    "DistributionBatchRequest",
+    "DistributionBatchResponse",
+    "DistributionRebalanceRequest",
+    "RebalanceMove",
+    "DistributionRebalanceResponse",
+    # Distribution job models
+    "DistributionJob",
+    "DistributionJobRead",
+    "DistributionJobDetail",
+    # Data version counters
+    "DataVersion",
+    # Bulk import models
+    "BulkRowError",
+    "BulkImportResponse",
 ]
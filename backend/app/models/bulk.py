@@ -0,0 +1,16 @@
+from sqlmodel import Field, SQLModel
+
+
+class BulkRowError(SQLModel):
+
+    row: int = Field(description="1-based data row number in the uploaded file")
+    detail: str
+
+
+class BulkImportResponse(SQLModel):
+
+    created: int = 0
+    failed: int = 0
+    errors: list[BulkRowError] = Field(
+        default_factory=list, description="Per-row errors (first ones only)"
+    )
@@ -0,0 +1,44 @@
+import secrets
+
+from app.database import on_writes_before_commit
+from sqlalchemy import BigInteger, insert, update
+from sqlalchemy.orm import Session
+from sqlmodel import Field, SQLModel
+
+# Data version name -> tables whose writes give it a new value. Registered
+# with the models, so every process that writes through them keeps it current.
+VERSIONED_TABLES = {
+    "distribution": frozenset({"devices", "racks", "rack_placements"}),
+}
+
+
+class DataVersion(SQLModel, table=True):
+    __tablename__ = "data_versions"
+
+    name: str = Field(primary_key=True, max_length=50)
+    version: int = Field(default=0, sa_type=BigInteger)
+
+
+def _bump_versions(session: Session, tables: set[str]) -> None:
+    """
+    Give every version of the written tables a new value in the transaction
+    being committed, so it becomes visible to all processes exactly when
+    those writes do.
+
+    The value is random rather than incremented: a version written by a
+    transaction that is rolled back is then never written again, so results
+    keyed on it can never be mistaken for those of a later commit.
+    """
+    for name, versioned in VERSIONED_TABLES.items():
+        if versioned.isdisjoint(tables):
+            continue
+        version = secrets.randbits(63)
+        bumped = session.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=version)
+        ).rowcount
+        if not bumped:
+            # Databases created without the migration's seed row
+            session.execute(insert(DataVersion).values(name=name, version=version))
+
+
+on_writes_before_commit(_bump_versions)
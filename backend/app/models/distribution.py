@@ -1,10 +1,96 @@
+from typing import Literal
+
 from sqlmodel import Field, SQLModel
 
+DistributionStrategy = Literal[
+    "balanced", "first_fit", "best_fit", "worst_fit", "dot_product"
+]
+
+
+class IdRange(SQLModel):
+
+    first: int = Field(description="First id of the range")
+    last: int = Field(description="Last id of the range (inclusive)")
+
+
+class DeviceSelector(SQLModel):
+
+    unplaced: bool = Field(
+        default=False, description="Only devices not placed in any rack"
+    )
+    id_ranges: list[IdRange] | None = Field(
+        default=None, max_length=100, description="Ids in any of these ranges"
+    )
+    serial_prefix: str | None = Field(default=None, min_length=1, max_length=100)
+    min_power_w: int | None = Field(default=None, ge=0)
+    max_power_w: int | None = Field(default=None, ge=0)
+    min_units: int | None = Field(default=None, ge=0)
+    max_units: int | None = Field(default=None, ge=0)
+
+
+class RackSelector(SQLModel):
+
+    id_ranges: list[IdRange] | None = Field(
+        default=None, max_length=100, description="Ids in any of these ranges"
+    )
+    name_prefix: str | None = Field(default=None, min_length=1, max_length=255)
+    serial_prefix: str | None = Field(default=None, min_length=1, max_length=100)
+    with_free_capacity: bool = Field(
+        default=False,
+        description="Only racks with at least one free unit and some power "
+        "headroom left by their current placements",
+    )
+    min_free_units: int | None = Field(default=None, ge=0)
+    min_free_power_w: int | None = Field(default=None, ge=0)
+
 
 class DistributionRequest(SQLModel):
 
-    device_ids: list[int] = Field(description="List of device ids to distribute")
-    rack_ids: list[int] = Field(description="List of rack ids")
+    device_ids: list[int] | None = Field(
+        default=None, description="List of device ids to distribute"
+    )
+    device_selector: DeviceSelector | None = Field(
+        default=None,
+        description="Select the devices on the server instead of listing ids "
+        "(devices matching every given filter); exactly one of device_ids and "
+        "device_selector is required",
+    )
+    rack_ids: list[int] | None = Field(default=None, description="List of rack ids")
+    rack_selector: RackSelector | None = Field(
+        default=None,
+        description="Select the racks on the server instead of listing ids "
+        "(racks matching every given filter); exactly one of rack_ids and "
+        "rack_selector is required",
+    )
+    respect_placements: bool = Field(
+        default=False,
+        description="Seed racks from their current placements and assign "
+        "contiguous start units to every placed device",
+    )
+    strategy: DistributionStrategy = Field(
+        default="balanced",
+        description="balanced: largest power first into the least utilized "
+        "rack; first_fit / best_fit / worst_fit: largest first into the first "
+        "rack that fits / the tightest / the emptiest; dot_product: the rack "
+        "whose remaining units and power best match the device",
+    )
+    time_budget_ms: int = Field(
+        default=0,
+        ge=0,
+        le=60_000,
+        description="Improve the plan with local search for up to this long, "
+        "optimizing unplaced devices, then utilization spread; 0 keeps the "
+        "greedy plan. Ignored with respect_placements",
+    )
+
+
+class DistributionBatchRequest(SQLModel):
+
+    scenarios: list[DistributionRequest] = Field(
+        min_length=1,
+        max_length=500,
+        description="Distribution requests evaluated against the same data",
+    )
 
 
 class DeviceInDistribution(SQLModel):
@@ -13,6 +99,8 @@ class DeviceInDistribution(SQLModel):
     name: str
     power_w: int
     units_required: int
+    start_unit: int | None = Field(default=None, ge=1)
+    end_unit: int | None = None
 
 
 class UnplacedDevice(SQLModel):
@@ -41,3 +129,59 @@ class DistributionResponse(SQLModel):
     distribution: list[RackDistribution]
     unplaced_devices: list[UnplacedDevice]
     summary: dict = Field(default_factory=dict)
+
+
+class DistributionBatchResponse(SQLModel):
+
+    results: list[DistributionResponse]
+    summary: dict = Field(default_factory=dict)
+
+
+class DistributionApplyRequest(SQLModel):
+
+    distribution: list[RackDistribution] = Field(
+        description="Rack distribution of a plan calculated with respect_placements"
+    )
+
+
+class DistributionApplyResponse(SQLModel):
+
+    applied_placements: int
+    racks: int
+
+
+class DistributionRebalanceRequest(SQLModel):
+
+    rack_ids: list[int] | None = Field(
+        default=None, description="Racks to rebalance between; all racks when omitted"
+    )
+    target_spread_percent: float = Field(
+        default=10.0,
+        ge=0,
+        le=100,
+        description="Accepted gap between the most and the least utilized rack, "
+        "in utilization percentage points",
+    )
+    max_moves: int = Field(
+        default=1000, ge=1, le=100_000, description="Upper bound on planned moves"
+    )
+
+
+class RebalanceMove(SQLModel):
+
+    device_id: int
+    device_name: str
+    power_w: int
+    units_required: int
+    from_rack_id: int
+    to_rack_id: int
+    start_unit: int = Field(description="First unit in the target rack")
+    end_unit: int = Field(description="Last unit in the target rack")
+
+
+class DistributionRebalanceResponse(SQLModel):
+
+    moves: list[RebalanceMove] = Field(
+        description="Moves in the order they must be carried out"
+    )
+    summary: dict = Field(default_factory=dict)
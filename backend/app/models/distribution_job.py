@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+from typing import Literal
+
+from app.models.distribution import DistributionResponse
+from sqlalchemy import JSON, Column, DateTime, Text
+from sqlmodel import Field, SQLModel
+
+JobStatus = Literal["pending", "running", "succeeded", "failed", "cancelled"]
+FINISHED_JOB_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class DistributionJob(SQLModel, table=True):
+    __tablename__ = "distribution_jobs"
+
+    id: int | None = Field(default=None, primary_key=True)
+    status: str = Field(default="pending", max_length=20, index=True)
+    # DistributionRequest as submitted
+    request: dict = Field(sa_column=Column(JSON, nullable=False))
+    progress: float = Field(default=0.0, description="Share of devices considered")
+    cancel_requested: bool = Field(default=False)
+    # Encoded DistributionResponse, kept as JSON text until it is fetched
+    result: str | None = Field(default=None, sa_column=Column(Text))
+    error: str | None = Field(default=None, max_length=1000)
+    created_at: datetime = Field(
+        default_factory=utc_now, sa_type=DateTime(timezone=True)
+    )
+    started_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    finished_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+    # Renewed by the process running the job; a stale one means it died
+    heartbeat_at: datetime | None = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+
+
+class DistributionJobRead(SQLModel):
+    id: int
+    status: JobStatus
+    progress: float
+    cancel_requested: bool
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+
+class DistributionJobDetail(DistributionJobRead):
+
+    result: DistributionResponse | None = None
@@ -1,8 +1,14 @@
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class RackPlacement(SQLModel, table=True):
     __tablename__ = "rack_placements"
+    # Serves the unit-range overlap lookups. On Postgres, migration 003 also
+    # adds an exclusion constraint so overlapping spans cannot be committed.
+    __table_args__ = (
+        Index("ix_rack_placements_rack_span", "rack_id", "start_unit", "end_unit"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     rack_id: int = Field(foreign_key="racks.id", index=True)
@@ -28,3 +34,12 @@ class PlacementReadWithDevice(PlacementRead):
     device_name: str
     device_power_w: int
     device_units_required: int
+
+
+class FreeSlot(SQLModel):
+    rack_id: int
+    rack_name: str
+    start_unit: int = Field(description="First unit of the candidate position")
+    end_unit: int = Field(description="Last unit of the candidate position")
+    free_run_units: int = Field(description="Length of the free run it sits in")
+    available_power_w: int = Field(description="Rack power headroom")
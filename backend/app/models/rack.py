@@ -23,6 +23,10 @@ class Rack(RackBase, table=True):
     __tablename__ = "racks"
 
     id: int | None = Field(default=None, primary_key=True)
+    # Totals of the devices placed in the rack, maintained by the placement
+    # and device services (see rack_service.adjust_rack_usage)
+    used_units: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    current_power_w: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class RackCreate(RackBase):
@@ -0,0 +1,47 @@
+import argparse
+import logging
+import sys
+
+from app.database import engine
+from app.services import rack_service
+from sqlmodel import Session
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare rack used_units/current_power_w counters with the "
+        "stored placements and repair any drift."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only report drift; exit with status 1 when any is found",
+    )
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        drift = rack_service.reconcile_rack_usage(session, repair=not args.check)
+
+    for row in drift:
+        logger.warning(
+            "Rack %s: used_units %s (expected %s), current_power_w %s (expected %s)",
+            row["rack_id"],
+            row["used_units"],
+            row["expected_used_units"],
+            row["current_power_w"],
+            row["expected_current_power_w"],
+        )
+    if not drift:
+        logger.info("Rack usage counters match placements")
+    elif args.check:
+        return 1
+    else:
+        logger.info("Repaired %d rack(s)", len(drift))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import pydantic_core
+from fastapi import Response
+from sqlmodel import SQLModel
+
+
+def read_columns(table: type[SQLModel], read_model: type[SQLModel]) -> tuple[Any, ...]:
+    """Columns of ``table`` backing the fields of ``read_model``, in field order."""
+    return tuple(getattr(table, name) for name in read_model.model_fields)
+
+
+def json_response(
+    items: Sequence[Mapping[str, Any]], headers: Mapping[str, str] | None = None
+) -> Response:
+    """
+    Encode plain row dicts straight to a JSON response.
+
+    Returning a Response skips FastAPI's response_model validation and
+    serialization pass; the endpoint's response_model still documents the
+    shape, so callers must build the dicts from columns projected for it.
+    """
+    return Response(
+        content=pydantic_core.to_json(items),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -1,27 +1,38 @@
-from app.database import get_db
-from app.models.device import DeviceCreate, DeviceRead, DeviceUpdate
-from app.services import device_service
-from fastapi import APIRouter, Depends, status
+from app.database import get_async_db, get_db
+from app.models.bulk import BulkImportResponse
+from app.models.device import Device, DeviceCreate, DeviceRead, DeviceUpdate
+from app.pagination import SortKey, cursor_headers
+from app.responses import json_response
+from app.services import device_service, import_service
+from fastapi import APIRouter, Depends, Request, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter(prefix="/devices", tags=["Devices"])
 
 
 @router.get("/", response_model=list[DeviceRead])
-def list_devices(
+async def list_devices(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return device_service.get_devices(db, skip=skip, limit=limit)
+    rows = await device_service.get_devices_async(
+        db, skip, limit, cursor, order_by, columns=device_service.DEVICE_READ_COLUMNS
+    )
+    return json_response(
+        [row._asdict() for row in rows], cursor_headers(rows, limit, order_by)
+    )
 
 
 @router.get("/{device_id}", response_model=DeviceRead)
-def get_device(
+async def get_device(
     device_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return device_service.get_device(db, device_id)
+    return await device_service.get_device_async(db, device_id)
 
 
 @router.post("/", response_model=DeviceRead, status_code=status.HTTP_201_CREATED)
@@ -32,6 +43,20 @@ def create_device(
     return device_service.create_device(db, device)
 
 
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_create_devices(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    return await import_service.import_stream(
+        db,
+        request.stream(),
+        request.headers.get("content-type", ""),
+        Device,
+        DeviceCreate,
+    )
+
+
 @router.put("/{device_id}", response_model=DeviceRead)
 def update_device(
     device_id: int,
@@ -1,15 +1,109 @@
 from app.database import get_db
-from app.models.distribution import DistributionRequest, DistributionResponse
-from app.services import distribution_service
-from fastapi import APIRouter, Depends
+from app.models.distribution import (DistributionApplyRequest,
+                                     DistributionApplyResponse,
+                                     DistributionBatchRequest,
+                                     DistributionBatchResponse,
+                                     DistributionRebalanceRequest,
+                                     DistributionRebalanceResponse,
+                                     DistributionRequest, DistributionResponse)
+from app.models.distribution_job import (DistributionJobDetail,
+                                         DistributionJobRead)
+from app.services import distribution_job_service, distribution_service
+from app.services.import_service import NDJSON_MEDIA_TYPES
+from fastapi import APIRouter, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 
 router = APIRouter(prefix="/distribution", tags=["Distribution"])
 
 
-@router.post("/calculate", response_model=DistributionResponse)
+@router.post(
+    "/calculate",
+    response_model=DistributionResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "JSON, or with Accept: application/x-ndjson one "
+            "record per line: racks, then unplaced devices, then the summary",
+        }
+    },
+)
 def calculate_distribution(
     request: DistributionRequest,
     db: Session = Depends(get_db),
+    accept: str = Header(default=""),
 ):
+    if _accepts_ndjson(accept):
+        return StreamingResponse(
+            distribution_service.calculate_distribution_stream(db, request),
+            media_type="application/x-ndjson",
+        )
     return distribution_service.calculate_distribution(db, request)
+
+
+@router.post("/calculate-batch", response_model=DistributionBatchResponse)
+def calculate_distribution_batch(
+    request: DistributionBatchRequest,
+    db: Session = Depends(get_db),
+):
+    result = distribution_service.calculate_distribution_batch(db, request)
+    # Scenarios arrive encoded; response_model only documents the shape
+    return Response(content=result.to_json(), media_type="application/json")
+
+
+@router.post("/rebalance", response_model=DistributionRebalanceResponse)
+def calculate_rebalance(
+    request: DistributionRebalanceRequest,
+    db: Session = Depends(get_db),
+):
+    return distribution_service.calculate_rebalance(db, request)
+
+
+@router.post(
+    "/jobs",
+    response_model=DistributionJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_distribution_job(
+    request: DistributionRequest,
+    db: Session = Depends(get_db),
+):
+    return distribution_job_service.create_job(db, request)
+
+
+@router.get("/jobs/{job_id}", response_model=DistributionJobDetail)
+def get_distribution_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+):
+    job = distribution_job_service.get_job(db, job_id)
+    # The stored result is already JSON; response_model only documents the shape
+    return Response(
+        content=distribution_job_service.job_to_json(job),
+        media_type="application/json",
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=DistributionJobRead)
+def cancel_distribution_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+):
+    return distribution_job_service.cancel_job(db, job_id)
+
+
+@router.post(
+    "/apply",
+    response_model=DistributionApplyResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def apply_distribution(
+    request: DistributionApplyRequest,
+    db: Session = Depends(get_db),
+):
+    return distribution_service.apply_distribution(db, request)
+
+
+def _accepts_ndjson(accept: str) -> bool:
+    media_types = (part.split(";")[0].strip().lower() for part in accept.split(","))
+    return any(media_type in NDJSON_MEDIA_TYPES for media_type in media_types)
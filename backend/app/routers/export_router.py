@@ -0,0 +1,51 @@
+from collections.abc import Iterator
+
+from app.database import engine
+from app.models.device import Device
+from app.models.placement import RackPlacement
+from app.models.rack import Rack
+from app.services import export_service
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@router.get("/devices")
+def export_devices(format: ExportFormat = "ndjson"):
+    return _export_response(Device, "devices", format)
+
+
+@router.get("/racks")
+def export_racks(format: ExportFormat = "ndjson"):
+    return _export_response(Rack, "racks", format)
+
+
+@router.get("/placements")
+def export_placements(format: ExportFormat = "ndjson"):
+    return _export_response(RackPlacement, "placements", format)
+
+
+def _export_response(
+    table: type[Device] | type[Rack] | type[RackPlacement],
+    name: str,
+    export_format: ExportFormat,
+) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(table, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        },
+    )
+
+
+def _stream(
+    table: type[Device] | type[Rack] | type[RackPlacement],
+    export_format: ExportFormat,
+) -> Iterator[bytes]:
+    # The stream outlives the request's dependencies, so it owns its session
+    with Session(engine) as db:
+        yield from export_service.iter_export(db, table, export_format)
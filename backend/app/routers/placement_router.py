@@ -1,19 +1,21 @@
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.placement import (PlacementCreate, PlacementRead,
                                   PlacementReadWithDevice)
+from app.responses import json_response
 from app.services import placement_service
 from fastapi import APIRouter, Depends, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter(prefix="/racks", tags=["Rack Placements"])
 
 
 @router.get("/{rack_id}/devices", response_model=list[PlacementReadWithDevice])
-def list_rack_devices(
+async def list_rack_devices(
     rack_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return placement_service.get_rack_devices(db, rack_id)
+    return json_response(await placement_service.get_rack_devices_async(db, rack_id))
 
 
 @router.post(
@@ -1,32 +1,71 @@
-from app.database import get_db
-from app.models.rack import RackCreate, RackRead, RackReadWithPower, RackUpdate
-from app.services import rack_service
-from fastapi import APIRouter, Depends, status
+from app.database import get_async_db, get_db
+from app.models.bulk import BulkImportResponse
+from app.models.placement import FreeSlot
+from app.models.rack import (Rack, RackCreate, RackRead, RackReadWithPower,
+                             RackUpdate)
+from app.pagination import SortKey, cursor_headers
+from app.responses import json_response
+from app.services import import_service, placement_service, rack_service
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 router = APIRouter(prefix="/racks", tags=["Racks"])
 
 
-@router.get("/", response_model=list[RackRead])
-def list_racks(
+@router.get("/", response_model=list[RackRead] | list[RackReadWithPower])
+async def list_racks(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    with_stats: bool = False,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return rack_service.get_racks(db, skip=skip, limit=limit)
+    if with_stats:
+        racks = await rack_service.get_racks_with_stats_async(
+            db, skip, limit, cursor, order_by
+        )
+    else:
+        rows = await rack_service.get_racks_async(
+            db, skip, limit, cursor, order_by, columns=rack_service.RACK_READ_COLUMNS
+        )
+        racks = [row._asdict() for row in rows]
+    return json_response(racks, cursor_headers(racks, limit, order_by))
+
+
+@router.get("/free-slots", response_model=list[FreeSlot])
+async def find_free_slots(
+    units: int = Query(gt=0),
+    power_w: int = Query(default=0, ge=0),
+    limit: int = Query(default=placement_service.FREE_SLOTS_LIMIT, gt=0, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await placement_service.find_free_slots_async(
+        db, units, power_w=power_w, limit=limit
+    )
 
 
 @router.get("/{rack_id}", response_model=RackReadWithPower)
-def get_rack(
+async def get_rack(
     rack_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    rack = rack_service.get_rack(db, rack_id)
-    stats = rack_service.calculate_rack_stats(db, rack)
+    rack = await rack_service.get_rack_async(db, rack_id)
+    return rack_service.rack_with_stats(rack)
+
 
-    return RackReadWithPower(
-        **rack.model_dump(),
-        **stats,
+@router.get("/{rack_id}/free-slots", response_model=list[FreeSlot])
+async def find_rack_free_slots(
+    rack_id: int,
+    units: int = Query(gt=0),
+    power_w: int = Query(default=0, ge=0),
+    limit: int = Query(default=placement_service.FREE_SLOTS_LIMIT, gt=0, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await rack_service.get_rack_async(db, rack_id)
+    return await placement_service.find_free_slots_async(
+        db, units, power_w=power_w, rack_id=rack_id, limit=limit
     )
 
 
@@ -38,6 +77,20 @@ def create_rack(
     return rack_service.create_rack(db, rack)
 
 
+@router.post("/bulk", response_model=BulkImportResponse)
+async def bulk_create_racks(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    return await import_service.import_stream(
+        db,
+        request.stream(),
+        request.headers.get("content-type", ""),
+        Rack,
+        RackCreate,
+    )
+
+
 @router.put("/{rack_id}", response_model=RackRead)
 def update_rack(
     rack_id: int,
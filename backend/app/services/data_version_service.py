@@ -0,0 +1,11 @@
+from app.models.data_version import DataVersion
+from sqlmodel import Session, select
+
+
+def get_version(db: Session, name: str) -> int:
+    """
+    Current value of the ``name`` data version; see ``VERSIONED_TABLES`` for
+    the writes that change it.
+    """
+    statement = select(DataVersion.version).where(DataVersion.name == name)
+    return db.exec(statement).first() or 0
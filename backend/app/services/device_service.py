@@ -1,12 +1,46 @@
+from typing import Any
+
+from app.database import chunked
 from app.exceptions import ConflictError, NotFoundError
-from app.models.device import Device, DeviceCreate, DeviceUpdate
+from app.models.device import Device, DeviceCreate, DeviceRead, DeviceUpdate
+from app.models.distribution import DeviceSelector
 from app.models.placement import RackPlacement
-from sqlmodel import Session, select
+from app.pagination import SortKey, paginate
+from app.responses import read_columns
+from app.services import rack_service
+from sqlalchemy import exists, false, or_
+from sqlalchemy.sql import Select
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Projection for list endpoints that encode rows without ORM objects
+DEVICE_READ_COLUMNS = read_columns(Device, DeviceRead)
+
+
+def get_devices(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    columns: tuple[Any, ...] | None = None,
+) -> list[Any]:
+    statement = select(*columns) if columns else select(Device)
+    statement = paginate(statement, Device, skip, limit, cursor, order_by)
+    return db.exec(statement).all()
 
 
-def get_devices(db: Session, skip: int = 0, limit: int = 100) -> list[Device]:
-    statement = select(Device).offset(skip).limit(limit)
-    return db.exec(statement).all()
+async def get_devices_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    columns: tuple[Any, ...] | None = None,
+) -> list[Any]:
+    statement = select(*columns) if columns else select(Device)
+    statement = paginate(statement, Device, skip, limit, cursor, order_by)
+    return (await db.exec(statement)).all()
 
 
 def get_device(db: Session, device_id: int) -> Device:
@@ -16,6 +50,80 @@ def get_device(db: Session, device_id: int) -> Device:
     return device
 
 
+async def get_device_async(db: AsyncSession, device_id: int) -> Device:
+    device = await db.get(Device, device_id)
+    if not device:
+        raise NotFoundError(f"Device with id {device_id} not found")
+    return device
+
+
+def get_devices_by_ids(
+    db: Session, device_ids: list[int], columns: tuple[Any, ...] | None = None
+) -> list[Any]:
+    """
+    Load devices with one ``IN (...)`` query per chunk of unique ids.
+
+    Results follow ``device_ids`` order (duplicates included). When ``columns``
+    is given only those columns are selected and rows are returned instead of
+    ``Device`` objects; ``Device.id`` must be one of them.
+    """
+    unique_ids = list(dict.fromkeys(device_ids))
+    found: dict[int, Any] = {}
+    for chunk in chunked(unique_ids):
+        statement = (
+            select(*columns) if columns else select(Device)
+        ).where(col(Device.id).in_(chunk))
+        for row in db.exec(statement):
+            found[row.id] = row
+
+    missing = [device_id for device_id in unique_ids if device_id not in found]
+    if len(missing) == 1:
+        raise NotFoundError(f"Device with id {missing[0]} not found")
+    if missing:
+        raise NotFoundError(f"Devices with ids {missing} not found")
+
+    return [found[device_id] for device_id in device_ids]
+
+
+def select_devices(
+    db: Session, selector: DeviceSelector, columns: tuple[Any, ...]
+) -> list[Any]:
+    """
+    Rows of ``columns`` for the devices matching ``selector``, in id order,
+    from one query.
+    """
+    statement = selection_statement(selector, columns).order_by(Device.id)
+    return db.exec(statement).all()
+
+
+def selection_statement(selector: DeviceSelector, columns: tuple[Any, ...]) -> Select:
+    """``SELECT columns`` of the devices matching every filter of ``selector``."""
+    filters = []
+    if selector.unplaced:
+        filters.append(~exists().where(RackPlacement.device_id == Device.id))
+    if selector.id_ranges is not None:
+        filters.append(
+            or_(
+                false(),
+                *(col(Device.id).between(r.first, r.last) for r in selector.id_ranges),
+            )
+        )
+    if selector.serial_prefix is not None:
+        serial_number = col(Device.serial_number)
+        filters.append(
+            serial_number.startswith(selector.serial_prefix, autoescape=True)
+        )
+    if selector.min_power_w is not None:
+        filters.append(Device.power_w >= selector.min_power_w)
+    if selector.max_power_w is not None:
+        filters.append(Device.power_w <= selector.max_power_w)
+    if selector.min_units is not None:
+        filters.append(Device.units_required >= selector.min_units)
+    if selector.max_units is not None:
+        filters.append(Device.units_required <= selector.max_units)
+    return select(*columns).where(*filters)
+
+
 def get_device_by_serial(db: Session, serial_number: str) -> Device | None:
     statement = select(Device).where(Device.serial_number == serial_number)
     return db.exec(statement).first()
@@ -45,10 +153,21 @@ def update_device(db: Session, device_id: int, device_data: DeviceUpdate) -> Dev
                 f"Device with serial number '{device_data.serial_number}' already exists"
             )
 
+    units_before, power_before = device.units_required, device.power_w
     update_data = device_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(device, key, value)
 
+    if device.units_required != units_before or device.power_w != power_before:
+        placement = _get_placement(db, device_id)
+        if placement:
+            rack_service.adjust_rack_usage(
+                db,
+                placement.rack_id,
+                device.units_required - units_before,
+                device.power_w - power_before,
+            )
+
     db.add(device)
     db.commit()
     db.refresh(device)
@@ -58,10 +177,17 @@ def update_device(db: Session, device_id: int, device_data: DeviceUpdate) -> Dev
 def delete_device(db: Session, device_id: int) -> None:
     device = get_device(db, device_id)
 
-    statement = select(RackPlacement).where(RackPlacement.device_id == device_id)
-    placement = db.exec(statement).first()
+    placement = _get_placement(db, device_id)
     if placement:
         db.delete(placement)
+        rack_service.adjust_rack_usage(
+            db, placement.rack_id, -device.units_required, -device.power_w
+        )
 
     db.delete(device)
     db.commit()
+
+
+def _get_placement(db: Session, device_id: int) -> RackPlacement | None:
+    statement = select(RackPlacement).where(RackPlacement.device_id == device_id)
+    return db.exec(statement).first()
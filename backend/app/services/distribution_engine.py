@@ -0,0 +1,513 @@
+import heapq
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
+
+import numpy as np
+from app.models.distribution import DistributionStrategy
+
+# Index entries examined before falling back to a vectorized scan of all racks
+HEAP_PROBE_LIMIT = 8
+# Devices considered between calls of a run's progress callback
+PROGRESS_INTERVAL = 4096
+
+
+@dataclass
+class DistributionPlan:
+    """Raw outcome of an engine run, indexed by device position."""
+
+    # Device positions in the order they were considered (power descending)
+    order: list[int]
+    # Rack position per device position, -1 when the device was not placed
+    assignments: array
+    # Unplaced reason per device position
+    reasons: dict[int, str] = field(default_factory=dict)
+    # First unit per device position in slot-aware runs, 0 when not assigned
+    start_units: array | None = None
+
+
+class RackSlots:
+    """
+    Free contiguous unit runs of one rack.
+
+    Runs are kept sorted by ``(length, start_unit)``, so the best-fit gap for a
+    device (the shortest run that is long enough, lowest start on ties) is a
+    binary search away.
+    """
+
+    __slots__ = ("_runs",)
+
+    def __init__(self, runs: Sequence[tuple[int, int]]):
+        self._runs = sorted((length, start) for start, length in runs if length > 0)
+
+    @property
+    def largest(self) -> int:
+        return self._runs[-1][0] if self._runs else 0
+
+    def take(self, units: int) -> int:
+        """Occupy ``units`` at the start of the best-fit run and return its start."""
+        index = bisect_left(self._runs, (units, 0))
+        length, start = self._runs.pop(index)
+        if length > units:
+            insort(self._runs, (length - units, start + units))
+        return start
+
+
+class DistributionEngine:
+    """
+    Working state of one distribution run kept in flat NumPy arrays.
+
+    Racks and devices are addressed by their position in the sequences passed
+    in, so the inner loop only touches machine integers; response models are
+    built once from the final state by the caller.
+
+    In slot-aware mode each rack also tracks its free contiguous runs, and
+    ``free_units`` holds the longest run rather than the total free units, so
+    feasibility means "fits in one gap".
+    """
+
+    def __init__(self, racks: Sequence[Any], slot_aware: bool = False):
+        self.total_units = np.fromiter(
+            (r.total_units for r in racks), dtype=np.int64, count=len(racks)
+        )
+        self.max_power_w = np.fromiter(
+            (r.max_power_w for r in racks), dtype=np.int64, count=len(racks)
+        )
+        self.used_units = np.zeros(len(racks), dtype=np.int64)
+        self.total_power_w = np.zeros(len(racks), dtype=np.int64)
+        self.utilization_percent = np.zeros(len(racks), dtype=np.float64)
+        # Remaining capacity, kept alongside the totals for the feasibility mask
+        self.free_units = self.total_units.copy()
+        self.free_power_w = self.max_power_w.copy()
+        self.slots: list[RackSlots] | None = (
+            [RackSlots([(1, r.total_units)]) for r in racks] if slot_aware else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.total_units)
+
+    def seed_rack(
+        self,
+        position: int,
+        used_units: int,
+        power_w: int,
+        free_runs: Sequence[tuple[int, int]],
+    ) -> None:
+        """Start a slot-aware rack from its existing placements."""
+        assert self.slots is not None
+        slots = RackSlots(free_runs)
+        self.slots[position] = slots
+        self.used_units[position] = used_units
+        self.total_power_w[position] = power_w
+        self.free_units[position] = slots.largest
+        self.free_power_w[position] = self.max_power_w[position] - power_w
+        self._update_utilization(position)
+
+    def load_assignments(
+        self, assignments: Sequence[int], units: Sequence[int], power: Sequence[int]
+    ) -> None:
+        """Reset the rack state to hold exactly ``assignments`` (not slot-aware)."""
+        assert self.slots is None
+        positions = np.asarray(assignments, dtype=np.int64)
+        placed = positions >= 0
+        self.used_units = np.bincount(
+            positions[placed],
+            weights=np.asarray(units, dtype=np.int64)[placed],
+            minlength=len(self),
+        ).astype(np.int64)
+        self.total_power_w = np.bincount(
+            positions[placed],
+            weights=np.asarray(power, dtype=np.int64)[placed],
+            minlength=len(self),
+        ).astype(np.int64)
+        self.free_units = self.total_units - self.used_units
+        self.free_power_w = self.max_power_w - self.total_power_w
+        for position in range(len(self)):
+            self._update_utilization(position)
+
+    def feasible(self, units: int, power: int) -> np.ndarray:
+        """Boolean mask of the racks that can take ``units`` and ``power`` now."""
+        return (self.free_units >= units) & (self.free_power_w >= power)
+
+    def run(
+        self,
+        devices: Sequence[Any],
+        blocked: dict[int, str] | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        strategy: DistributionStrategy = "balanced",
+    ) -> DistributionPlan:
+        """
+        Place devices one by one, in the order and into the racks that the
+        named packing strategy picks (see ``STRATEGIES``).
+
+        Racks that cannot take any of the remaining devices are dropped from
+        the strategy's index for good.
+
+        Devices in ``blocked`` are never placed and keep the given reason.
+        ``progress`` is called with ``(considered, total)`` every
+        ``PROGRESS_INTERVAL`` devices; an exception raised there aborts the run.
+        """
+        blocked = blocked or {}
+        units = array("q", (d.units_required for d in devices))
+        power = array("q", (d.power_w for d in devices))
+        chooser = STRATEGIES[strategy](self)
+        order = chooser.order(units, power)
+        plan = DistributionPlan(order=order, assignments=array("l", [-1]) * len(devices))
+        if self.slots is not None:
+            plan.start_units = array("l", [0]) * len(devices)
+
+        # Smallest units/power still to come, so racks that cannot take any
+        # remaining device can be dropped for good.
+        min_units_from, min_power_from = _suffix_minimums(order, units, power)
+
+        for step, device in enumerate(order):
+            if progress is not None and step % PROGRESS_INTERVAL == 0:
+                progress(step, len(order))
+            if device in blocked:
+                plan.reasons[device] = blocked[device]
+                continue
+
+            position = chooser.choose(
+                units[device],
+                power[device],
+                min_units_from[step],
+                min_power_from[step],
+            )
+            if position is None:
+                plan.reasons[device] = self.unplaced_reason(units[device], power[device])
+                continue
+
+            start_unit = self._assign(position, units[device], power[device])
+            plan.assignments[device] = position
+            if plan.start_units is not None:
+                plan.start_units[device] = start_unit
+            chooser.placed(position)
+
+        return plan
+
+    def unplaced_reason(self, units: int, power: int) -> str:
+        if not len(self):
+            return "No racks available"
+
+        has_units = bool((self.free_units >= units).any())
+        has_power = bool((self.free_power_w >= power).any())
+
+        if not has_units and not has_power:
+            return "No rack has enough units or power capacity"
+        elif not has_units and self.slots is not None:
+            return f"No rack has {units} contiguous free units"
+        elif not has_units:
+            return f"No rack has {units} free units"
+        elif not has_power:
+            return f"No rack has {power}W available power"
+        else:
+            return "No rack has both enough units and power capacity"
+
+    def _assign(self, position: int, units: int, power: int) -> int:
+        """Book the device on the rack; returns its start unit in slot-aware mode."""
+        start_unit = 0
+        self.used_units[position] += units
+        self.total_power_w[position] += power
+        self.free_power_w[position] -= power
+        if self.slots is not None:
+            start_unit = self.slots[position].take(units)
+            self.free_units[position] = self.slots[position].largest
+        else:
+            self.free_units[position] -= units
+        self._update_utilization(position)
+        return start_unit
+
+    def _update_utilization(self, position: int) -> None:
+        max_power_w = int(self.max_power_w[position])
+        self.utilization_percent[position] = (
+            round((int(self.total_power_w[position]) / max_power_w) * 100, 2)
+            if max_power_w > 0
+            else 0.0
+        )
+
+
+class PackingStrategy(ABC):
+    """
+    Picks the rack for each device of one ``DistributionEngine.run``.
+
+    A strategy keeps its own index over the engine's rack arrays: ``choose``
+    looks a device up in it and ``placed`` refreshes the entry of the rack
+    that just took one, so each device costs O(log R) index work. When the
+    first ``HEAP_PROBE_LIMIT`` candidates do not fit, ``scan`` makes the same
+    choice with one vectorized pass over all racks instead.
+    """
+
+    name: ClassVar[str]
+
+    def __init__(self, engine: DistributionEngine):
+        self.engine = engine
+
+    def order(self, units: array, power: array) -> list[int]:
+        """
+        Device positions, largest first by size relative to the average
+        rack, so neither units nor power dominates the order.
+        """
+        engine = self.engine
+        unit_scale = power_scale = 1.0
+        if len(engine):
+            unit_scale = 1.0 / max(float(engine.total_units.mean()), 1.0)
+            power_scale = 1.0 / max(float(engine.max_power_w.mean()), 1.0)
+        size = [
+            u * unit_scale + p * power_scale
+            for u, p in zip(units, power, strict=True)
+        ]
+        return sorted(range(len(size)), key=size.__getitem__, reverse=True)
+
+    @abstractmethod
+    def choose(
+        self, units: int, power: int, min_units: int, min_power: int
+    ) -> int | None:
+        """
+        Rack position for a device, or None when none fits. Racks with less
+        than ``min_units``/``min_power`` free fit no remaining device.
+        """
+
+    @abstractmethod
+    def placed(self, position: int) -> None:
+        """Refresh the index after the rack at ``position`` took a device."""
+
+    @abstractmethod
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        """The choice among the racks in ``mask`` (at least one)."""
+
+    def _lexicographic(self, primary: np.ndarray) -> np.ndarray:
+        """``primary`` then free power folded into one sortable int64 score."""
+        scale = int(self.engine.max_power_w.max()) + 1
+        return primary * scale + self.engine.free_power_w
+
+
+class HeapStrategy(PackingStrategy):
+    """
+    Racks in a lazily invalidated min-heap on ``(key(position), position)``;
+    the position keeps ties going to the rack requested first. Every
+    assignment bumps the rack's version, which makes its older entries stale.
+    """
+
+    def __init__(self, engine: DistributionEngine):
+        super().__init__(engine)
+        self._versions = [0] * len(engine)
+        self._heap = [
+            (self.key(position), position, 0) for position in range(len(engine))
+        ]
+        heapq.heapify(self._heap)
+
+    @abstractmethod
+    def key(self, position: int) -> tuple:
+        """Heap order of the rack at ``position``; smallest is chosen first."""
+
+    def choose(
+        self, units: int, power: int, min_units: int, min_power: int
+    ) -> int | None:
+        engine = self.engine
+        heap = self._heap
+        skipped: list[tuple[tuple, int, int]] = []
+        chosen = None
+        while heap and len(skipped) < HEAP_PROBE_LIMIT:
+            entry = heapq.heappop(heap)
+            position = entry[1]
+            if entry[2] != self._versions[position]:
+                continue
+
+            free_units = engine.free_units[position]
+            free_power = engine.free_power_w[position]
+            if free_units < min_units or free_power < min_power:
+                # No remaining device fits here any more
+                continue
+            if free_units >= units and free_power >= power:
+                chosen = position
+                break
+            skipped.append(entry)
+
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        if chosen is None and len(skipped) == HEAP_PROBE_LIMIT:
+            # The chosen rack's heap entry goes stale once it is assigned
+            mask = engine.feasible(units, power)
+            if mask.any():
+                chosen = self.scan(mask, units, power)
+        return chosen
+
+    def placed(self, position: int) -> None:
+        self._versions[position] += 1
+        heapq.heappush(
+            self._heap, (self.key(position), position, self._versions[position])
+        )
+
+
+class BalancedStrategy(HeapStrategy):
+    """
+    Largest power first into the least utilized rack that fits; spreads
+    power draw evenly rather than packing tightly.
+    """
+
+    name = "balanced"
+
+    def order(self, units: array, power: array) -> list[int]:
+        return sorted(range(len(power)), key=power.__getitem__, reverse=True)
+
+    def key(self, position: int) -> tuple:
+        return (float(self.engine.utilization_percent[position]),)
+
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        utilization = self.engine.utilization_percent
+        return int(np.argmin(np.where(mask, utilization, np.inf)))
+
+
+class FirstFitStrategy(HeapStrategy):
+    """First-fit decreasing: the first rack in request order that fits."""
+
+    name = "first_fit"
+
+    def key(self, position: int) -> tuple:
+        return ()
+
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        return int(np.argmax(mask))
+
+
+class WorstFitStrategy(HeapStrategy):
+    """Worst-fit decreasing: the rack with the most free units, then power."""
+
+    name = "worst_fit"
+
+    def key(self, position: int) -> tuple:
+        engine = self.engine
+        return (
+            -int(engine.free_units[position]),
+            -int(engine.free_power_w[position]),
+        )
+
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        score = self._lexicographic(self.engine.free_units)
+        return int(np.argmax(np.where(mask, score, -1)))
+
+
+class BestFitStrategy(PackingStrategy):
+    """
+    Best-fit decreasing: the rack left with the fewest free units, then the
+    least free power. Racks sit in a list sorted on
+    ``(free_units, free_power_w, position)``, so the candidates are the
+    entries right after a binary search for the device's units.
+    """
+
+    name = "best_fit"
+
+    def __init__(self, engine: DistributionEngine):
+        super().__init__(engine)
+        self._entries = [self._entry(position) for position in range(len(engine))]
+        self._index = sorted(self._entries)
+
+    def choose(
+        self, units: int, power: int, min_units: int, min_power: int
+    ) -> int | None:
+        index = self._index
+        start = bisect_left(index, (units, power, -1))
+        for entry in index[start : start + HEAP_PROBE_LIMIT]:
+            if entry[1] >= power:
+                return entry[2]
+        if len(index) - start <= HEAP_PROBE_LIMIT:
+            return None
+        mask = self.engine.feasible(units, power)
+        if not mask.any():
+            return None
+        return self.scan(mask, units, power)
+
+    def placed(self, position: int) -> None:
+        index = self._index
+        del index[bisect_left(index, self._entries[position])]
+        self._entries[position] = self._entry(position)
+        insort(index, self._entries[position])
+
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        score = self._lexicographic(self.engine.free_units)
+        return int(np.argmin(np.where(mask, score, np.iinfo(np.int64).max)))
+
+    def _entry(self, position: int) -> tuple[int, int, int]:
+        engine = self.engine
+        return (
+            int(engine.free_units[position]),
+            int(engine.free_power_w[position]),
+            position,
+        )
+
+
+class DotProductStrategy(PackingStrategy):
+    """
+    2-D dot product: the rack whose remaining (units, power), relative to
+    its size, best lines up with the device's demand. A device that is
+    unit-heavy goes where units are plentiful, a power-heavy one where power
+    is. The score depends on the device, so there is no index to keep;
+    every choice is one vectorized pass over the racks.
+    """
+
+    name = "dot_product"
+
+    def __init__(self, engine: DistributionEngine):
+        super().__init__(engine)
+        self._unit_scale = _reciprocal(engine.total_units)
+        self._power_scale = _reciprocal(engine.max_power_w)
+
+    def choose(
+        self, units: int, power: int, min_units: int, min_power: int
+    ) -> int | None:
+        mask = self.engine.feasible(units, power)
+        if not mask.any():
+            return None
+        return self.scan(mask, units, power)
+
+    def placed(self, position: int) -> None:
+        pass
+
+    def scan(self, mask: np.ndarray, units: int, power: int) -> int:
+        engine = self.engine
+        unit_term = units * self._unit_scale * engine.free_units * self._unit_scale
+        power_term = (
+            power * self._power_scale * engine.free_power_w * self._power_scale
+        )
+        return int(np.argmax(np.where(mask, unit_term + power_term, -np.inf)))
+
+
+STRATEGIES: dict[str, type[PackingStrategy]] = {
+    strategy.name: strategy
+    for strategy in (
+        BalancedStrategy,
+        FirstFitStrategy,
+        BestFitStrategy,
+        WorstFitStrategy,
+        DotProductStrategy,
+    )
+}
+
+
+def _reciprocal(values: np.ndarray) -> np.ndarray:
+    """``1 / values``, with 0 where a value is 0."""
+    return np.divide(
+        1.0, values, out=np.zeros(len(values), dtype=np.float64), where=values > 0
+    )
+
+
+def _suffix_minimums(
+    order: list[int], units: array, power: array
+) -> tuple[array, array]:
+    """Minimum units/power over ``order[i:]`` for every step ``i``."""
+    min_units = array("q", bytes(8 * len(order)))
+    min_power = array("q", bytes(8 * len(order)))
+    current_units = current_power = None
+    for step in range(len(order) - 1, -1, -1):
+        device = order[step]
+        if current_units is None or units[device] < current_units:
+            current_units = units[device]
+        if current_power is None or power[device] < current_power:
+            current_power = power[device]
+        min_units[step] = current_units
+        min_power[step] = current_power
+    return min_units, min_power
@@ -0,0 +1,267 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Any
+
+import pydantic_core
+from app.database import engine
+from app.exceptions import BusinessRuleError, NotFoundError
+from app.models.distribution import DistributionRequest
+from app.models.distribution_job import (FINISHED_JOB_STATUSES, DistributionJob,
+                                         DistributionJobRead, utc_now)
+from app.services import distribution_service
+from sqlalchemy import or_, update
+from sqlmodel import Session, col, select
+
+MAX_ERROR_LENGTH = 1000
+# A running job renews its heartbeat this often; one that has not been
+# renewed for HEARTBEAT_TIMEOUT lost its process (crash, kill, restart)
+HEARTBEAT_INTERVAL = timedelta(seconds=10)
+HEARTBEAT_TIMEOUT = timedelta(seconds=60)
+
+# Futures of the jobs this process queued and that have not finished yet
+_queued_jobs: dict[int, Future] = {}
+_queued_jobs_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def create_job(db: Session, request: DistributionRequest) -> DistributionJob:
+    """
+    Store a distribution request as a pending job and queue it on the
+    shared process pool.
+    """
+    distribution_service.check_selection(request)
+    job = DistributionJob(request=request.model_dump())
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _submit(job.id)
+    return job
+
+
+def get_job(db: Session, job_id: int) -> DistributionJob:
+    """A job, marked failed first if it was running in a process that died."""
+    job = db.get(DistributionJob, job_id)
+    if not job:
+        raise NotFoundError(f"Distribution job with id {job_id} not found")
+    if job.status == "running" and fail_orphaned_jobs(db, [job_id]):
+        db.refresh(job)
+    return job
+
+
+def cancel_job(db: Session, job_id: int) -> DistributionJob:
+    """
+    Cancel a job. A pending job is cancelled at once; a running job is
+    flagged and stops at its next progress report.
+    """
+    job = get_job(db, job_id)
+    if job.status in FINISHED_JOB_STATUSES:
+        raise BusinessRuleError(f"Distribution job {job_id} is already {job.status}")
+
+    # Conditional updates, so a worker claiming the job at the same time
+    # either sees it cancelled or sees the flag
+    cancelled = db.execute(
+        update(DistributionJob)
+        .where(col(DistributionJob.id) == job_id, DistributionJob.status == "pending")
+        .values(status="cancelled", finished_at=utc_now())
+    ).rowcount
+    if not cancelled:
+        db.execute(
+            update(DistributionJob)
+            .where(col(DistributionJob.id) == job_id)
+            .values(cancel_requested=True)
+        )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def recover_jobs(db: Session) -> int:
+    """
+    Server startup: fail the running jobs that lost their process and queue
+    the pending ones again, as queues do not survive a restart. A job queued
+    twice still runs once; see ``run_job``. Returns the jobs queued.
+    """
+    fail_orphaned_jobs(db)
+    statement = (
+        select(DistributionJob.id)
+        .where(DistributionJob.status == "pending")
+        .order_by(DistributionJob.id)
+    )
+    pending = db.exec(statement).all()
+    for job_id in pending:
+        _submit(job_id)
+    return len(pending)
+
+
+def fail_orphaned_jobs(db: Session, job_ids: list[int] | None = None) -> int:
+    """
+    Mark running jobs whose heartbeat is older than ``HEARTBEAT_TIMEOUT`` as
+    failed, all of them or those in ``job_ids``. Returns how many were.
+    """
+    heartbeat_at = col(DistributionJob.heartbeat_at)
+    statement = update(DistributionJob).where(
+        DistributionJob.status == "running",
+        # No heartbeat at all: claimed before heartbeats were recorded
+        or_(heartbeat_at.is_(None), heartbeat_at < utc_now() - HEARTBEAT_TIMEOUT),
+    )
+    if job_ids is not None:
+        statement = statement.where(col(DistributionJob.id).in_(job_ids))
+    failed = db.execute(
+        statement.values(
+            status="failed",
+            finished_at=utc_now(),
+            error="The process running the job stopped before it finished",
+        )
+        # Loaded jobs are refreshed by the caller; SQLite returns naive
+        # timestamps that cannot be compared in Python
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if failed:
+        db.commit()
+    return failed
+
+
+def cancel_queued_jobs() -> int:
+    """
+    Server shutdown: cancel the jobs still waiting in this process's queue
+    and mark them cancelled. Jobs already handed to a worker finish. Returns
+    how many were cancelled.
+    """
+    with _queued_jobs_lock:
+        queued = list(_queued_jobs.items())
+    cancelled = [job_id for job_id, future in queued if future.cancel()]
+    if cancelled:
+        with Session(engine) as db:
+            db.execute(
+                update(DistributionJob)
+                .where(
+                    col(DistributionJob.id).in_(cancelled),
+                    DistributionJob.status == "pending",
+                )
+                .values(
+                    status="cancelled",
+                    finished_at=utc_now(),
+                    error="The server shut down before the job started",
+                )
+            )
+            db.commit()
+    return len(cancelled)
+
+
+def job_to_json(job: DistributionJob) -> bytes:
+    """Encode a job with its stored result spliced in without re-parsing it."""
+    metadata = pydantic_core.to_json(DistributionJobRead.model_validate(job))
+    result = job.result.encode() if job.result is not None else b"null"
+    # metadata is a JSON object; the result goes in before its closing brace
+    return metadata[:-1] + b',"result":' + result + b"}"
+
+
+def run_job(job_id: int) -> None:
+    """Process pool entry point; all outcomes are written to the job row."""
+    with Session(engine) as db:
+        claimed = db.execute(
+            update(DistributionJob)
+            .where(
+                col(DistributionJob.id) == job_id, DistributionJob.status == "pending"
+            )
+            .values(status="running", started_at=utc_now(), heartbeat_at=utc_now())
+        ).rowcount
+        db.commit()
+        if not claimed:
+            # Cancelled while it was queued, or already claimed
+            return
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat, args=(job_id, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+        try:
+            _run_claimed(db, job_id)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+
+def _run_claimed(db: Session, job_id: int) -> None:
+    job = db.get(DistributionJob, job_id)
+    try:
+        request = DistributionRequest.model_validate(job.request)
+        response = distribution_service.calculate_distribution(
+            db, request, progress=_progress_reporter(db, job_id)
+        )
+    except JobCancelled:
+        db.rollback()
+        _finish(db, job_id, "cancelled")
+    except Exception as e:
+        db.rollback()
+        error = getattr(e, "detail", None) or str(e) or type(e).__name__
+        _finish(db, job_id, "failed", error=error[:MAX_ERROR_LENGTH])
+    else:
+        _finish(
+            db,
+            job_id,
+            "succeeded",
+            progress=1.0,
+            result=pydantic_core.to_json(response).decode(),
+        )
+
+
+def _submit(job_id: int) -> None:
+    future = distribution_service.get_executor().submit(run_job, job_id)
+    with _queued_jobs_lock:
+        _queued_jobs[job_id] = future
+    future.add_done_callback(lambda _future: _forget_queued(job_id))
+
+
+def _forget_queued(job_id: int) -> None:
+    with _queued_jobs_lock:
+        _queued_jobs.pop(job_id, None)
+
+
+def _heartbeat(job_id: int, stop: threading.Event) -> None:
+    """Renew the job's heartbeat on its own connection until ``stop`` is set."""
+    while not stop.wait(HEARTBEAT_INTERVAL.total_seconds()):
+        with Session(engine) as db:
+            db.execute(
+                update(DistributionJob)
+                .where(
+                    col(DistributionJob.id) == job_id,
+                    DistributionJob.status == "running",
+                )
+                .values(heartbeat_at=utc_now())
+            )
+            db.commit()
+
+
+def _progress_reporter(db: Session, job_id: int) -> Callable[[int, int], None]:
+    def report(considered: int, total: int) -> None:
+        # The run only reports once its rows are loaded, so committing here
+        # does not split any read it depends on
+        db.execute(
+            update(DistributionJob)
+            .where(col(DistributionJob.id) == job_id)
+            .values(progress=round(considered / total, 4))
+        )
+        db.commit()
+        statement = select(DistributionJob.cancel_requested).where(
+            DistributionJob.id == job_id
+        )
+        if db.exec(statement).one():
+            raise JobCancelled
+
+    return report
+
+
+def _finish(db: Session, job_id: int, status: str, **values: Any) -> None:
+    db.execute(
+        update(DistributionJob)
+        .where(col(DistributionJob.id) == job_id)
+        .values(status=status, finished_at=utc_now(), **values)
+    )
+    db.commit()
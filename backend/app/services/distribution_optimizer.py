@@ -0,0 +1,333 @@
+import random
+import time
+from concurrent.futures import Executor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Devices of a rack looked at for a single move, and per side for a swap
+MOVE_SAMPLE = 64
+SWAP_SAMPLE = 24
+# Racks tried when making room for an unplaced device
+EJECTION_RACK_SAMPLE = 16
+# Non-improving iterations before the search goes back to its best solution
+RESTORE_AFTER = 50
+# Time past the deadline that restarts on the executor get to hand in their
+# result: their last iteration plus sending it back
+RESTART_GRACE_SECONDS = 0.05
+
+
+@dataclass
+class Problem:
+    """Plain picklable input of one local search."""
+
+    units: list[int]
+    power: list[int]
+    total_units: list[int]
+    max_power_w: list[int]
+    # Rack position per device, -1 when unplaced
+    assignments: list[int]
+    # Devices that must stay unplaced
+    fixed: frozenset[int] = frozenset()
+
+
+@dataclass(order=True)
+class Solution:
+    unplaced: int
+    spread: float
+    assignments: list[int] = field(compare=False)
+
+
+def optimize(
+    problem: Problem,
+    time_budget_ms: int,
+    executor: Executor | None = None,
+    restarts: int = 1,
+) -> Solution:
+    """
+    Improve ``problem.assignments`` for ``time_budget_ms`` and return the best
+    solution by unplaced devices, then utilization spread.
+
+    One search runs in the calling thread; with an ``executor`` the other
+    ``restarts - 1`` run there with different seeds, all against the same
+    wall-clock deadline. The executor may be busy with other work: restarts
+    that have not finished shortly after the deadline are cancelled (or, once
+    started, left to stop on their own) and their results ignored. The
+    starting solution wins ties, and a budget of 0 returns it unchanged.
+    """
+    initial = LocalSearch(problem, seed=0).solution()
+    if time_budget_ms <= 0:
+        return initial
+
+    deadline = time.time() + time_budget_ms / 1000
+    futures = []
+    if executor is not None:
+        futures = [
+            executor.submit(local_search, problem, seed, deadline)
+            for seed in range(1, restarts)
+        ]
+    solutions = [initial, local_search(problem, 0, deadline)]
+    if futures:
+        timeout = max(0.0, deadline - time.time()) + RESTART_GRACE_SECONDS
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        # Cancelled ones count as done, e.g. when the pool is shut down
+        solutions.extend(
+            future.result() for future in done if not future.cancelled()
+        )
+    return min(solutions)
+
+
+def local_search(problem: Problem, seed: int, deadline: float) -> Solution:
+    """Process pool entry point: one restart until ``deadline`` (epoch seconds)."""
+    return LocalSearch(problem, seed).run(deadline)
+
+
+class LocalSearch:
+    """
+    Move/swap local search over a device -> rack assignment.
+
+    Each iteration first tries to place unplaced devices, directly or by
+    moving one device out of the way, then moves or swaps devices between
+    the most and the least utilized rack. Only strictly better states are
+    kept during descent; when the descent stalls a random move kicks the
+    search elsewhere, and after ``RESTORE_AFTER`` fruitless kicks it goes
+    back to the best state seen. Every move checks unit and power capacity.
+
+    Utilization and spread follow the response summary: power over maximum
+    power, spread over the racks that hold at least one device.
+    """
+
+    def __init__(self, problem: Problem, seed: int):
+        self.rng = random.Random(seed)
+        self.units = problem.units
+        self.power = problem.power
+        self.fixed = problem.fixed
+        self.total_units = np.array(problem.total_units, dtype=np.int64)
+        self.max_power_w = np.array(problem.max_power_w, dtype=np.int64)
+        self.utilization_scale = np.divide(
+            100.0,
+            self.max_power_w,
+            out=np.zeros(len(self.max_power_w)),
+            where=self.max_power_w > 0,
+        )
+        self._load(problem.assignments)
+
+    def run(self, deadline: float) -> Solution:
+        best = self.solution()
+        stalled = 0
+        while time.time() < deadline:
+            improved = self._place_unplaced(deadline)
+            improved = self._balance() or improved
+            if improved:
+                continue
+
+            current = self.solution(copy=False)
+            if current < best:
+                best = self.solution()
+                stalled = 0
+            else:
+                stalled += 1
+            if stalled >= RESTORE_AFTER:
+                self._load(best.assignments)
+                stalled = 0
+            else:
+                self._kick()
+
+        current = self.solution(copy=False)
+        return self.solution() if current < best else best
+
+    def solution(self, copy: bool = True) -> Solution:
+        assignments = list(self.assignments) if copy else self.assignments
+        return Solution(len(self.unplaced), self._spread(), assignments)
+
+    def _load(self, assignments: list[int]) -> None:
+        racks = len(self.total_units)
+        self.assignments = list(assignments)
+        self.free_units = self.total_units.copy()
+        self.free_power_w = self.max_power_w.copy()
+        self.used_power_w = np.zeros(racks, dtype=np.int64)
+        self.counts = np.zeros(racks, dtype=np.int64)
+        self.members: list[list[int]] = [[] for _ in range(racks)]
+        self.unplaced: list[int] = []
+        for device, position in enumerate(self.assignments):
+            if position >= 0:
+                self.assignments[device] = -1
+                self._move(device, position)
+            elif device not in self.fixed:
+                self.unplaced.append(device)
+
+    def _move(self, device: int, target: int) -> None:
+        units = self.units[device]
+        power = self.power[device]
+        source = self.assignments[device]
+        if source >= 0:
+            self.free_units[source] += units
+            self.free_power_w[source] += power
+            self.used_power_w[source] -= power
+            self.counts[source] -= 1
+            self.members[source].remove(device)
+        if target >= 0:
+            self.free_units[target] -= units
+            self.free_power_w[target] -= power
+            self.used_power_w[target] += power
+            self.counts[target] += 1
+            self.members[target].append(device)
+        self.assignments[device] = target
+
+    def _utilization(self) -> np.ndarray:
+        return self.used_power_w * self.utilization_scale
+
+    def _spread(self) -> float:
+        occupied = self._utilization()[self.counts > 0]
+        return float(occupied.max() - occupied.min()) if len(occupied) else 0.0
+
+    def _balance_score(self) -> tuple[float, float]:
+        """Spread, then the sum of squared utilizations as a tie-breaker."""
+        occupied = self._utilization()[self.counts > 0]
+        if not len(occupied):
+            return (0.0, 0.0)
+        spread = float(occupied.max() - occupied.min())
+        return (spread, float(occupied @ occupied))
+
+    def _least_utilized_fitting(
+        self, device: int, exclude: int = -1
+    ) -> int | None:
+        mask = (self.free_units >= self.units[device]) & (
+            self.free_power_w >= self.power[device]
+        )
+        if exclude >= 0:
+            mask[exclude] = False
+        if not mask.any():
+            return None
+        return int(np.argmin(np.where(mask, self._utilization(), np.inf)))
+
+    def _place_unplaced(self, deadline: float) -> bool:
+        placed = False
+        self.rng.shuffle(self.unplaced)
+        for device in list(self.unplaced):
+            if time.time() >= deadline:
+                break
+            target = self._least_utilized_fitting(device)
+            if target is not None:
+                self._move(device, target)
+            elif not self._make_room(device):
+                continue
+            self.unplaced.remove(device)
+            placed = True
+        return placed
+
+    def _make_room(self, device: int) -> bool:
+        """Move one device out of a rack so that ``device`` fits there."""
+        racks = len(self.total_units)
+        sample = self.rng.sample(range(racks), min(EJECTION_RACK_SAMPLE, racks))
+        for position in sample:
+            missing_units = self.units[device] - int(self.free_units[position])
+            missing_power = self.power[device] - int(self.free_power_w[position])
+            for other in self.members[position]:
+                if (
+                    self.units[other] < missing_units
+                    or self.power[other] < missing_power
+                ):
+                    continue
+                target = self._least_utilized_fitting(other, exclude=position)
+                if target is not None:
+                    self._move(other, target)
+                    self._move(device, position)
+                    return True
+        return False
+
+    def _balance(self) -> bool:
+        """Move or swap devices between the most and least utilized racks."""
+        utilization = self._utilization()
+        occupied = self.counts > 0
+        high = int(np.argmax(np.where(occupied, utilization, -np.inf)))
+        low = int(np.argmin(np.where(occupied, utilization, np.inf)))
+        if high == low or utilization[high] <= utilization[low]:
+            return False
+
+        # Power that would bring both racks to the same utilization
+        high_max = int(self.max_power_w[high])
+        low_max = int(self.max_power_w[low])
+        high_used = int(self.used_power_w[high])
+        low_used = int(self.used_power_w[low])
+        ideal = (high_used * low_max - low_used * high_max) / (high_max + low_max)
+        free_units_low = int(self.free_units[low])
+        free_power_low = int(self.free_power_w[low])
+        free_units_high = int(self.free_units[high])
+
+        best_cost = None
+        best_pair: tuple[int, int] | None = None
+        high_sample = self._sample(self.members[high], MOVE_SAMPLE)
+        for device in high_sample:
+            moved = self.power[device]
+            if (
+                0 < moved < 2 * ideal
+                and self.units[device] <= free_units_low
+                and moved <= free_power_low
+            ):
+                cost = abs(moved - ideal)
+                if best_cost is None or cost < best_cost:
+                    best_cost, best_pair = cost, (device, -1)
+
+        for device in high_sample[:SWAP_SAMPLE]:
+            for other in self._sample(self.members[low], SWAP_SAMPLE):
+                moved = self.power[device] - self.power[other]
+                if not 0 < moved < 2 * ideal:
+                    continue
+                if (
+                    self.units[device] - self.units[other] > free_units_low
+                    or moved > free_power_low
+                    or self.units[other] - self.units[device] > free_units_high
+                ):
+                    continue
+                cost = abs(moved - ideal)
+                if best_cost is None or cost < best_cost:
+                    best_cost, best_pair = cost, (device, other)
+
+        if best_pair is None:
+            return False
+
+        before = self._balance_score()
+        device, other = best_pair
+        if other >= 0:
+            self._move(other, -1)
+        self._move(device, low)
+        if other >= 0:
+            self._move(other, high)
+        after = self._balance_score()
+        # With several racks at the extremes the spread only moves once all
+        # of them have; the sum of squares still drops on each step there
+        if after[0] < before[0] - 1e-9 or (
+            after[0] <= before[0] + 1e-9 and after[1] < before[1] - 1e-9
+        ):
+            return True
+
+        # No better overall; undo
+        self._move(device, high)
+        if other >= 0:
+            self._move(other, low)
+        return False
+
+    def _kick(self) -> None:
+        """Move a random placed device to a random other rack that fits it."""
+        racks = len(self.total_units)
+        if racks < 2:
+            return
+        position = self.rng.randrange(racks)
+        if not self.members[position]:
+            return
+        device = self.rng.choice(self.members[position])
+        mask = (self.free_units >= self.units[device]) & (
+            self.free_power_w >= self.power[device]
+        )
+        mask[position] = False
+        candidates = np.flatnonzero(mask)
+        if len(candidates):
+            self._move(device, int(self.rng.choice(candidates)))
+
+    def _sample(self, devices: list[int], size: int) -> list[int]:
+        if len(devices) > size:
+            return self.rng.sample(devices, size)
+        return list(devices)
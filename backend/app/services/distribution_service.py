@@ -1,14 +1,135 @@
-from app.exceptions import NotFoundError
+import hashlib
+import math
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, NamedTuple
+
+import numpy as np
+import pydantic_core
+from app.cache import CacheBackend, LocalCache
+from app.config import settings
+from app.database import uncommitted_writes
+from app.models.data_version import VERSIONED_TABLES
 from app.models.device import Device
-from app.models.distribution import (DeviceInDistribution, DistributionRequest,
-                                     DistributionResponse, RackDistribution,
-                                     UnplacedDevice)
+from app.exceptions import BadRequestError, BusinessRuleError
+from app.models.distribution import (DistributionApplyRequest,
+                                     DistributionApplyResponse,
+                                     DistributionBatchRequest,
+                                     DistributionRebalanceRequest,
+                                     DistributionRebalanceResponse,
+                                     DistributionRequest, DistributionResponse,
+                                     DistributionStrategy, RebalanceMove)
+from app.models.placement import PlacementCreate
 from app.models.rack import Rack
-from sqlmodel import Session
+from app.services import (data_version_service, device_service,
+                          placement_service, rack_service)
+from app.services.distribution_engine import DistributionEngine, DistributionPlan
+from app.services.distribution_optimizer import Problem, optimize
+from app.services.rebalance_planner import PlacedDevice, RebalancePlanner
+from sqlmodel import Session, select
+
+# Only the columns the algorithm reads are fetched.
+DEVICE_COLUMNS = (Device.id, Device.name, Device.power_w, Device.units_required)
+RACK_COLUMNS = (Rack.id, Rack.name, Rack.total_units, Rack.max_power_w)
+# A rebalance starts from the usage counters and loads placements per rack
+# only when it needs them
+REBALANCE_RACK_COLUMNS = (*RACK_COLUMNS, Rack.used_units, Rack.current_power_w)
+
+# Cache keys embed this data version, which every committed write to the
+# distribution tables changes, so no process serves a cached plan for data
+# that has changed.
+DISTRIBUTION_DATA_VERSION = "distribution"
+DISTRIBUTION_TABLES = VERSIONED_TABLES[DISTRIBUTION_DATA_VERSION]
+
+# Batches with fewer devices than this (over all scenarios) run in-process;
+# below it pickling and scheduling cost more than the parallelism saves.
+BATCH_INLINE_MAX_DEVICES = 5000
+
+# NDJSON lines are buffered into chunks of about this size before sending
+NDJSON_CHUNK_BYTES = 64 * 1024
+
+# (used_units, power_w, free (start_unit, length) runs) of a placed-into rack
+RackSeed = tuple[int, int, list[tuple[int, int]]]
+
+
+class DeviceRow(NamedTuple):
+    id: int
+    name: str
+    power_w: int
+    units_required: int
+
+
+class RackRow(NamedTuple):
+    id: int
+    name: str
+    total_units: int
+    max_power_w: int
+
+
+@dataclass
+class Scenario:
+    """Everything one distribution run needs, as plain picklable data."""
+
+    # DeviceRow/RackRow in batches; any rows with the same attributes otherwise
+    devices: list[Any]
+    # Requested racks, duplicates included
+    racks: list[Any]
+    respect_placements: bool = False
+    strategy: DistributionStrategy = "balanced"
+    time_budget_ms: int = 0
+    seeds: dict[int, RackSeed] = field(default_factory=dict)
+    # Rack id per already placed device id
+    placed: dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of a batch with every scenario already JSON encoded.
+
+    Workers encode their own ``DistributionResponse``; sending bytes back is
+    far cheaper than pickling the models, and the parent only concatenates
+    them into a ``DistributionBatchResponse`` body.
+    """
+
+    results: list[bytes]
+    summary: dict[str, Any]
+
+    def to_json(self) -> bytes:
+        return b"".join(
+            (
+                b'{"results":[',
+                b",".join(self.results),
+                b'],"summary":',
+                pydantic_core.to_json(self.summary),
+                b"}",
+            )
+        )
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+# Set in pool worker processes, which run everything in-process
+_in_pool_worker = False
+
+_cache: CacheBackend = LocalCache(
+    settings.DISTRIBUTION_CACHE_SIZE,
+    settings.DISTRIBUTION_CACHE_TTL,
+    max_weight=settings.DISTRIBUTION_CACHE_MAX_DEVICES,
+)
 
 
 def calculate_distribution(
-    db: Session, request: DistributionRequest
+    db: Session,
+    request: DistributionRequest,
+    progress: Callable[[int, int], None] | None = None,
 ) -> DistributionResponse:
     """
     Algorithm for balanced distribution of devices across racks.
@@ -19,137 +140,624 @@ def calculate_distribution(
          - Check if the device fits (units + power)
          - If it fits → assign it; if not → try the next one
          - If it doesn't fit anywhere → unplacedDevices
+
+    That is the default ``balanced`` strategy; ``request.strategy`` selects
+    another one from ``distribution_engine.STRATEGIES``. The placement itself
+    runs in ``DistributionEngine`` on flat arrays; response models are built
+    once from its final state.
+
+    With ``respect_placements`` racks start from their current placements and
+    power draw, devices must fit in one contiguous gap (best fit) and each
+    placed device gets the ``start_unit`` that ``place_device`` would accept.
+    Devices that are already placed are reported as unplaced.
+
+    Devices and racks come from explicit id lists (request order) or from
+    selectors resolved by one set-based query each (id order).
+
+    ``progress`` is passed on to ``DistributionEngine.run``.
+
+    Results are cached under the request and the current data version, except
+    in pool workers; cached responses are shared and must not be modified.
     """
+    check_selection(request)
+    key, cached = _cached(db, request)
+    if cached is not None:
+        return cached
+
+    scenario = _load_scenario(db, request)
+    response = distribute(scenario, progress)
+    if key is not None:
+        _cache.set(key, response, weight=len(scenario.devices))
+    return response
 
-    # 1. Create list of Device objects from device_ids
-    devices: list[Device] = []
-    for device_id in request.device_ids:
-        device = db.get(Device, device_id)
-        if not device:
-            raise NotFoundError(f"Device with id {device_id} not found")
-        devices.append(device)
-
-    # 2. Create list of Rack objects from rack_ids
-    racks: list[Rack] = []
-    for rack_id in request.rack_ids:
-        rack = db.get(Rack, rack_id)
-        if not rack:
-            raise NotFoundError(f"Rack with id {rack_id} not found")
-        racks.append(rack)
-
-    # 3. Sort devices by powerW descending
-    devices_sorted = sorted(devices, key=lambda d: d.power_w, reverse=True)
-
-    # 4. Initialize distribution state for each rack
-    rack_state: dict[int, RackDistribution] = {}
-    for rack in racks:
-        rack_state[rack.id] = RackDistribution(
-            rack_id=rack.id,
-            rack_name=rack.name,
-            total_units=rack.total_units,
-            max_power_w=rack.max_power_w,
-            devices=[],
-            used_units=0,
-            total_power_w=0,
-            utilization_percent=0.0,
+
+def calculate_distribution_stream(
+    db: Session, request: DistributionRequest
+) -> Iterator[bytes]:
+    """
+    ``calculate_distribution`` as NDJSON: one ``rack`` line per rack with its
+    devices, then one ``unplaced`` line per unplaced device, then the
+    ``summary`` line.
+
+    Data is loaded and the plan computed before this returns, so errors still
+    surface before a response starts. The returned iterator then builds and
+    encodes one record at a time from the engine's arrays; no response model
+    of the whole fleet is ever held. A cached response is streamed as is;
+    streamed plans are not added to the cache.
+    """
+    check_selection(request)
+    _, cached = _cached(db, request)
+    if cached is not None:
+        return _iter_ndjson(
+            (rack.model_dump() for rack in cached.distribution),
+            (device.model_dump() for device in cached.unplaced_devices),
+            cached.summary,
         )
 
-    unplaced: list[UnplacedDevice] = []
+    scenario = _load_scenario(db, request)
+    engine, plan, racks = _run(scenario)
+    return _iter_ndjson(
+        _rack_records(engine, plan, scenario.devices, racks),
+        _unplaced_records(plan, scenario.devices),
+        _summary(engine, plan, total_racks=len(scenario.racks)),
+    )
 
-    # 5. Place devices one by one
-    for device in devices_sorted:
-        placed = False
 
-        # Sort racks by current utilization (ascending)
-        sorted_racks = sorted(rack_state.values(), key=lambda r: r.utilization_percent)
+def check_selection(request: DistributionRequest) -> None:
+    """Each side needs either its id list or its selector, not both."""
+    for name, ids, selector in (
+        ("device", request.device_ids, request.device_selector),
+        ("rack", request.rack_ids, request.rack_selector),
+    ):
+        if (ids is None) == (selector is None):
+            raise BadRequestError(
+                f"Give exactly one of {name}_ids and {name}_selector"
+            )
 
-        for rack_dist in sorted_racks:
-            # Check units
-            if rack_dist.used_units + device.units_required > rack_dist.total_units:
-                continue
 
-            # Check power
-            if rack_dist.total_power_w + device.power_w > rack_dist.max_power_w:
-                continue
+def calculate_distribution_batch(
+    db: Session, request: DistributionBatchRequest
+) -> BatchResult:
+    """
+    Run many what-if distributions against one snapshot of the data.
 
-            # Place device in this rack
-            rack_dist.devices.append(
-                DeviceInDistribution(
-                    id=device.id,
-                    name=device.name,
-                    power_w=device.power_w,
-                    units_required=device.units_required,
-                )
+    The union of all requested devices and racks (and, where asked for, their
+    placements) is loaded once; the scenarios then run on a process pool and
+    come back in request order. Each scenario summary gains ``elapsed_ms``,
+    the time its own run took.
+    """
+    for scenario_request in request.scenarios:
+        check_selection(scenario_request)
+    started = time.perf_counter()
+    scenarios = _load_scenarios(db, request.scenarios)
+    loaded = time.perf_counter()
+
+    total_devices = sum(len(scenario.devices) for scenario in scenarios)
+    workers = _worker_count()
+    parallel = workers > 1 and len(scenarios) > 1
+    if parallel and total_devices >= BATCH_INLINE_MAX_DEVICES:
+        executor = get_executor()
+        chunksize = max(1, math.ceil(len(scenarios) / (workers * 4)))
+        results = list(executor.map(run_scenario, scenarios, chunksize=chunksize))
+    else:
+        workers = 0
+        results = [run_scenario(scenario) for scenario in scenarios]
+    finished = time.perf_counter()
+
+    return BatchResult(
+        results=results,
+        summary={
+            "scenarios": len(results),
+            "workers": workers,
+            "load_ms": round((loaded - started) * 1000, 2),
+            "compute_ms": round((finished - loaded) * 1000, 2),
+            "total_ms": round((finished - started) * 1000, 2),
+        },
+    )
+
+
+def distribute(
+    scenario: Scenario, progress: Callable[[int, int], None] | None = None
+) -> DistributionResponse:
+    """Run the engine over loaded data; no database access."""
+    engine, plan, racks = _run(scenario, progress)
+    return _build_response(
+        engine, plan, scenario.devices, racks, total_racks=len(scenario.racks)
+    )
+
+
+def run_scenario(scenario: Scenario) -> bytes:
+    """Process pool entry point: encoded ``distribute`` result with its run time."""
+    started = time.perf_counter()
+    response = distribute(scenario)
+    response.summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return pydantic_core.to_json(response)
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Replace the in-process result cache, e.g. with a shared one."""
+    global _cache
+    _cache = backend
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Process pool shared by batch scenarios and background jobs."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Workers are spawned rather than forked: the server process runs
+            # threads (and holds pooled connections) that a fork would copy.
+            _executor = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_mark_pool_worker,
             )
-            rack_dist.used_units += device.units_required
-            rack_dist.total_power_w += device.power_w
-            rack_dist.utilization_percent = (
-                round((rack_dist.total_power_w / rack_dist.max_power_w) * 100, 2)
-                if rack_dist.max_power_w > 0
-                else 0.0
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def apply_distribution(
+    db: Session, request: DistributionApplyRequest
+) -> DistributionApplyResponse:
+    """
+    Turn a calculated plan into placements with one bulk transactional insert.
+
+    The plan must come from ``calculate_distribution`` with
+    ``respect_placements`` so that every device carries a ``start_unit``.
+    """
+    placements: dict[int, list[PlacementCreate]] = {}
+    for rack in request.distribution:
+        for device in rack.devices:
+            if device.start_unit is None:
+                raise BusinessRuleError(
+                    f"Device '{device.name}' has no start_unit; calculate the plan "
+                    f"with respect_placements=true before applying it"
+                )
+            placements.setdefault(rack.rack_id, []).append(
+                PlacementCreate(device_id=device.id, start_unit=device.start_unit)
             )
 
-            placed = True
-            break
-
-        if not placed:
-            # Determine reason for unplaced device
-            reason = _determine_unplaced_reason(device, list(rack_state.values()))
-            unplaced.append(
-                UnplacedDevice(
-                    device_id=device.id,
-                    device_name=device.name,
-                    power_w=device.power_w,
-                    units_required=device.units_required,
-                    reason=reason,
+    applied = placement_service.bulk_place_devices(db, placements)
+    return DistributionApplyResponse(applied_placements=applied, racks=len(placements))
+
+
+def calculate_rebalance(
+    db: Session, request: DistributionRebalanceRequest
+) -> DistributionRebalanceResponse:
+    """
+    Plan device moves between populated racks that bring the utilization
+    spread (over all the racks, empty ones included) down to
+    ``target_spread_percent``. Nothing is written; the moves are meant to be
+    carried out in the returned order.
+
+    See ``RebalancePlanner``: only the racks outside the target band, and the
+    receivers and donors probed for them, have their placements loaded.
+    """
+    started = time.perf_counter()
+    if request.rack_ids is None:
+        statement = select(*REBALANCE_RACK_COLUMNS).order_by(Rack.id)
+        racks = db.exec(statement).all()
+    else:
+        racks = rack_service.get_racks_by_ids(
+            db, list(dict.fromkeys(request.rack_ids)), REBALANCE_RACK_COLUMNS
+        )
+
+    planner = RebalancePlanner(
+        racks,
+        request.target_spread_percent,
+        lambda rack_ids: _placed_devices(db, rack_ids),
+    )
+    spread_before = planner.spread()
+    planned = planner.plan(request.max_moves)
+    spread_after = planner.spread()
+
+    moves = [
+        RebalanceMove(
+            device_id=move.device.device_id,
+            device_name=move.device.name,
+            power_w=move.device.power_w,
+            units_required=move.device.units_required,
+            from_rack_id=racks[move.source].id,
+            to_rack_id=racks[move.target].id,
+            start_unit=move.start_unit,
+            end_unit=move.start_unit + move.device.units_required - 1,
+        )
+        for move in planned
+    ]
+    return DistributionRebalanceResponse(
+        moves=moves,
+        summary={
+            "racks": len(racks),
+            "loaded_racks": sum(d is not None for d in planner.devices),
+            "moves": len(moves),
+            "moved_units": sum(move.units_required for move in moves),
+            "mean_utilization_percent": round(planner.mean, 2),
+            "spread_before": round(spread_before, 2),
+            "spread_after": round(spread_after, 2),
+            "target_reached": spread_after <= request.target_spread_percent + 1e-9,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        },
+    )
+
+
+def _placed_devices(db: Session, rack_ids: list[int]) -> dict[int, list[PlacedDevice]]:
+    devices: dict[int, list[PlacedDevice]] = {}
+    for row in placement_service.get_placed_devices_for_racks(db, rack_ids):
+        devices.setdefault(row.rack_id, []).append(PlacedDevice(*row[1:]))
+    return devices
+
+
+def _cached(
+    db: Session, request: DistributionRequest
+) -> tuple[str | None, DistributionResponse | None]:
+    """
+    Cache key of ``request`` and the response cached under it. Pool workers
+    run one-off jobs and scenarios, so they neither look up nor store; nor do
+    sessions that see their own uncommitted writes.
+    """
+    if _in_pool_worker or not DISTRIBUTION_TABLES.isdisjoint(
+        uncommitted_writes(db)
+    ):
+        return None, None
+    # Read before loading: a write that lands mid-run bumps the version, so
+    # this result is stored under a key that is no longer looked up
+    version = data_version_service.get_version(db, DISTRIBUTION_DATA_VERSION)
+    key = _cache_key(request, version)
+    return key, _cache.get(key)
+
+
+def _cache_key(request: DistributionRequest, version: int) -> str:
+    digest = hashlib.blake2b(
+        request.model_dump_json().encode(), digest_size=16
+    ).hexdigest()
+    return f"distribution:{version}:{digest}"
+
+
+def _run(
+    scenario: Scenario, progress: Callable[[int, int], None] | None = None
+) -> tuple[DistributionEngine, DistributionPlan, list[Any]]:
+    """Engine state and plan of ``scenario``, with the racks it ran on."""
+    # One engine slot per distinct rack, in first-requested order
+    unique_racks = list({rack.id: rack for rack in scenario.racks}.values())
+    engine = DistributionEngine(unique_racks, slot_aware=scenario.respect_placements)
+    blocked: dict[int, str] = {}
+    if scenario.respect_placements:
+        for position, rack in enumerate(unique_racks):
+            seed = scenario.seeds.get(rack.id)
+            if seed is not None:
+                engine.seed_rack(position, *seed)
+        blocked = {
+            index: f"Device is already placed in rack {scenario.placed[device.id]}"
+            for index, device in enumerate(scenario.devices)
+            if device.id in scenario.placed
+        }
+
+    plan = engine.run(scenario.devices, blocked, progress, scenario.strategy)
+    if scenario.time_budget_ms and engine.slots is None and len(engine):
+        plan = _optimize(engine, plan, scenario, blocked)
+    return engine, plan, unique_racks
+
+
+def _mark_pool_worker() -> None:
+    global _in_pool_worker
+    _in_pool_worker = True
+
+
+def _optimize(
+    engine: DistributionEngine,
+    plan: DistributionPlan,
+    scenario: Scenario,
+    blocked: dict[int, str],
+) -> DistributionPlan:
+    """
+    Run the local-search optimizer on the greedy plan, with one restart per
+    pool worker when called outside the pool.
+    """
+    units = [device.units_required for device in scenario.devices]
+    power = [device.power_w for device in scenario.devices]
+    problem = Problem(
+        units=units,
+        power=power,
+        total_units=engine.total_units.tolist(),
+        max_power_w=engine.max_power_w.tolist(),
+        assignments=plan.assignments.tolist(),
+        fixed=frozenset(blocked),
+    )
+    executor: Executor | None = None
+    restarts = 1
+    if not _in_pool_worker and _worker_count() > 1:
+        executor, restarts = get_executor(), _worker_count()
+    best = optimize(problem, scenario.time_budget_ms, executor, restarts)
+    if best.assignments == problem.assignments:
+        return plan
+
+    engine.load_assignments(best.assignments, units, power)
+    reasons = {
+        device: blocked.get(device)
+        or engine.unplaced_reason(units[device], power[device])
+        for device, position in enumerate(best.assignments)
+        if position < 0
+    }
+    return DistributionPlan(
+        order=plan.order, assignments=array("l", best.assignments), reasons=reasons
+    )
+
+
+def _worker_count() -> int:
+    return settings.DISTRIBUTION_WORKERS or os.cpu_count() or 1
+
+
+def _load_scenarios(
+    db: Session, requests: list[DistributionRequest]
+) -> list[Scenario]:
+    """
+    Load the union of all listed rows once and slice it per scenario;
+    selectors run one query per scenario.
+    """
+    device_ids = list(dict.fromkeys(i for r in requests for i in r.device_ids or ()))
+    rack_ids = list(dict.fromkeys(i for r in requests for i in r.rack_ids or ()))
+    devices = {
+        row.id: DeviceRow(*row)
+        for row in device_service.get_devices_by_ids(db, device_ids, DEVICE_COLUMNS)
+    }
+    racks = {
+        row.id: RackRow(*row)
+        for row in rack_service.get_racks_by_ids(db, rack_ids, RACK_COLUMNS)
+    }
+
+    scenarios = []
+    for request in requests:
+        if request.device_selector is None:
+            scenario_devices = [devices[i] for i in request.device_ids]
+        else:
+            scenario_devices = [
+                DeviceRow(*row)
+                for row in device_service.select_devices(
+                    db, request.device_selector, DEVICE_COLUMNS
+                )
+            ]
+        if request.rack_selector is None:
+            scenario_racks = [racks[i] for i in request.rack_ids]
+        else:
+            scenario_racks = [
+                RackRow(*row)
+                for row in rack_service.select_racks(
+                    db, request.rack_selector, RACK_COLUMNS
                 )
+            ]
+        scenarios.append(
+            Scenario(
+                devices=scenario_devices,
+                racks=scenario_racks,
+                respect_placements=request.respect_placements,
+                strategy=request.strategy,
+                time_budget_ms=request.time_budget_ms,
+            )
+        )
+
+    seeded = [
+        (request, scenario)
+        for request, scenario in zip(requests, scenarios, strict=True)
+        if request.respect_placements
+    ]
+    if seeded:
+        seeded_racks = {r.id: r for _, s in seeded for r in s.racks}
+        seeds = _placement_seeds(db, list(seeded_racks.values()))
+        placed = placement_service.get_rack_ids_for_devices(
+            db, list(dict.fromkeys(i for r, _ in seeded for i in r.device_ids or ()))
+        )
+        for request, scenario in seeded:
+            scenario.seeds = {
+                r.id: seeds[r.id] for r in scenario.racks if r.id in seeds
+            }
+            if request.device_selector is None:
+                scenario.placed = {
+                    i: placed[i] for i in request.device_ids if i in placed
+                }
+            else:
+                scenario.placed = _placed_rack_ids(db, request)
+    return scenarios
+
+
+def _load_scenario(db: Session, request: DistributionRequest) -> Scenario:
+    # 1. Load requested devices (batched or selected)
+    devices = _load_devices(db, request)
+
+    # 2. Load requested racks (batched or selected)
+    racks = _load_racks(db, request)
+
+    # 3. Current placements of the requested racks and devices
+    scenario = Scenario(
+        devices,
+        racks,
+        request.respect_placements,
+        strategy=request.strategy,
+        time_budget_ms=request.time_budget_ms,
+    )
+    if request.respect_placements:
+        scenario.seeds = _placement_seeds(db, racks)
+        scenario.placed = _placed_rack_ids(db, request)
+    return scenario
+
+
+def _load_devices(db: Session, request: DistributionRequest) -> list[Any]:
+    if request.device_selector is not None:
+        return device_service.select_devices(
+            db, request.device_selector, DEVICE_COLUMNS
+        )
+    return device_service.get_devices_by_ids(db, request.device_ids, DEVICE_COLUMNS)
+
+
+def _load_racks(db: Session, request: DistributionRequest) -> list[Any]:
+    if request.rack_selector is not None:
+        return rack_service.select_racks(db, request.rack_selector, RACK_COLUMNS)
+    return rack_service.get_racks_by_ids(db, request.rack_ids, RACK_COLUMNS)
+
+
+def _placed_rack_ids(db: Session, request: DistributionRequest) -> dict[int, int]:
+    if request.device_selector is not None:
+        return placement_service.get_rack_ids_for_device_selector(
+            db, request.device_selector
+        )
+    return placement_service.get_rack_ids_for_devices(db, request.device_ids)
+
+
+def _placement_seeds(db: Session, racks: list[Any]) -> dict[int, RackSeed]:
+    total_units = {rack.id: rack.total_units for rack in racks}
+    spans_by_rack: dict[int, list[tuple[int, int]]] = {}
+    power_by_rack: dict[int, int] = {}
+    for row in placement_service.get_placement_spans_for_racks(db, list(total_units)):
+        spans_by_rack.setdefault(row.rack_id, []).append((row.start_unit, row.end_unit))
+        power_by_rack[row.rack_id] = power_by_rack.get(row.rack_id, 0) + row.power_w
+
+    return {
+        rack_id: (
+            sum(end - start + 1 for start, end in spans),
+            power_by_rack[rack_id],
+            placement_service.free_unit_runs(total_units[rack_id], spans),
+        )
+        for rack_id, spans in spans_by_rack.items()
+    }
+
+
+def _build_response(
+    engine: DistributionEngine,
+    plan: DistributionPlan,
+    devices: list[Any],
+    racks: list[Any],
+    total_racks: int,
+) -> DistributionResponse:
+    # Models are validated in one pass over the finished plan
+    return DistributionResponse.model_validate(
+        {
+            "distribution": list(_rack_records(engine, plan, devices, racks)),
+            "unplaced_devices": list(_unplaced_records(plan, devices)),
+            "summary": _summary(engine, plan, total_racks),
+        }
+    )
+
+
+def _rack_records(
+    engine: DistributionEngine,
+    plan: DistributionPlan,
+    devices: list[Any],
+    racks: list[Any],
+) -> Iterator[dict]:
+    """``RackDistribution`` dicts in rack order, each built when it is reached."""
+    used_units = engine.used_units.tolist()
+    total_power_w = engine.total_power_w.tolist()
+    utilization_percent = engine.utilization_percent.tolist()
+    start_units = plan.start_units
+
+    # Placed devices grouped by rack; the stable sort keeps placement order
+    # within each rack, so racks list devices as they were added
+    order = np.asarray(plan.order, dtype=np.int64)
+    positions = np.asarray(plan.assignments, dtype=np.int64)[order]
+    placed = positions >= 0
+    order, positions = order[placed], positions[placed]
+    grouped = np.argsort(positions, kind="stable")
+    by_rack = order[grouped]
+    bounds = np.searchsorted(positions[grouped], np.arange(len(racks) + 1)).tolist()
+
+    for position, rack in enumerate(racks):
+        rack_devices = []
+        for index in by_rack[bounds[position] : bounds[position + 1]].tolist():
+            device = devices[index]
+            start_unit = end_unit = None
+            if start_units is not None:
+                start_unit = start_units[index]
+                end_unit = start_unit + device.units_required - 1
+            rack_devices.append(
+                {
+                    "id": device.id,
+                    "name": device.name,
+                    "power_w": device.power_w,
+                    "units_required": device.units_required,
+                    "start_unit": start_unit,
+                    "end_unit": end_unit,
+                }
             )
+        yield {
+            "rack_id": rack.id,
+            "rack_name": rack.name,
+            "total_units": rack.total_units,
+            "max_power_w": rack.max_power_w,
+            "devices": rack_devices,
+            "used_units": used_units[position],
+            "total_power_w": total_power_w[position],
+            "utilization_percent": utilization_percent[position],
+        }
+
+
+def _unplaced_records(plan: DistributionPlan, devices: list[Any]) -> Iterator[dict]:
+    """``UnplacedDevice`` dicts in the order the devices were considered."""
+    assignments = plan.assignments
+    for index in plan.order:
+        if assignments[index] < 0:
+            device = devices[index]
+            yield {
+                "device_id": device.id,
+                "device_name": device.name,
+                "power_w": device.power_w,
+                "units_required": device.units_required,
+                "reason": plan.reasons[index],
+            }
 
-    # 6. Create summary statistics
-    distribution = list(rack_state.values())
-    total_devices = len(devices)
-    placed_devices = total_devices - len(unplaced)
 
-    utilizations = [r.utilization_percent for r in distribution if r.devices]
+def _summary(
+    engine: DistributionEngine, plan: DistributionPlan, total_racks: int
+) -> dict[str, Any]:
+    assignments = np.asarray(plan.assignments, dtype=np.int64)
+    placed = assignments >= 0
+    counts = np.bincount(assignments[placed], minlength=len(engine))
+    utilizations = engine.utilization_percent[counts > 0].tolist()
+
+    total_devices = len(assignments)
+    placed_devices = int(placed.sum())
     avg_utilization = (
         round(sum(utilizations) / len(utilizations), 2) if utilizations else 0.0
     )
     max_utilization = max(utilizations) if utilizations else 0.0
     min_utilization = min(utilizations) if utilizations else 0.0
 
-    summary = {
+    return {
         "total_devices": total_devices,
         "placed_devices": placed_devices,
-        "unplaced_devices": len(unplaced),
-        "total_racks": len(racks),
+        "unplaced_devices": total_devices - placed_devices,
+        "total_racks": total_racks,
         "average_utilization_percent": avg_utilization,
         "max_utilization_percent": max_utilization,
         "min_utilization_percent": min_utilization,
         "utilization_spread": round(max_utilization - min_utilization, 2),
     }
 
-    return DistributionResponse(
-        distribution=distribution,
-        unplaced_devices=unplaced,
-        summary=summary,
-    )
-
 
-def _determine_unplaced_reason(device: Device, racks: list[RackDistribution]) -> str:
-    if not racks:
-        return "No racks available"
-
-    has_units = any(
-        r.total_units - r.used_units >= device.units_required for r in racks
+def _iter_ndjson(
+    racks: Iterable[dict], unplaced: Iterable[dict], summary: dict[str, Any]
+) -> Iterator[bytes]:
+    """
+    One JSON line per rack, then per unplaced device, then the summary, each
+    tagged with its ``type``; lines are sent in chunks of about
+    ``NDJSON_CHUNK_BYTES``.
+    """
+    records = chain(
+        ({"type": "rack", **record} for record in racks),
+        ({"type": "unplaced", **record} for record in unplaced),
+        ({"type": "summary", **summary},),
     )
-
-    has_power = any(r.max_power_w - r.total_power_w >= device.power_w for r in racks)
-
-    if not has_units and not has_power:
-        return "No rack has enough units or power capacity"
-    elif not has_units:
-        return f"No rack has {device.units_required} free units"
-    elif not has_power:
-        return f"No rack has {device.power_w}W available power"
-    else:
-        return "No rack has both enough units and power capacity"
+    buffer = bytearray()
+    for record in records:
+        buffer += pydantic_core.to_json(record)
+        buffer += b"\n"
+        if len(buffer) >= NDJSON_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
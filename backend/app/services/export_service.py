@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from typing import Any, Literal
+
+from app.models.device import Device
+from app.models.placement import RackPlacement
+from app.models.rack import Rack
+from sqlalchemy import select
+from sqlmodel import Session
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows fetched from the server-side cursor and serialized per chunk
+EXPORT_BATCH_SIZE = 5000
+
+# Reused: json.dumps with non-default options builds a new encoder per call
+_json_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def iter_export(
+    db: Session,
+    table: type[Device] | type[Rack] | type[RackPlacement],
+    export_format: ExportFormat,
+) -> Iterator[bytes]:
+    """
+    Serialize every row of ``table`` in id order, one chunk per fetched batch.
+
+    Rows are streamed from the database with ``yield_per`` (a server-side
+    cursor on Postgres) as plain tuples, so memory stays bounded by
+    ``EXPORT_BATCH_SIZE`` however large the table is.
+    """
+    id_column = table.__table__.c.id
+    columns = [id_column, *(c for c in table.__table__.columns if c is not id_column)]
+    statement = (
+        select(*columns)
+        .order_by(id_column)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    result = db.execute(statement)
+    keys = list(result.keys())
+    if export_format == "csv":
+        yield _csv_chunk([keys])
+        for rows in result.partitions():
+            yield _csv_chunk(rows)
+    else:
+        for rows in result.partitions():
+            yield _ndjson_chunk(keys, rows)
+
+
+def _ndjson_chunk(columns: list[str], rows: Sequence[Any]) -> bytes:
+    return "".join(
+        _json_encode(dict(zip(columns, row, strict=True))) + "\n" for row in rows
+    ).encode()
+
+
+def _csv_chunk(rows: Sequence[Any]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
@@ -0,0 +1,214 @@
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.database import chunked
+from app.exceptions import BadRequestError
+from app.models.bulk import BulkImportResponse, BulkRowError
+from app.models.device import Device, DeviceCreate
+from app.models.rack import Rack, RackCreate
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, select
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+CSV_MEDIA_TYPES = {"text/csv"}
+
+# Rows validated, checked and inserted per round-trip
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# (1-based data row number, parsed record or None, parse error or None)
+ImportRow = tuple[int, dict[str, Any] | None, str | None]
+
+
+async def import_stream(
+    db: Session,
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    table: type[Device] | type[Rack],
+    schema: type[DeviceCreate] | type[RackCreate],
+) -> BulkImportResponse:
+    """
+    Import an NDJSON or CSV upload while it streams in.
+
+    Rows are collected into batches of ``IMPORT_BATCH_SIZE``; each batch is
+    validated and inserted in the threadpool and committed on its own, so
+    memory stays bounded by the batch size. Invalid rows are reported and
+    skipped.
+    """
+    result = BulkImportResponse()
+    batch: list[ImportRow] = []
+    async for row in iter_import_rows(chunks, content_type):
+        batch.append(row)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await run_in_threadpool(import_batch, db, table, schema, batch, result)
+            batch = []
+    if batch:
+        await run_in_threadpool(import_batch, db, table, schema, batch, result)
+    return result
+
+
+async def iter_import_rows(
+    chunks: AsyncIterator[bytes], content_type: str
+) -> AsyncIterator[ImportRow]:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        rows = _iter_ndjson(chunks)
+    elif media_type in CSV_MEDIA_TYPES:
+        rows = _iter_csv(chunks)
+    else:
+        raise BadRequestError(
+            "Upload must be NDJSON (application/x-ndjson) or CSV (text/csv)"
+        )
+    async for row in rows:
+        yield row
+
+
+def import_batch(
+    db: Session,
+    table: type[Device] | type[Rack],
+    schema: type[DeviceCreate] | type[RackCreate],
+    rows: list[ImportRow],
+    result: BulkImportResponse,
+) -> None:
+    """Validate one batch, check serial numbers with one query and bulk insert it."""
+    valid: list[tuple[int, dict[str, Any]]] = []
+    for row_number, data, error in rows:
+        if error is None:
+            try:
+                valid.append((row_number, schema.model_validate(data).model_dump()))
+                continue
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                )
+        _add_error(result, row_number, error)
+
+    # A concurrent writer can still take a serial number between the check
+    # and the insert; the batch is then re-checked once before giving up.
+    for _attempt in range(2):
+        to_insert = _drop_duplicate_serials(db, table, valid, result)
+        if not to_insert:
+            return
+        try:
+            db.execute(insert(table), [data for _, data in to_insert])
+            db.commit()
+            result.created += len(to_insert)
+            return
+        except IntegrityError:
+            db.rollback()
+            valid = to_insert
+
+    for row_number, data in valid:
+        _add_error(
+            result,
+            row_number,
+            f"Serial number '{data['serial_number']}' could not be inserted",
+        )
+
+
+def _drop_duplicate_serials(
+    db: Session,
+    table: type[Device] | type[Rack],
+    rows: list[tuple[int, dict[str, Any]]],
+    result: BulkImportResponse,
+) -> list[tuple[int, dict[str, Any]]]:
+    label = table.__name__
+    serials = [data["serial_number"] for _, data in rows]
+    existing: set[str] = set()
+    for chunk in chunked(list(set(serials))):
+        statement = select(table.serial_number).where(
+            col(table.serial_number).in_(chunk)
+        )
+        existing.update(db.exec(statement).all())
+
+    kept = []
+    seen: set[str] = set()
+    for row_number, data in rows:
+        serial = data["serial_number"]
+        if serial in existing or serial in seen:
+            _add_error(
+                result, row_number, f"{label} with serial number '{serial}' already exists"
+            )
+            continue
+        seen.add(serial)
+        kept.append((row_number, data))
+    return kept
+
+
+def _add_error(result: BulkImportResponse, row_number: int, detail: str) -> None:
+    result.failed += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(BulkRowError(row=row_number, detail=detail))
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into lines, keeping line endings."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # The last piece may be an incomplete line
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRow]:
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, data, None
+
+
+async def _iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRow]:
+    header: list[str] | None = None
+    row_number = 0
+    record = ""
+    async for line in _iter_lines(chunks):
+        record += line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row_number += 1
+        if len(values) != len(header):
+            yield row_number, None, (
+                f"Expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+        # Empty cells mean "not provided" so optional fields fall back to defaults
+        yield row_number, {
+            name: value
+            for name, value in zip(header, values, strict=True)
+            if value != ""
+        }, None
+    if record.strip():
+        yield row_number + 1, None, "Unterminated quoted field"
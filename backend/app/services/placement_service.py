@@ -1,8 +1,22 @@
+from collections.abc import Iterable
+from typing import Any
+
+from app.database import chunked, run_with_retry
 from app.exceptions import BusinessRuleError, ConflictError, NotFoundError
 from app.models.device import Device
-from app.models.placement import PlacementCreate, RackPlacement
+from app.models.distribution import DeviceSelector
+from app.models.placement import FreeSlot, PlacementCreate, RackPlacement
 from app.models.rack import Rack
-from sqlmodel import Session, select
+from app.services import device_service, rack_service
+from sqlalchemy import exists, insert, literal, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Conflicts listed in a bulk placement error before the rest are summarized
+MAX_REPORTED_CONFLICTS = 20
+# Default number of candidates returned by the free-slot search
+FREE_SLOTS_LIMIT = 20
 
 
 def get_placements_for_rack(db: Session, rack_id: int) -> list[RackPlacement]:
@@ -15,31 +29,231 @@ def get_placement_by_device(db: Session, device_id: int) -> RackPlacement | None
     return db.exec(statement).first()
 
 
-def get_occupied_units(db: Session, rack_id: int) -> set[int]:
-    placements = get_placements_for_rack(db, rack_id)
-    occupied = set()
-    for p in placements:
-        occupied.update(range(p.start_unit, p.end_unit + 1))
-    return occupied
+def get_placement_spans_for_racks(db: Session, rack_ids: list[int]) -> list[Any]:
+    """
+    Occupied spans of the given racks with the power of the placed device.
+
+    Rows carry ``rack_id``, ``start_unit``, ``end_unit`` and ``power_w`` and are
+    ordered by rack, then start unit.
+    """
+    rows: list[Any] = []
+    for chunk in chunked(list(dict.fromkeys(rack_ids))):
+        statement = (
+            select(
+                RackPlacement.rack_id,
+                RackPlacement.start_unit,
+                RackPlacement.end_unit,
+                Device.power_w,
+            )
+            .join(Device, RackPlacement.device_id == Device.id)
+            .where(col(RackPlacement.rack_id).in_(chunk))
+            .order_by(RackPlacement.rack_id, RackPlacement.start_unit)
+        )
+        rows.extend(db.exec(statement).all())
+    return rows
 
 
-def get_current_power(db: Session, rack_id: int) -> int:
-    statement = (
-        select(Device)
-        .join(RackPlacement, RackPlacement.device_id == Device.id)
-        .where(RackPlacement.rack_id == rack_id)
+def get_placed_devices_for_racks(db: Session, rack_ids: list[int]) -> list[Any]:
+    """
+    Devices placed in the given racks.
+
+    Rows carry ``rack_id``, ``device_id``, ``name``, ``power_w``,
+    ``units_required`` and ``start_unit`` and are ordered by rack, then start
+    unit.
+    """
+    rows: list[Any] = []
+    for chunk in chunked(list(dict.fromkeys(rack_ids))):
+        statement = (
+            select(
+                RackPlacement.rack_id,
+                RackPlacement.device_id,
+                Device.name,
+                Device.power_w,
+                Device.units_required,
+                RackPlacement.start_unit,
+            )
+            .join(Device, RackPlacement.device_id == Device.id)
+            .where(col(RackPlacement.rack_id).in_(chunk))
+            .order_by(RackPlacement.rack_id, RackPlacement.start_unit)
+        )
+        rows.extend(db.exec(statement).all())
+    return rows
+
+
+def get_rack_ids_for_devices(db: Session, device_ids: list[int]) -> dict[int, int]:
+    """Map each placed device among ``device_ids`` to the rack holding it."""
+    placed: dict[int, int] = {}
+    for chunk in chunked(list(dict.fromkeys(device_ids))):
+        statement = select(RackPlacement.device_id, RackPlacement.rack_id).where(
+            col(RackPlacement.device_id).in_(chunk)
+        )
+        placed.update(db.exec(statement).all())
+    return placed
+
+
+def get_rack_ids_for_device_selector(
+    db: Session, selector: DeviceSelector
+) -> dict[int, int]:
+    """Map each placed device matching ``selector`` to the rack holding it."""
+    selected = device_service.selection_statement(selector, (Device.id,))
+    statement = select(RackPlacement.device_id, RackPlacement.rack_id).where(
+        col(RackPlacement.device_id).in_(selected)
     )
-    devices = db.exec(statement).all()
-    return sum(d.power_w for d in devices)
+    return dict(db.exec(statement).all())
+
+
+def free_unit_runs(
+    total_units: int, spans: Iterable[tuple[int, int]]
+) -> list[tuple[int, int]]:
+    """
+    Free ``(start_unit, length)`` runs of a rack.
+
+    ``spans`` are the occupied ``(start_unit, end_unit)`` ranges sorted by
+    start unit; units are numbered from 1 to ``total_units``.
+    """
+    runs = []
+    next_free = 1
+    for start_unit, end_unit in spans:
+        if start_unit > next_free:
+            runs.append((next_free, start_unit - next_free))
+        next_free = max(next_free, end_unit + 1)
+    if next_free <= total_units:
+        runs.append((next_free, total_units - next_free + 1))
+    return runs
+
+
+def find_free_slots(
+    db: Session,
+    units: int,
+    power_w: int = 0,
+    rack_id: int | None = None,
+    limit: int = FREE_SLOTS_LIMIT,
+) -> list[FreeSlot]:
+    """
+    Positions where a device of ``units``/``power_w`` fits right now, best
+    fit first, across all racks or only ``rack_id``.
+    """
+    rows = db.exec(_free_slots_statement(units, power_w, rack_id, limit)).all()
+    return _free_slots(rows, units)
+
+
+async def find_free_slots_async(
+    db: AsyncSession,
+    units: int,
+    power_w: int = 0,
+    rack_id: int | None = None,
+    limit: int = FREE_SLOTS_LIMIT,
+) -> list[FreeSlot]:
+    statement = _free_slots_statement(units, power_w, rack_id, limit)
+    return _free_slots((await db.exec(statement)).all(), units)
+
+
+def _free_slots_statement(units: int, power_w: int, rack_id: int | None, limit: int):
+    """
+    Free runs of every candidate rack, ranked and cut to ``limit`` in SQL.
+
+    Gaps come from one ordered pass over the (rack_id, start_unit) span index:
+    the run after each placement ends where the next one starts (``LEAD``),
+    plus the run before a rack's first placement and whole empty racks.
+    Placements never overlap, so no running maximum is needed.
+
+    Ranking is best fit: shortest fitting run, then least power headroom, so
+    large gaps and spare power stay free for larger devices.
+    """
+    available_power_w = Rack.max_power_w - Rack.current_power_w
+    # Counter-based pre-filter: racks without enough free units or power in
+    # total cannot have a fitting run
+    filters = [
+        Rack.total_units - Rack.used_units >= units,
+        available_power_w >= power_w,
+    ]
+    if rack_id is not None:
+        filters.append(Rack.id == rack_id)
+
+    next_start = func.lead(RackPlacement.start_unit, 1, Rack.total_units + 1).over(
+        partition_by=RackPlacement.rack_id, order_by=RackPlacement.start_unit
+    )
+    after_placements = (
+        select(
+            RackPlacement.rack_id.label("rack_id"),
+            (RackPlacement.end_unit + 1).label("start_unit"),
+            (next_start - RackPlacement.end_unit - 1).label("length"),
+        )
+        .join(Rack, Rack.id == RackPlacement.rack_id)
+        .where(*filters)
+    )
+    before_first = (
+        select(
+            RackPlacement.rack_id,
+            literal(1),
+            func.min(RackPlacement.start_unit) - 1,
+        )
+        .join(Rack, Rack.id == RackPlacement.rack_id)
+        .where(*filters)
+        .group_by(RackPlacement.rack_id)
+    )
+    empty_racks = select(Rack.id, literal(1), Rack.total_units).where(
+        *filters, ~exists().where(RackPlacement.rack_id == Rack.id)
+    )
+    runs = union_all(after_placements, before_first, empty_racks).subquery()
+
+    return (
+        select(
+            runs.c.rack_id,
+            Rack.name,
+            runs.c.start_unit,
+            runs.c.length,
+            available_power_w.label("available_power_w"),
+        )
+        .join(Rack, Rack.id == runs.c.rack_id)
+        .where(runs.c.length >= units)
+        .order_by(runs.c.length, available_power_w, runs.c.rack_id, runs.c.start_unit)
+        .limit(limit)
+    )
+
+
+def _free_slots(rows: list[Any], units: int) -> list[FreeSlot]:
+    return [
+        FreeSlot(
+            rack_id=row.rack_id,
+            rack_name=row.name,
+            start_unit=row.start_unit,
+            end_unit=row.start_unit + units - 1,
+            free_run_units=row.length,
+            available_power_w=row.available_power_w,
+        )
+        for row in rows
+    ]
+
+
+def get_overlapping_placements(
+    db: Session, rack_id: int, start_unit: int, end_unit: int
+) -> list[RackPlacement]:
+    """Placements in the rack whose span intersects ``start_unit..end_unit``."""
+    statement = select(RackPlacement).where(
+        RackPlacement.rack_id == rack_id,
+        RackPlacement.start_unit <= end_unit,
+        RackPlacement.end_unit >= start_unit,
+    )
+    return db.exec(statement).all()
+
+
+def get_current_power(db: Session, rack_id: int) -> int:
+    statement = select(Rack.current_power_w).where(Rack.id == rack_id)
+    return db.exec(statement).first() or 0
 
 
 def place_device(
     db: Session, rack_id: int, placement_data: PlacementCreate
 ) -> RackPlacement:
+    return run_with_retry(db, lambda: _place_device(db, rack_id, placement_data))
 
-    rack = db.get(Rack, rack_id)
-    if not rack:
-        raise NotFoundError(f"Rack with id {rack_id} not found")
+
+def _place_device(
+    db: Session, rack_id: int, placement_data: PlacementCreate
+) -> RackPlacement:
+    # Held until commit, so the checks below cannot race another placement
+    rack = rack_service.lock_racks(db, [rack_id])[rack_id]
 
     device = db.get(Device, placement_data.device_id)
     if not device:
@@ -60,22 +274,24 @@ def place_device(
             f"but rack '{rack.name}' only has {rack.total_units} units"
         )
 
-    occupied = get_occupied_units(db, rack_id)
-    requested_units = set(range(start_unit, end_unit + 1))
-    overlap = occupied & requested_units
-    if overlap:
-        raise BusinessRuleError(
-            f"Units {sorted(overlap)} are already occupied in rack '{rack.name}'"
+    overlapping = get_overlapping_placements(db, rack_id, start_unit, end_unit)
+    if overlapping:
+        overlap = sorted(
+            {
+                unit
+                for p in overlapping
+                for unit in range(
+                    max(p.start_unit, start_unit), min(p.end_unit, end_unit) + 1
+                )
+            }
         )
-
-    current_power = get_current_power(db, rack_id)
-    if current_power + device.power_w > rack.max_power_w:
         raise BusinessRuleError(
-            f"Adding device '{device.name}' ({device.power_w}W) would exceed rack power capacity. "
-            f"Current: {current_power}W, Max: {rack.max_power_w}W, "
-            f"Available: {rack.max_power_w - current_power}W"
+            f"Units {overlap} are already occupied in rack '{rack.name}'"
         )
 
+    if rack.current_power_w + device.power_w > rack.max_power_w:
+        raise _power_exceeded(rack, device)
+
     placement = RackPlacement(
         rack_id=rack_id,
         device_id=device.id,
@@ -83,11 +299,148 @@ def place_device(
         end_unit=end_unit,
     )
     db.add(placement)
-    db.commit()
+    # Re-checks the power limit in the UPDATE itself, in case another
+    # placement landed since the rack was read
+    if not rack_service.adjust_rack_usage(
+        db, rack_id, device.units_required, device.power_w, enforce_power_limit=True
+    ):
+        db.rollback()
+        raise _power_exceeded(rack_service.get_rack(db, rack_id), device)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Unique device or (Postgres) unit-range exclusion constraint
+        db.rollback()
+        raise ConflictError(
+            f"Units {start_unit}-{end_unit} of rack '{rack.name}' or device "
+            f"'{device.name}' were placed concurrently"
+        )
     db.refresh(placement)
     return placement
 
 
+def _power_exceeded(rack: Rack, device: Device) -> BusinessRuleError:
+    return BusinessRuleError(
+        f"Adding device '{device.name}' ({device.power_w}W) would exceed rack power capacity. "
+        f"Current: {rack.current_power_w}W, Max: {rack.max_power_w}W, "
+        f"Available: {rack.max_power_w - rack.current_power_w}W"
+    )
+
+
+def bulk_place_devices(
+    db: Session, placements: dict[int, list[PlacementCreate]]
+) -> int:
+    """
+    Place many devices (grouped by rack id) in one transaction.
+
+    Everything is validated against the current state with set-based queries
+    (rack size, unit overlaps with existing and new placements, power, devices
+    already placed) before a single bulk insert. The racks stay locked from
+    the checks to the commit. Any conflict rolls the whole batch back.
+    Returns the number of placements written.
+    """
+    items = [(rack_id, p) for rack_id, group in placements.items() for p in group]
+    if not items:
+        return 0
+    return run_with_retry(db, lambda: _bulk_place_devices(db, placements, items))
+
+
+def _bulk_place_devices(
+    db: Session,
+    placements: dict[int, list[PlacementCreate]],
+    items: list[tuple[int, PlacementCreate]],
+) -> int:
+    racks = rack_service.lock_racks(db, list(placements))
+    device_ids = [p.device_id for _, p in items]
+    devices = {
+        device.id: device
+        for device in device_service.get_devices_by_ids(
+            db,
+            device_ids,
+            (Device.id, Device.name, Device.units_required, Device.power_w),
+        )
+    }
+
+    conflicts: list[str] = []
+    seen_devices: set[int] = set()
+    for device_id in device_ids:
+        if device_id in seen_devices:
+            conflicts.append(f"Device {device_id} appears more than once in the plan")
+        seen_devices.add(device_id)
+    for device_id, rack_id in get_rack_ids_for_devices(db, device_ids).items():
+        conflicts.append(
+            f"Device '{devices[device_id].name}' is already placed in rack {rack_id}"
+        )
+
+    spans: dict[int, list[tuple[int, int, str]]] = {rack_id: [] for rack_id in racks}
+    power: dict[int, int] = dict.fromkeys(racks, 0)
+    for row in get_placement_spans_for_racks(db, list(racks)):
+        spans[row.rack_id].append((row.start_unit, row.end_unit, "existing placement"))
+        power[row.rack_id] += row.power_w
+
+    rows = []
+    for rack_id, placement in items:
+        rack = racks[rack_id]
+        device = devices[placement.device_id]
+        start_unit = placement.start_unit
+        end_unit = start_unit + device.units_required - 1
+        if end_unit > rack.total_units:
+            conflicts.append(
+                f"Device '{device.name}' requires units {start_unit}-{end_unit}, "
+                f"but rack '{rack.name}' only has {rack.total_units} units"
+            )
+        spans[rack_id].append((start_unit, end_unit, f"device '{device.name}'"))
+        power[rack_id] += device.power_w
+        rows.append(
+            {
+                "rack_id": rack_id,
+                "device_id": device.id,
+                "start_unit": start_unit,
+                "end_unit": end_unit,
+            }
+        )
+
+    for rack_id, rack_spans in spans.items():
+        rack = racks[rack_id]
+        rack_spans.sort()
+        # Furthest-reaching span so far; any later span starting inside it overlaps
+        reach_end, reach_owner = 0, ""
+        for start, end, owner in rack_spans:
+            if start <= reach_end:
+                conflicts.append(
+                    f"Units {start}-{min(end, reach_end)} of rack '{rack.name}' are "
+                    f"claimed by both {reach_owner} and {owner}"
+                )
+            if end > reach_end:
+                reach_end, reach_owner = end, owner
+        if power[rack_id] > rack.max_power_w:
+            conflicts.append(
+                f"Rack '{rack.name}' would draw {power[rack_id]}W, "
+                f"exceeding its {rack.max_power_w}W capacity"
+            )
+
+    if conflicts:
+        listed = conflicts[:MAX_REPORTED_CONFLICTS]
+        if len(conflicts) > len(listed):
+            listed.append(f"... and {len(conflicts) - len(listed)} more")
+        raise BusinessRuleError("Cannot apply placements: " + "; ".join(listed))
+
+    try:
+        db.execute(insert(RackPlacement), rows)
+        for rack_id, placed in placements.items():
+            rack_service.adjust_rack_usage(
+                db,
+                rack_id,
+                sum(devices[p.device_id].units_required for p in placed),
+                sum(devices[p.device_id].power_w for p in placed),
+            )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ConflictError("Placements changed while applying; nothing was written")
+    return len(rows)
+
+
 def remove_device_from_rack(db: Session, rack_id: int, device_id: int) -> None:
     rack = db.get(Rack, rack_id)
     if not rack:
@@ -101,7 +454,9 @@ def remove_device_from_rack(db: Session, rack_id: int, device_id: int) -> None:
     if not placement:
         raise NotFoundError(f"Device {device_id} is not placed in rack {rack_id}")
 
+    device = db.get(Device, device_id)
     db.delete(placement)
+    rack_service.adjust_rack_usage(db, rack_id, -device.units_required, -device.power_w)
     db.commit()
 
 
@@ -111,24 +466,34 @@ def get_rack_devices(db: Session, rack_id: int) -> list[dict]:
     if not rack:
         raise NotFoundError(f"Rack with id {rack_id} not found")
 
-    statement = (
-        select(RackPlacement, Device)
+    results = db.exec(_rack_devices_statement(rack_id)).all()
+    return [row._asdict() for row in results]
+
+
+async def get_rack_devices_async(db: AsyncSession, rack_id: int) -> list[dict]:
+
+    rack = await db.get(Rack, rack_id)
+    if not rack:
+        raise NotFoundError(f"Rack with id {rack_id} not found")
+
+    results = (await db.exec(_rack_devices_statement(rack_id))).all()
+    return [row._asdict() for row in results]
+
+
+def _rack_devices_statement(rack_id: int):
+    # Only the PlacementReadWithDevice columns, already under their field names
+    return (
+        select(
+            RackPlacement.id,
+            RackPlacement.rack_id,
+            RackPlacement.device_id,
+            RackPlacement.start_unit,
+            RackPlacement.end_unit,
+            Device.name.label("device_name"),
+            Device.power_w.label("device_power_w"),
+            Device.units_required.label("device_units_required"),
+        )
         .join(Device, RackPlacement.device_id == Device.id)
         .where(RackPlacement.rack_id == rack_id)
         .order_by(RackPlacement.start_unit)
     )
-    results = db.exec(statement).all()
-
-    return [
-        {
-            "id": placement.id,
-            "rack_id": placement.rack_id,
-            "device_id": placement.device_id,
-            "start_unit": placement.start_unit,
-            "end_unit": placement.end_unit,
-            "device_name": device.name,
-            "device_power_w": device.power_w,
-            "device_units_required": device.units_required,
-        }
-        for placement, device in results
-    ]
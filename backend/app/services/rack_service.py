@@ -1,14 +1,50 @@
+from collections.abc import Sequence
+from typing import Any
+
+from app.database import chunked
 from app.exceptions import BusinessRuleError, ConflictError, NotFoundError
+from app.models.device import Device
+from app.models.distribution import RackSelector
 from app.models.placement import RackPlacement
-from app.models.rack import Rack, RackCreate, RackUpdate
-from sqlmodel import Session, select
+from app.models.rack import (Rack, RackCreate, RackRead, RackReadWithPower,
+                             RackUpdate)
+from app.pagination import SortKey, paginate
+from app.responses import read_columns
+from sqlalchemy import false, or_, update
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Projections for list endpoints that encode rows without ORM objects
+RACK_READ_COLUMNS = read_columns(Rack, RackRead)
+RACK_STATS_COLUMNS = (*RACK_READ_COLUMNS, Rack.used_units, Rack.current_power_w)
 
 
-def get_racks(db: Session, skip: int = 0, limit: int = 100) -> list[Rack]:
-    statement = select(Rack).offset(skip).limit(limit)
+def get_racks(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    columns: tuple[Any, ...] | None = None,
+) -> list[Any]:
+    statement = select(*columns) if columns else select(Rack)
+    statement = paginate(statement, Rack, skip, limit, cursor, order_by)
     return db.exec(statement).all()
 
 
+async def get_racks_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+    columns: tuple[Any, ...] | None = None,
+) -> list[Any]:
+    statement = select(*columns) if columns else select(Rack)
+    statement = paginate(statement, Rack, skip, limit, cursor, order_by)
+    return (await db.exec(statement)).all()
+
+
 def get_rack(db: Session, rack_id: int) -> Rack:
     rack = db.get(Rack, rack_id)
     if not rack:
@@ -16,6 +52,113 @@ def get_rack(db: Session, rack_id: int) -> Rack:
     return rack
 
 
+async def get_rack_async(db: AsyncSession, rack_id: int) -> Rack:
+    rack = await db.get(Rack, rack_id)
+    if not rack:
+        raise NotFoundError(f"Rack with id {rack_id} not found")
+    return rack
+
+
+def lock_racks(db: Session, rack_ids: list[int]) -> dict[int, Rack]:
+    """
+    Lock the racks' rows until the transaction ends and return them fresh.
+
+    Placement checks made after this cannot be invalidated by a concurrent
+    writer to the same racks. Postgres takes row locks (``FOR UPDATE``) in id
+    order, so writers touching several racks cannot deadlock. SQLite has no
+    row locks; a no-op UPDATE takes its database write lock up front instead.
+    """
+    unique_ids = sorted(set(rack_ids))
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(
+            update(Rack)
+            .where(col(Rack.id).in_(unique_ids[:1]))
+            .values(id=Rack.id)
+            .execution_options(synchronize_session=False)
+        )
+
+    racks: dict[int, Rack] = {}
+    for chunk in chunked(unique_ids):
+        statement = (
+            select(Rack)
+            .where(col(Rack.id).in_(chunk))
+            .order_by(Rack.id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        racks.update((rack.id, rack) for rack in db.exec(statement))
+
+    missing = [rack_id for rack_id in unique_ids if rack_id not in racks]
+    if len(missing) == 1:
+        raise NotFoundError(f"Rack with id {missing[0]} not found")
+    if missing:
+        raise NotFoundError(f"Racks with ids {missing} not found")
+    return racks
+
+
+def get_racks_by_ids(
+    db: Session, rack_ids: list[int], columns: tuple[Any, ...] | None = None
+) -> list[Any]:
+    """
+    Load racks with one ``IN (...)`` query per chunk of unique ids.
+
+    Results follow ``rack_ids`` order (duplicates included). When ``columns``
+    is given only those columns are selected and rows are returned instead of
+    ``Rack`` objects; ``Rack.id`` must be one of them.
+    """
+    unique_ids = list(dict.fromkeys(rack_ids))
+    found: dict[int, Any] = {}
+    for chunk in chunked(unique_ids):
+        statement = (
+            select(*columns) if columns else select(Rack)
+        ).where(col(Rack.id).in_(chunk))
+        for row in db.exec(statement):
+            found[row.id] = row
+
+    missing = [rack_id for rack_id in unique_ids if rack_id not in found]
+    if len(missing) == 1:
+        raise NotFoundError(f"Rack with id {missing[0]} not found")
+    if missing:
+        raise NotFoundError(f"Racks with ids {missing} not found")
+
+    return [found[rack_id] for rack_id in rack_ids]
+
+
+def select_racks(
+    db: Session, selector: RackSelector, columns: tuple[Any, ...]
+) -> list[Any]:
+    """
+    Rows of ``columns`` for the racks matching every filter of ``selector``,
+    in id order, from one query. Free capacity is judged by the usage
+    counters.
+    """
+    filters = []
+    if selector.id_ranges is not None:
+        filters.append(
+            or_(
+                false(),
+                *(col(Rack.id).between(r.first, r.last) for r in selector.id_ranges),
+            )
+        )
+    if selector.name_prefix is not None:
+        filters.append(col(Rack.name).startswith(selector.name_prefix, autoescape=True))
+    if selector.serial_prefix is not None:
+        filters.append(
+            col(Rack.serial_number).startswith(selector.serial_prefix, autoescape=True)
+        )
+    free_units = Rack.total_units - Rack.used_units
+    free_power_w = Rack.max_power_w - Rack.current_power_w
+    if selector.with_free_capacity:
+        filters.extend([free_units > 0, free_power_w > 0])
+    if selector.min_free_units is not None:
+        filters.append(free_units >= selector.min_free_units)
+    if selector.min_free_power_w is not None:
+        filters.append(free_power_w >= selector.min_free_power_w)
+
+    statement = select(*columns).where(*filters).order_by(Rack.id)
+    return db.exec(statement).all()
+
+
 def get_rack_by_serial(db: Session, serial_number: str) -> Rack | None:
     statement = select(Rack).where(Rack.serial_number == serial_number)
     return db.exec(statement).first()
@@ -75,27 +218,171 @@ def delete_rack(db: Session, rack_id: int, force: bool = False) -> None:
     db.commit()
 
 
-def calculate_rack_stats(db: Session, rack: Rack) -> dict:
-    from app.models.device import Device
-    from app.models.placement import RackPlacement
+def get_racks_with_stats(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+) -> list[dict]:
+    rows = get_racks(db, skip, limit, cursor, order_by, columns=RACK_STATS_COLUMNS)
+    return [_rack_stats_dict(row) for row in rows]
 
-    statement = (
-        select(Device)
-        .join(RackPlacement, RackPlacement.device_id == Device.id)
-        .where(RackPlacement.rack_id == rack.id)
+
+async def get_racks_with_stats_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    order_by: SortKey = "id",
+) -> list[dict]:
+    rows = await get_racks_async(
+        db, skip, limit, cursor, order_by, columns=RACK_STATS_COLUMNS
     )
-    devices = db.exec(statement).all()
+    return [_rack_stats_dict(row) for row in rows]
+
+
+def rack_with_stats(rack: Rack) -> RackReadWithPower:
+    return RackReadWithPower.model_validate(
+        {**rack.model_dump(), **calculate_rack_stats(rack)}
+    )
+
+
+def _rack_stats_dict(row: Any) -> dict:
+    return {**row._asdict(), **calculate_rack_stats(row)}
 
-    current_power_w = sum(d.power_w for d in devices)
-    used_units = sum(d.units_required for d in devices)
 
+def calculate_rack_stats(rack: Any) -> dict:
     return {
-        "current_power_w": current_power_w,
-        "used_units": used_units,
-        "available_units": rack.total_units - used_units,
+        "current_power_w": rack.current_power_w,
+        "used_units": rack.used_units,
+        "available_units": rack.total_units - rack.used_units,
         "power_utilization_percent": (
-            round((current_power_w / rack.max_power_w) * 100, 2)
+            round((rack.current_power_w / rack.max_power_w) * 100, 2)
             if rack.max_power_w > 0
             else 0.0
         ),
     }
+
+
+def adjust_rack_usage(
+    db: Session,
+    rack_id: int,
+    units: int,
+    power_w: int,
+    enforce_power_limit: bool = False,
+) -> bool:
+    """
+    Shift the rack's ``used_units``/``current_power_w`` counters in one UPDATE.
+
+    The increment happens in the database, so concurrent writers never lose
+    each other's changes. With ``enforce_power_limit`` the update only applies
+    if the rack stays within ``max_power_w``; returns whether a row changed.
+    Committing is left to the caller.
+    """
+    statement = (
+        update(Rack)
+        .where(col(Rack.id) == rack_id)
+        .values(
+            used_units=Rack.used_units + units,
+            current_power_w=Rack.current_power_w + power_w,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if enforce_power_limit:
+        statement = statement.where(Rack.current_power_w + power_w <= Rack.max_power_w)
+    return db.execute(statement).rowcount == 1
+
+
+def find_rack_usage_drift(
+    db: Session, rack_ids: list[int] | None = None
+) -> list[dict]:
+    """
+    Racks (all of them, or those in ``rack_ids``) whose counters disagree
+    with the placements actually stored.
+    """
+    if rack_ids is not None:
+        return [
+            row
+            for chunk in chunked(sorted(set(rack_ids)))
+            for row in _rack_usage_drift(db, chunk)
+        ]
+    return _rack_usage_drift(db)
+
+
+def reconcile_rack_usage(db: Session, repair: bool = True) -> list[dict]:
+    """
+    Report counter drift and, with ``repair``, reset it from the placements.
+
+    The drifting racks are locked and their drift read again before the
+    reset, so a placement committed in between is counted, not overwritten;
+    placement writers take the same locks.
+    """
+    drift = find_rack_usage_drift(db)
+    if drift and repair:
+        rack_ids = [row["rack_id"] for row in drift]
+        lock_racks(db, rack_ids)
+        drift = find_rack_usage_drift(db, rack_ids)
+        if drift:
+            db.execute(
+                update(Rack),
+                [
+                    {
+                        "id": row["rack_id"],
+                        "used_units": row["expected_used_units"],
+                        "current_power_w": row["expected_current_power_w"],
+                    }
+                    for row in drift
+                ],
+            )
+        db.commit()
+    return drift
+
+
+def _rack_usage_drift(db: Session, rack_ids: Sequence[int] | None = None) -> list[dict]:
+    totals = (
+        select(
+            RackPlacement.rack_id,
+            func.sum(Device.units_required).label("used_units"),
+            func.sum(Device.power_w).label("current_power_w"),
+        )
+        .join(Device, RackPlacement.device_id == Device.id)
+        .group_by(RackPlacement.rack_id)
+    )
+    if rack_ids is not None:
+        totals = totals.where(col(RackPlacement.rack_id).in_(rack_ids))
+    totals = totals.subquery()
+    expected_units = func.coalesce(totals.c.used_units, 0)
+    expected_power = func.coalesce(totals.c.current_power_w, 0)
+    statement = (
+        select(
+            Rack.id,
+            Rack.used_units,
+            Rack.current_power_w,
+            expected_units,
+            expected_power,
+        )
+        .outerjoin(totals, totals.c.rack_id == Rack.id)
+        .where(
+            or_(Rack.used_units != expected_units, Rack.current_power_w != expected_power)
+        )
+        .order_by(Rack.id)
+    )
+    if rack_ids is not None:
+        statement = statement.where(col(Rack.id).in_(rack_ids))
+    return [
+        {
+            "rack_id": rack_id,
+            "used_units": used_units,
+            "expected_used_units": expected_used_units,
+            "current_power_w": current_power_w,
+            "expected_current_power_w": expected_current_power_w,
+        }
+        for (
+            rack_id,
+            used_units,
+            current_power_w,
+            expected_used_units,
+            expected_current_power_w,
+        ) in db.exec(statement)
+    ]
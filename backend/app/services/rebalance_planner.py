@@ -0,0 +1,295 @@
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+import numpy as np
+from app.services.placement_service import free_unit_runs
+
+# Lowest-utilized receivers (or highest-utilized donors) whose placements are
+# loaded and checked for a fitting gap in one step
+PROBE_LIMIT = 16
+# Devices of a rack below the band tried for moving out to make room
+SWAP_CANDIDATES = 4
+# Tolerance of the band comparisons against float bounds
+EPSILON = 1e-9
+
+
+class PlacedDevice(NamedTuple):
+    device_id: int
+    name: str
+    power_w: int
+    units_required: int
+    start_unit: int
+
+
+@dataclass
+class PlannedMove:
+    device: PlacedDevice
+    # Rack positions in the planner's rack list
+    source: int
+    target: int
+    start_unit: int
+
+
+class RebalancePlanner:
+    """
+    Ordered device moves that bring rack utilization into a band of
+    ``target_spread`` percentage points around the fleet's mean utilization.
+
+    The band is centered on the capacity-weighted mean, so every rack can
+    reach it. Racks above it are drained first, most utilized first, into the
+    least utilized racks that stay inside it; racks still below it are then
+    filled from the most utilized racks that stay inside it. Each step moves
+    the device that closes the gap in one move with the fewest units, or
+    failing that the one with the most power per unit, which keeps the move
+    count and the moved units low. A rack below the band with no room left
+    first moves one of its low-power devices out to make space.
+
+    Every move is checked against the state left by the moves before it:
+    the target needs a free contiguous run and power headroom at that point,
+    so the plan can be carried out in order without ever exceeding a rack.
+
+    Only the unit and power counters of all racks are held up front. The
+    placements of a rack are loaded through ``load_devices`` the first time
+    it is drained, filled or probed as a receiver or donor.
+    """
+
+    def __init__(
+        self,
+        racks: Sequence[Any],
+        target_spread: float,
+        load_devices: Callable[[list[int]], dict[int, list[PlacedDevice]]],
+    ):
+        self.racks = list(racks)
+        self.load_devices = load_devices
+        self.total_units = np.array([r.total_units for r in racks], dtype=np.int64)
+        self.max_power_w = np.array([r.max_power_w for r in racks], dtype=np.int64)
+        self.used_units = np.array([r.used_units for r in racks], dtype=np.int64)
+        self.power_w = np.array([r.current_power_w for r in racks], dtype=np.int64)
+        self.utilization = np.zeros(len(self.racks))
+        self._update_utilization(np.arange(len(self.racks)))
+
+        capacity = int(self.max_power_w.sum())
+        mean = 100 * int(self.power_w.sum()) / capacity if capacity else 0.0
+        self.mean = mean
+        self.low = max(0.0, mean - target_spread / 2)
+        self.high = mean + target_spread / 2
+        # Power bounds of the band per rack, never above the rack's maximum
+        self.low_power_w = self.low / 100 * self.max_power_w
+        self.high_power_w = np.minimum(
+            self.high / 100 * self.max_power_w, self.max_power_w
+        )
+
+        # Device id -> placed device per rack position, None until loaded
+        self.devices: list[dict[int, PlacedDevice] | None] = [
+            {} if used == 0 else None for used in self.used_units.tolist()
+        ]
+
+    def spread(self) -> float:
+        if not len(self.utilization):
+            return 0.0
+        return float(self.utilization.max() - self.utilization.min())
+
+    def plan(self, max_moves: int) -> list[PlannedMove]:
+        moves: list[PlannedMove] = []
+        # Every rack outside the band is worked on, so load them in one pass
+        outside = (self.utilization > self.high + EPSILON) | (
+            self.utilization < self.low - EPSILON
+        )
+        self._load(np.flatnonzero(outside).tolist())
+        # After loading, as the placements may have corrected the counters
+        over = np.flatnonzero(self.utilization > self.high + EPSILON)
+        for source in over[np.argsort(-self.utilization[over], kind="stable")]:
+            source = int(source)
+            while len(moves) < max_moves and self._above_band(source):
+                move = self._drain(source)
+                if move is None:
+                    break
+                moves.append(move)
+
+        # Receivers never leave the band above, so only racks below it remain
+        under = np.flatnonzero(self.utilization < self.low - EPSILON)
+        for target in under[np.argsort(self.utilization[under], kind="stable")]:
+            target = int(target)
+            while len(moves) < max_moves and self._below_band(target):
+                move = self._fill(target)
+                if move is not None:
+                    moves.append(move)
+                    continue
+                swap = self._swap_in(target) if len(moves) + 2 <= max_moves else None
+                if swap is None:
+                    break
+                moves.extend(swap)
+        return moves
+
+    def _above_band(self, position: int) -> bool:
+        return self.power_w[position] > self.high_power_w[position] + EPSILON
+
+    def _below_band(self, position: int) -> bool:
+        return self.power_w[position] < self.low_power_w[position] - EPSILON
+
+    def _drain(self, source: int) -> PlannedMove | None:
+        """Move one device out of ``source`` into the least utilized rack."""
+        self._load([source])
+        excess = self.power_w[source] - self.high_power_w[source]
+        # Power ``source`` can give away without dropping below the band
+        surplus = self.power_w[source] - self.low_power_w[source]
+        candidates = [
+            device
+            for device in self.devices[source].values()
+            if device.power_w <= surplus + EPSILON
+        ]
+        for device in sorted(candidates, key=lambda d: _move_cost(d, excess)):
+            target = self._receiver(device, source)
+            if target is not None:
+                return self._move(device, source, *target)
+        return None
+
+    def _fill(self, target: int, min_power_w: int = 0) -> PlannedMove | None:
+        """
+        Move one device drawing more than ``min_power_w`` from one of the most
+        utilized racks into ``target``.
+        """
+        self._load([target])
+        deficit = self.low_power_w[target] - self.power_w[target]
+        room = self.high_power_w[target] - self.power_w[target]
+        largest_run = max(
+            (length for _, length in self._free_runs(target)), default=0
+        )
+
+        donors = np.flatnonzero(self.power_w > self.low_power_w + EPSILON)
+        donors = donors[donors != target]
+        donors = self._nearest(donors, -self.utilization[donors])
+        self._load(donors)
+        best: tuple[tuple, PlacedDevice, int] | None = None
+        for source in donors:
+            surplus = self.power_w[source] - self.low_power_w[source]
+            for device in self.devices[source].values():
+                if (
+                    device.power_w <= min_power_w
+                    or device.units_required > largest_run
+                    or device.power_w > room + EPSILON
+                    or device.power_w > surplus + EPSILON
+                ):
+                    continue
+                cost = _move_cost(device, deficit)
+                if best is None or cost < best[0]:
+                    best = (cost, device, source)
+        if best is None:
+            return None
+
+        _, device, source = best
+        start_unit = self._best_fit_start(target, device.units_required)
+        return self._move(device, source, target, start_unit)
+
+    def _swap_in(self, target: int) -> list[PlannedMove] | None:
+        """
+        Make room in ``target`` (typically full in units) by moving one of its
+        lowest-power devices out, then fill it with a device drawing more. The
+        first move is undone when no such device can come in.
+        """
+        self._load([target])
+        outgoing = sorted(
+            self.devices[target].values(),
+            key=lambda d: (d.power_w, -d.units_required, d.device_id),
+        )
+        for device in outgoing[:SWAP_CANDIDATES]:
+            receiver = self._receiver(device, target)
+            if receiver is None:
+                continue
+            out = self._move(device, target, *receiver)
+            into = self._fill(target, min_power_w=device.power_w)
+            if into is not None:
+                return [out, into]
+            self._move(out.device, receiver[0], target, device.start_unit)
+        return None
+
+    def _receiver(self, device: PlacedDevice, source: int) -> tuple[int, int] | None:
+        """Least utilized rack that takes ``device`` inside the band, with a start."""
+        mask = (self.total_units - self.used_units >= device.units_required) & (
+            self.power_w + device.power_w <= self.high_power_w + EPSILON
+        )
+        mask[source] = False
+        receivers = np.flatnonzero(mask)
+        receivers = self._nearest(receivers, self.utilization[receivers])
+        self._load(receivers)
+        for target in receivers:
+            # Loading may have corrected the counters the mask was built from
+            limit = self.high_power_w[target] + EPSILON
+            if self.power_w[target] + device.power_w > limit:
+                continue
+            start_unit = self._best_fit_start(target, device.units_required)
+            if start_unit is not None:
+                return target, start_unit
+        return None
+
+    def _nearest(self, positions: np.ndarray, keys: np.ndarray) -> list[int]:
+        """Up to ``PROBE_LIMIT`` of ``positions`` with the lowest ``keys``, sorted."""
+        if len(positions) > PROBE_LIMIT:
+            nearest = np.argpartition(keys, PROBE_LIMIT)[:PROBE_LIMIT]
+            positions, keys = positions[nearest], keys[nearest]
+        return positions[np.argsort(keys, kind="stable")].tolist()
+
+    def _load(self, positions: Sequence[int]) -> None:
+        missing = [p for p in positions if self.devices[p] is None]
+        if not missing:
+            return
+        loaded = self.load_devices([self.racks[p].id for p in missing])
+        for position in missing:
+            devices = loaded.get(self.racks[position].id, [])
+            self.devices[position] = {device.device_id: device for device in devices}
+            # The placements are the source of truth; counters can drift
+            self.used_units[position] = sum(d.units_required for d in devices)
+            self.power_w[position] = sum(d.power_w for d in devices)
+            self._update_utilization(position)
+
+    def _free_runs(self, position: int) -> list[tuple[int, int]]:
+        spans = sorted(
+            (d.start_unit, d.start_unit + d.units_required - 1)
+            for d in self.devices[position].values()
+        )
+        return free_unit_runs(int(self.total_units[position]), spans)
+
+    def _best_fit_start(self, position: int, units: int) -> int | None:
+        fitting = [
+            (length, start)
+            for start, length in self._free_runs(position)
+            if length >= units
+        ]
+        return min(fitting)[1] if fitting else None
+
+    def _move(
+        self, device: PlacedDevice, source: int, target: int, start_unit: int
+    ) -> PlannedMove:
+        del self.devices[source][device.device_id]
+        self.devices[target][device.device_id] = device._replace(start_unit=start_unit)
+        self.used_units[source] -= device.units_required
+        self.used_units[target] += device.units_required
+        self.power_w[source] -= device.power_w
+        self.power_w[target] += device.power_w
+        self._update_utilization([source, target])
+        return PlannedMove(device, source, target, start_unit)
+
+    def _update_utilization(self, positions: Any) -> None:
+        max_power_w = self.max_power_w[positions]
+        self.utilization[positions] = np.divide(
+            100 * self.power_w[positions],
+            max_power_w,
+            out=np.zeros(np.shape(max_power_w)),
+            where=max_power_w > 0,
+        )
+
+
+def _move_cost(device: PlacedDevice, gap: float) -> tuple:
+    """
+    Closing ``gap`` in one move comes first, with the fewest units and then
+    the least overshoot; otherwise the most power per unit moved.
+    """
+    if device.power_w >= gap - EPSILON:
+        return (0, device.units_required, device.power_w, device.device_id)
+    return (
+        1,
+        -device.power_w / max(device.units_required, 1),
+        device.units_required,
+        device.device_id,
+    )
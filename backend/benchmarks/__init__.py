@@ -0,0 +1,2 @@
+# Benchmarks package
+# Run from the backend directory, e.g. `python -m benchmarks.distribution_loading`
@@ -0,0 +1,110 @@
+"""
+Concurrent read load against the sync (threadpool) and async device listing.
+
+Both variants serve the same query; the sync one runs in FastAPI's threadpool
+on the sync engine, the async one awaits the async engine. Clients run
+in-process through ``httpx.ASGITransport``. Seed rows are committed and
+deleted again at the end.
+"""
+
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+import httpx
+from app.database import engine, get_async_db, get_db
+from app.models.device import Device, DeviceRead
+from app.services import device_service
+from fastapi import Depends, FastAPI
+from sqlmodel import Session, col, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+CLIENTS = 1000
+REQUESTS_PER_CLIENT = 5
+SEED_DEVICES = 100
+SERIAL_PREFIX = "BENCH-LOAD-"
+
+app = FastAPI()
+
+
+@app.get("/sync/devices", response_model=list[DeviceRead])
+def list_devices_sync(db: Session = Depends(get_db)):
+    return device_service.get_devices(db, limit=50)
+
+
+@app.get("/async/devices", response_model=list[DeviceRead])
+async def list_devices_async(db: AsyncSession = Depends(get_async_db)):
+    return await device_service.get_devices_async(db, limit=50)
+
+
+async def _client(
+    http: httpx.AsyncClient, path: str, latencies: list[float], errors: list[str]
+) -> None:
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        try:
+            response = await http.get(path)
+            response.raise_for_status()
+        except Exception as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def _load(path: str, clients: int) -> None:
+    latencies: list[float] = []
+    errors: list[str] = []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as http:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_client(http, path, latencies, errors) for _ in range(clients))
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    logger.info(
+        "%-16s %8.0f req/s  p50 %8.1fms  p95 %8.1fms  errors %d",
+        path,
+        len(latencies) / elapsed,
+        statistics.median(latencies) * 1000 if latencies else 0.0,
+        latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        len(errors),
+    )
+
+
+def main() -> None:
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    with Session(engine) as session:
+        session.add_all(
+            Device(
+                name=f"Bench Device {i}",
+                serial_number=f"{SERIAL_PREFIX}{uuid4()}",
+                units_required=1,
+                power_w=100,
+            )
+            for i in range(SEED_DEVICES)
+        )
+        session.commit()
+    try:
+        logger.info("%d clients x %d requests", clients, REQUESTS_PER_CLIENT)
+        for path in ("/sync/devices", "/async/devices"):
+            asyncio.run(_load(path, clients))
+    finally:
+        with Session(engine) as session:
+            session.exec(
+                delete(Device).where(col(Device.serial_number).startswith(SERIAL_PREFIX))
+            )
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Rows per second of the bulk device import (NDJSON and CSV).
+
+Data is created inside a transaction that is rolled back at the end.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device, DeviceCreate
+from app.services import import_service
+from sqlmodel import Session
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+ROWS = 50_000
+CHUNK_BYTES = 64 * 1024
+
+
+def _ndjson(rows: int) -> bytes:
+    return "".join(
+        json.dumps(
+            {
+                "name": f"Bench Device {i}",
+                "serial_number": f"BENCH-IMP-{uuid4()}",
+                "units_required": 1 + i % 4,
+                "power_w": 100 + i % 900,
+            }
+        )
+        + "\n"
+        for i in range(rows)
+    ).encode()
+
+
+def _csv(rows: int) -> bytes:
+    lines = ["name,description,serial_number,units_required,power_w\n"]
+    lines.extend(
+        f"Bench Device {i},,BENCH-IMP-{uuid4()},{1 + i % 4},{100 + i % 900}\n"
+        for i in range(rows)
+    )
+    return "".join(lines).encode()
+
+
+async def _chunks(payload: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(payload), CHUNK_BYTES):
+        yield payload[start : start + CHUNK_BYTES]
+
+
+def main() -> None:
+    for label, content_type, payload in [
+        ("ndjson", "application/x-ndjson", _ndjson(ROWS)),
+        ("csv", "text/csv", _csv(ROWS)),
+    ]:
+        connection = engine.connect()
+        transaction = connection.begin()
+        session = Session(bind=connection)
+        try:
+            start = time.perf_counter()
+            result = asyncio.run(
+                import_service.import_stream(
+                    session, _chunks(payload), content_type, Device, DeviceCreate
+                )
+            )
+            elapsed = time.perf_counter() - start
+            logger.info(
+                "%-7s %8d rows created %6d failed %8.2fs %10.0f rows/s",
+                label,
+                result.created,
+                result.failed,
+                elapsed,
+                result.created / elapsed,
+            )
+        finally:
+            session.close()
+            transaction.rollback()
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
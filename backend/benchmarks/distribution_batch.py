@@ -0,0 +1,124 @@
+"""
+What-if scenarios run one request at a time versus one batch.
+
+Each scenario distributes a random subset of the devices over a random subset
+of the racks. The batch is timed in-process and on the process pool (the
+first pooled run is a warm-up that pays for spawning the workers).
+
+Data is created inside a transaction that is rolled back at the end, so the
+benchmark can be pointed at any database (``DATABASE_URL`` settings apply).
+Usage: ``python -m benchmarks.distribution_batch [scenarios]``
+"""
+
+import logging
+import random
+import sys
+import time
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device
+from app.models.distribution import DistributionBatchRequest, DistributionRequest
+from app.models.rack import Rack
+from app.services import distribution_service
+from sqlmodel import Session
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+DEVICES = 20_000
+RACKS = 1_000
+SCENARIO_DEVICES = 5_000
+SCENARIO_RACKS = 300
+
+
+def main() -> None:
+    scenario_count = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    racks = [
+        Rack(
+            name=f"Bench Rack {i}",
+            serial_number=f"BENCH-RACK-{uuid4()}",
+            total_units=48,
+            max_power_w=20000,
+        )
+        for i in range(RACKS)
+    ]
+    devices = [
+        Device(
+            name=f"Bench Device {i}",
+            serial_number=f"BENCH-DEV-{uuid4()}",
+            units_required=1 + i % 4,
+            power_w=100 + i % 400,
+        )
+        for i in range(DEVICES)
+    ]
+    session.add_all(racks + devices)
+    session.flush()
+    device_ids = [d.id for d in devices]
+    rack_ids = [r.id for r in racks]
+    session.expunge_all()
+
+    rng = random.Random(42)
+    request = DistributionBatchRequest(
+        scenarios=[
+            DistributionRequest(
+                device_ids=rng.sample(device_ids, SCENARIO_DEVICES),
+                rack_ids=rng.sample(rack_ids, SCENARIO_RACKS),
+            )
+            for _ in range(scenario_count)
+        ]
+    )
+
+    try:
+        logger.info(
+            "%d scenarios of %d devices x %d racks",
+            scenario_count,
+            SCENARIO_DEVICES,
+            SCENARIO_RACKS,
+        )
+
+        start = time.perf_counter()
+        for scenario in request.scenarios:
+            distribution_service.calculate_distribution(session, scenario)
+        logger.info("%-22s %10.1f ms", "one request each", _ms(start))
+
+        threshold = distribution_service.BATCH_INLINE_MAX_DEVICES
+        distribution_service.BATCH_INLINE_MAX_DEVICES = sys.maxsize
+        start = time.perf_counter()
+        result = distribution_service.calculate_distribution_batch(session, request)
+        logger.info(
+            "%-22s %10.1f ms (load %.1f ms)",
+            "batch, in-process",
+            _ms(start),
+            result.summary["load_ms"],
+        )
+
+        distribution_service.BATCH_INLINE_MAX_DEVICES = 0
+        distribution_service.calculate_distribution_batch(session, request)
+        start = time.perf_counter()
+        result = distribution_service.calculate_distribution_batch(session, request)
+        logger.info(
+            "%-22s %10.1f ms (load %.1f ms, %d workers)",
+            "batch, process pool",
+            _ms(start),
+            result.summary["load_ms"],
+            result.summary["workers"],
+        )
+        distribution_service.BATCH_INLINE_MAX_DEVICES = threshold
+    finally:
+        distribution_service.shutdown_executor()
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Query count and latency of the distribution loader as the number of ids grows.
+
+Data is created inside a transaction that is rolled back at the end, so the
+benchmark can be pointed at any database (``DATABASE_URL`` settings apply).
+"""
+
+import logging
+import time
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device
+from app.models.distribution import DistributionRequest
+from app.models.rack import Rack
+from app.services.distribution_service import calculate_distribution
+from sqlalchemy import event
+from sqlmodel import Session
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+SIZES = [10, 100, 1_000, 10_000]
+
+
+def main() -> None:
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    max_size = max(SIZES)
+    racks = [
+        Rack(
+            name=f"Bench Rack {i}",
+            serial_number=f"BENCH-RACK-{uuid4()}",
+            total_units=48,
+            max_power_w=20000,
+        )
+        for i in range(max_size // 10)
+    ]
+    devices = [
+        Device(
+            name=f"Bench Device {i}",
+            serial_number=f"BENCH-DEV-{uuid4()}",
+            units_required=1,
+            power_w=100 + i % 400,
+        )
+        for i in range(max_size)
+    ]
+    session.add_all(racks + devices)
+    session.flush()
+    device_ids = [d.id for d in devices]
+    rack_ids = [r.id for r in racks]
+    session.expunge_all()
+
+    statements = 0
+
+    def count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(connection, "before_cursor_execute", count)
+    try:
+        logger.info("%10s %10s %10s %12s", "devices", "racks", "queries", "elapsed_ms")
+        for size in SIZES:
+            statements = 0
+            request = DistributionRequest(
+                device_ids=device_ids[:size], rack_ids=rack_ids[: max(size // 10, 1)]
+            )
+            start = time.perf_counter()
+            calculate_distribution(session, request)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                "%10d %10d %10d %12.1f",
+                len(request.device_ids),
+                len(request.rack_ids),
+                statements,
+                elapsed_ms,
+            )
+    finally:
+        event.remove(connection, "before_cursor_execute", count)
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Peak memory and time to first byte of a large ``calculate`` result encoded
+as one JSON document versus streamed as NDJSON.
+
+Both runs load the same rows and run the same plan; the difference is the
+response side. Peak memory is measured with ``tracemalloc``, which slows
+both runs down alike.
+
+Data is created inside a transaction that is rolled back at the end, so the
+benchmark can be pointed at any database (``DATABASE_URL`` settings apply).
+Usage: ``python -m benchmarks.distribution_ndjson [devices]``
+"""
+
+import logging
+import sys
+import time
+import tracemalloc
+from uuid import uuid4
+
+import pydantic_core
+from app.cache import LocalCache
+from app.database import engine
+from app.models.device import Device
+from app.models.distribution import (DeviceSelector, DistributionRequest,
+                                     RackSelector)
+from app.models.rack import Rack
+from app.services import distribution_service
+from sqlalchemy import insert
+from sqlmodel import Session
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+DEVICES_PER_RACK = 25
+
+
+def main() -> None:
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    prefix = f"BENCH-ND-{uuid4().hex[:8]}-"
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    try:
+        session.execute(
+            insert(Device),
+            [
+                {
+                    "name": f"Bench Device {i}",
+                    "serial_number": f"{prefix}{i}",
+                    "units_required": 1 + i % 2,
+                    "power_w": 100 + i % 300,
+                }
+                for i in range(device_count)
+            ],
+        )
+        session.execute(
+            insert(Rack),
+            [
+                {
+                    "name": f"Bench Rack {i}",
+                    "serial_number": f"{prefix}RACK-{i}",
+                    "total_units": 48,
+                    "max_power_w": 20000,
+                }
+                for i in range(device_count // DEVICES_PER_RACK + 1)
+            ],
+        )
+
+        logger.info("%d devices", device_count)
+        logger.info(
+            "%-8s %12s %12s %12s", "format", "peak_mb", "first_byte_ms", "total_ms"
+        )
+        request = DistributionRequest(
+            device_selector=DeviceSelector(serial_prefix=prefix),
+            rack_selector=RackSelector(serial_prefix=prefix),
+        )
+        for name in ("json", "ndjson"):
+            # An empty cache, so neither run is served from the other's result
+            distribution_service.set_cache_backend(LocalCache(1, 0))
+            tracemalloc.start()
+            start = time.perf_counter()
+            if name == "json":
+                response = distribution_service.calculate_distribution(
+                    session, request
+                )
+                chunks = iter([pydantic_core.to_json(response)])
+                del response
+            else:
+                chunks = distribution_service.calculate_distribution_stream(
+                    session, request
+                )
+            first_byte = None
+            for _ in chunks:
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+            finished = time.perf_counter()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logger.info(
+                "%-8s %12.1f %12.1f %12.1f",
+                name,
+                peak / 2**20,
+                (first_byte - start) * 1000,
+                (finished - start) * 1000,
+            )
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Rebalance plans for a populated fleet that just gained empty racks.
+
+Racks start between 30% and 90% power utilization; the added racks are
+empty. For each target spread the planner's moves, moved units, racks whose
+placements were loaded, loader calls (queries in the service) and run time
+are reported.
+
+Runs on in-memory rows, without a database.
+Usage: ``python -m benchmarks.distribution_rebalance [racks]``
+"""
+
+import logging
+import random
+import sys
+import time
+from typing import NamedTuple
+
+from app.services.rebalance_planner import PlacedDevice, RebalancePlanner
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+RACK_UNITS = 42
+RACK_POWER_W = 10_000
+ADDED_RACKS = 0.05
+TARGET_SPREADS = [20.0, 10.0, 5.0]
+
+
+class RackCounters(NamedTuple):
+    id: int
+    name: str
+    total_units: int
+    max_power_w: int
+    used_units: int
+    current_power_w: int
+
+
+def main() -> None:
+    rack_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = random.Random(42)
+
+    placed: dict[int, list[PlacedDevice]] = {}
+    device_id = 0
+    for rack_id in range(rack_count):
+        devices = []
+        start_unit, power = 1, 0
+        target_power = rng.uniform(0.3, 0.9) * RACK_POWER_W
+        while True:
+            units = rng.choice([1, 2, 4])
+            power_w = rng.choice([150, 300, 500, 800])
+            if start_unit + units - 1 > RACK_UNITS:
+                break
+            if power + power_w > target_power:
+                break
+            devices.append(
+                PlacedDevice(
+                    device_id, f"Device {device_id}", power_w, units, start_unit
+                )
+            )
+            device_id += 1
+            start_unit += units
+            power += power_w
+        placed[rack_id] = devices
+
+    added = int(rack_count * ADDED_RACKS)
+    racks = [
+        RackCounters(
+            rack_id,
+            f"Rack {rack_id}",
+            RACK_UNITS,
+            RACK_POWER_W,
+            sum(d.units_required for d in placed.get(rack_id, [])),
+            sum(d.power_w for d in placed.get(rack_id, [])),
+        )
+        for rack_id in range(rack_count + added)
+    ]
+    logger.info(
+        "%d populated racks + %d empty, %d devices", rack_count, added, device_id
+    )
+    logger.info(
+        "%8s %8s %8s %8s %8s %8s %8s %10s",
+        "target",
+        "before",
+        "after",
+        "moves",
+        "units",
+        "loaded",
+        "queries",
+        "elapsed_ms",
+    )
+
+    for target_spread in TARGET_SPREADS:
+        calls = 0
+
+        def load_devices(rack_ids: list[int]) -> dict[int, list[PlacedDevice]]:
+            nonlocal calls
+            calls += 1
+            return {rack_id: placed.get(rack_id, []) for rack_id in rack_ids}
+
+        start = time.perf_counter()
+        planner = RebalancePlanner(racks, target_spread, load_devices)
+        before = planner.spread()
+        moves = planner.plan(max_moves=100_000)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            "%8.1f %8.1f %8.1f %8d %8d %8d %8d %10.1f",
+            target_spread,
+            before,
+            planner.spread(),
+            len(moves),
+            sum(move.device.units_required for move in moves),
+            sum(devices is not None for devices in planner.devices),
+            calls,
+            elapsed_ms,
+        )
+
+
+if __name__ == "__main__":
+    main()
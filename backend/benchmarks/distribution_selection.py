@@ -0,0 +1,113 @@
+"""
+A distribution request that lists every device id versus one that selects
+the same devices on the server.
+
+Timings cover parsing the JSON body and loading the device rows, the part
+that grows with the fleet; the placement itself is the same for both.
+
+Data is created inside a transaction that is rolled back at the end, so the
+benchmark can be pointed at any database (``DATABASE_URL`` settings apply).
+Usage: ``python -m benchmarks.distribution_selection [devices]``
+"""
+
+import json
+import logging
+import sys
+import time
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device
+from app.models.distribution import DistributionRequest
+from app.models.rack import Rack
+from app.services import device_service
+from app.services.distribution_service import DEVICE_COLUMNS
+from sqlalchemy import insert
+from sqlmodel import Session, col, select
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+RACKS = 100
+
+
+def main() -> None:
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    prefix = f"BENCH-SEL-{uuid4().hex[:8]}-"
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+
+    try:
+        session.execute(
+            insert(Device),
+            [
+                {
+                    "name": f"Bench Device {i}",
+                    "serial_number": f"{prefix}{i}",
+                    "units_required": 1 + i % 4,
+                    "power_w": 100 + i % 400,
+                }
+                for i in range(device_count)
+            ],
+        )
+        racks = [
+            Rack(
+                name=f"Bench Rack {i}",
+                serial_number=f"{prefix}RACK-{i}",
+                total_units=48,
+                max_power_w=20000,
+            )
+            for i in range(RACKS)
+        ]
+        session.add_all(racks)
+        session.flush()
+        rack_ids = [rack.id for rack in racks]
+        device_ids = session.exec(
+            select(Device.id).where(col(Device.serial_number).startswith(prefix))
+        ).all()
+
+        bodies = {
+            "listed ids": json.dumps(
+                {"device_ids": device_ids, "rack_ids": rack_ids}
+            ),
+            "selector": json.dumps(
+                {
+                    "device_selector": {"serial_prefix": prefix},
+                    "rack_selector": {"serial_prefix": prefix},
+                }
+            ),
+        }
+        logger.info("%d devices x %d racks", device_count, RACKS)
+        logger.info(
+            "%-12s %10s %10s %10s", "request", "body_kb", "parse_ms", "load_ms"
+        )
+        for name, body in bodies.items():
+            start = time.perf_counter()
+            request = DistributionRequest.model_validate_json(body)
+            parsed = time.perf_counter()
+            if request.device_selector is None:
+                devices = device_service.get_devices_by_ids(
+                    session, request.device_ids, DEVICE_COLUMNS
+                )
+            else:
+                devices = device_service.select_devices(
+                    session, request.device_selector, DEVICE_COLUMNS
+                )
+            loaded = time.perf_counter()
+            assert len(devices) == device_count
+            logger.info(
+                "%-12s %10.1f %10.1f %10.1f",
+                name,
+                len(body) / 1024,
+                (parsed - start) * 1000,
+                (loaded - parsed) * 1000,
+            )
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Latency of the fleet-wide free-slot search over thousands of racks.
+
+Data is created inside a transaction that is rolled back at the end.
+"""
+
+import logging
+import random
+import time
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device
+from app.models.placement import RackPlacement
+from app.models.rack import Rack
+from app.services import placement_service
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+RACKS = 5_000
+PLACEMENTS_PER_RACK = 10
+RUNS = 5
+
+
+def _seed(session: Session) -> None:
+    rng = random.Random(7)
+    session.execute(
+        insert(Rack),
+        [
+            {
+                "name": f"Bench Rack {i}",
+                "serial_number": f"BENCH-SLOT-{uuid4()}",
+                "total_units": 42,
+                "max_power_w": 20_000,
+                "used_units": 2 * PLACEMENTS_PER_RACK,
+                "current_power_w": 100 * PLACEMENTS_PER_RACK,
+            }
+            for i in range(RACKS)
+        ],
+    )
+    session.execute(
+        insert(Device),
+        [
+            {
+                "name": f"Bench Device {i}",
+                "serial_number": f"BENCH-SLOT-{uuid4()}",
+                "units_required": 2,
+                "power_w": 100,
+            }
+            for i in range(RACKS * PLACEMENTS_PER_RACK)
+        ],
+    )
+    rack_ids = session.exec(
+        select(Rack.id).where(Rack.serial_number.startswith("BENCH-SLOT-"))
+    ).all()
+    device_ids = iter(
+        session.exec(
+            select(Device.id).where(Device.serial_number.startswith("BENCH-SLOT-"))
+        ).all()
+    )
+    rows = []
+    for rack_id in rack_ids:
+        # Every other 2U pair in a random 40U window, leaving gaps of 2U
+        for start_unit in sorted(rng.sample(range(1, 41, 4), PLACEMENTS_PER_RACK)):
+            rows.append(
+                {
+                    "rack_id": rack_id,
+                    "device_id": next(device_ids),
+                    "start_unit": start_unit,
+                    "end_unit": start_unit + 1,
+                }
+            )
+    session.execute(insert(RackPlacement), rows)
+
+
+def main() -> None:
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+    try:
+        _seed(session)
+        for units, power_w in [(1, 0), (2, 500), (4, 5_000)]:
+            timings = []
+            for _ in range(RUNS):
+                start = time.perf_counter()
+                slots = placement_service.find_free_slots(session, units, power_w)
+                timings.append(time.perf_counter() - start)
+            logger.info(
+                "%5d racks  units=%d power_w=%-5d %3d slots  best %6.1fms",
+                RACKS,
+                units,
+                power_w,
+                len(slots),
+                min(timings) * 1000,
+            )
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
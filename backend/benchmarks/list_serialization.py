@@ -0,0 +1,111 @@
+"""
+Requests per second of one worker serving device/rack lists at limit=1000:
+ORM objects re-validated through response_model (before) vs. projected
+columns encoded straight to JSON (the real endpoints).
+
+Requests run sequentially in-process through ``httpx.ASGITransport``. Seed
+rows are committed and deleted again at the end.
+"""
+
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+import httpx
+from app.database import engine, get_async_db
+from app.main import app
+from app.models.device import Device, DeviceRead
+from app.models.rack import Rack, RackReadWithPower
+from app.services import device_service, rack_service
+from fastapi import Depends
+from sqlmodel import Session, col, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+ROWS = 1000
+SECONDS = 5
+SERIAL_PREFIX = "BENCH-SER-"
+
+
+# The previous implementations, mounted next to the real routes
+@app.get("/bench/before/devices", response_model=list[DeviceRead])
+async def _devices_before(db: AsyncSession = Depends(get_async_db)):
+    return await device_service.get_devices_async(db, limit=ROWS)
+
+
+@app.get("/bench/before/racks", response_model=list[RackReadWithPower])
+async def _racks_before(db: AsyncSession = Depends(get_async_db)):
+    racks = await rack_service.get_racks_async(db, limit=ROWS)
+    return [rack_service.rack_with_stats(rack) for rack in racks]
+
+
+async def _rate(http: httpx.AsyncClient, path: str) -> float:
+    assert len((await http.get(path)).json()) == ROWS
+    requests = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        (await http.get(path)).raise_for_status()
+        requests += 1
+    return requests / (time.perf_counter() - start)
+
+
+async def _run() -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for label, before, after in [
+            ("devices", "/bench/before/devices", f"/api/v1/devices/?limit={ROWS}"),
+            (
+                "racks+stats",
+                "/bench/before/racks",
+                f"/api/v1/racks/?limit={ROWS}&with_stats=true",
+            ),
+        ]:
+            before_rate = await _rate(http, before)
+            after_rate = await _rate(http, after)
+            logger.info(
+                "%-12s before %6.1f req/s  after %6.1f req/s  (%.1fx)",
+                label,
+                before_rate,
+                after_rate,
+                after_rate / before_rate,
+            )
+
+
+def main() -> None:
+    with Session(engine) as session:
+        session.add_all(
+            Device(
+                name=f"Bench Device {i}",
+                serial_number=f"{SERIAL_PREFIX}{uuid4()}",
+                units_required=1,
+                power_w=100,
+            )
+            for i in range(ROWS)
+        )
+        session.add_all(
+            Rack(
+                name=f"Bench Rack {i}",
+                serial_number=f"{SERIAL_PREFIX}{uuid4()}",
+                total_units=42,
+                max_power_w=5000,
+            )
+            for i in range(ROWS)
+        )
+        session.commit()
+    try:
+        asyncio.run(_run())
+    finally:
+        with Session(engine) as session:
+            for table in (Device, Rack):
+                session.exec(
+                    delete(table).where(col(table.serial_number).startswith(SERIAL_PREFIX))
+                )
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Page latency at increasing depth: OFFSET/LIMIT vs. keyset cursors.
+
+Data is created inside a transaction that is rolled back at the end.
+"""
+
+import logging
+import time
+from uuid import uuid4
+
+from app.database import chunked, engine
+from app.models.device import Device
+from app.pagination import encode_cursor
+from app.services import device_service
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+ROWS = 500_000
+PAGE_SIZE = 100
+RUNS = 5
+
+
+def _best_ms(fn) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection)
+    try:
+        rows = [
+            {
+                "name": f"Bench Device {i}",
+                "serial_number": f"BENCH-PAGE-{uuid4()}",
+                "units_required": 1,
+                "power_w": 100,
+            }
+            for i in range(ROWS)
+        ]
+        for chunk in chunked(rows, 10_000):
+            session.execute(insert(Device), chunk)
+        total = session.exec(select(func.count(Device.id))).one()
+        ids = session.exec(select(Device.id).order_by(Device.id)).all()
+
+        for depth in (0, total // 10, total // 2, total - PAGE_SIZE):
+            offset_ms = _best_ms(
+                lambda depth=depth: device_service.get_devices(
+                    session, skip=depth, limit=PAGE_SIZE
+                )
+            )
+            cursor = encode_cursor("id", ids[depth - 1]) if depth else None
+            cursor_ms = _best_ms(
+                lambda cursor=cursor: device_service.get_devices(
+                    session, limit=PAGE_SIZE, cursor=cursor
+                )
+            )
+            logger.info(
+                "depth %7d  offset %7.2fms  cursor %7.2fms", depth, offset_ms, cursor_ms
+            )
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
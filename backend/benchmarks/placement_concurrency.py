@@ -0,0 +1,94 @@
+"""
+Placements per second from concurrent writers: all into one rack vs. one
+rack per writer.
+
+Rows are committed (writers need their own connections) and deleted again at
+the end. SQLite has a single database-wide write lock, so both cases run at
+the same rate there; per-rack row locks only let writers to different racks
+proceed in parallel on Postgres.
+"""
+
+import logging
+import threading
+import time
+from uuid import uuid4
+
+from app.database import engine
+from app.models.device import Device
+from app.models.placement import PlacementCreate, RackPlacement
+from app.models.rack import Rack
+from app.services import placement_service
+from sqlmodel import Session, col, delete
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+WRITERS = 8
+PLACEMENTS_PER_WRITER = 40
+
+
+def _run(shared_rack: bool) -> None:
+    with Session(engine) as session:
+        racks = [
+            Rack(
+                name=f"Bench Rack {i}",
+                serial_number=f"BENCH-LOCK-{uuid4()}",
+                total_units=WRITERS * PLACEMENTS_PER_WRITER,
+                max_power_w=10**9,
+            )
+            for i in range(1 if shared_rack else WRITERS)
+        ]
+        devices = [
+            Device(
+                name=f"Bench Device {i}",
+                serial_number=f"BENCH-LOCK-{uuid4()}",
+                units_required=1,
+                power_w=100,
+            )
+            for i in range(WRITERS * PLACEMENTS_PER_WRITER)
+        ]
+        session.add_all(racks + devices)
+        session.commit()
+        rack_ids = [rack.id for rack in racks]
+        device_ids = [device.id for device in devices]
+
+    def write(writer: int) -> None:
+        rack_id = rack_ids[0 if shared_rack else writer]
+        with Session(engine) as session:
+            for i in range(PLACEMENTS_PER_WRITER):
+                index = writer * PLACEMENTS_PER_WRITER + i
+                placement_service.place_device(
+                    session,
+                    rack_id,
+                    PlacementCreate(device_id=device_ids[index], start_unit=index + 1),
+                )
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(WRITERS)]
+    try:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "%-16s %4d writers %8.0f placements/s",
+            "one rack" if shared_rack else "rack per writer",
+            WRITERS,
+            len(device_ids) / elapsed,
+        )
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(RackPlacement).where(col(RackPlacement.rack_id).in_(rack_ids)))
+            session.exec(delete(Device).where(col(Device.id).in_(device_ids)))
+            session.exec(delete(Rack).where(col(Rack.id).in_(rack_ids)))
+            session.commit()
+
+
+def main() -> None:
+    for shared_rack in (True, False):
+        _run(shared_rack)
+
+
+if __name__ == "__main__":
+    main()
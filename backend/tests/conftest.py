@@ -1,4 +1,6 @@
-from collections.abc import Generator
+import random
+from collections.abc import Callable, Generator, Iterator, Sequence
+from contextlib import AbstractContextManager, contextmanager
 from uuid import uuid4
 
 import pytest
@@ -6,7 +8,9 @@ from app.database import engine
 from app.main import app
 from app.models.device import Device
 from app.models.rack import Rack
+from app.services.distribution_service import DeviceRow, RackRow
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlmodel import Session, delete
 
 
@@ -23,6 +27,32 @@ def session() -> Generator[Session, None, None]:
     connection.close()
 
 
+@pytest.fixture
+def count_statements(
+    session: Session,
+) -> Callable[[], AbstractContextManager[list[str]]]:
+    """
+    ``with count_statements() as statements:`` collects the SQL statements
+    the ``session`` fixture sends inside the block.
+    """
+
+    @contextmanager
+    def count() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(_conn, _cursor, statement, *_args) -> None:
+            statements.append(statement)
+
+        connection = session.connection()
+        event.listen(connection, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(connection, "before_cursor_execute", record)
+
+    return count
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
@@ -58,3 +88,74 @@ def sample_racks(session: Session) -> list[Rack]:
     for rack in racks:
         session.refresh(rack)
     return racks
+
+
+@pytest.fixture
+def make_rack(session: Session) -> Callable[..., Rack]:
+    """Creates and commits a rack; ``make_rack(total_units=10, max_power_w=5000)``."""
+
+    def make(total_units: int = 42, max_power_w: int = 10000) -> Rack:
+        rack = Rack(
+            name=f"Rack {total_units}U",
+            serial_number=f"RACK-{uuid4()}",
+            total_units=total_units,
+            max_power_w=max_power_w,
+        )
+        session.add(rack)
+        session.commit()
+        session.refresh(rack)
+        return rack
+
+    return make
+
+
+@pytest.fixture
+def make_device(session: Session) -> Callable[..., Device]:
+    """Creates and commits a device; ``make_device(units=2, power=400)``."""
+
+    def make(units: int = 1, power: int = 100) -> Device:
+        device = Device(
+            name=f"Device {units}U {power}W",
+            serial_number=f"DEV-{uuid4()}",
+            units_required=units,
+            power_w=power,
+        )
+        session.add(device)
+        session.commit()
+        session.refresh(device)
+        return device
+
+    return make
+
+
+@pytest.fixture
+def make_fleet() -> Callable[..., tuple[list[DeviceRow], list[RackRow]]]:
+    """
+    Builds a seeded in-memory fleet for the distribution engine. Each device and
+    rack draws its power and units from the given choices.
+    """
+
+    def make(
+        seed: int,
+        *,
+        devices: int,
+        racks: int,
+        device_power: Sequence[int],
+        device_units: Sequence[int],
+        rack_units: Sequence[int],
+        rack_power: Sequence[int],
+    ) -> tuple[list[DeviceRow], list[RackRow]]:
+        rng = random.Random(seed)
+        device_rows = [
+            DeviceRow(
+                i, f"Device {i}", rng.choice(device_power), rng.choice(device_units)
+            )
+            for i in range(devices)
+        ]
+        rack_rows = [
+            RackRow(i, f"Rack {i}", rng.choice(rack_units), rng.choice(rack_power))
+            for i in range(racks)
+        ]
+        return device_rows, rack_rows
+
+    return make
@@ -0,0 +1,67 @@
+from app.cache import LocalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalCache:
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalCache(maxsize=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LocalCache(maxsize=10, ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_total_weight_is_bounded(self):
+        cache = LocalCache(maxsize=10, ttl_seconds=60, max_weight=10)
+        cache.set("a", 1, weight=4)
+        cache.set("b", 2, weight=4)
+        cache.set("c", 3, weight=4)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+        assert cache.weight == 8
+
+    def test_entry_heavier_than_bound_is_not_stored(self):
+        cache = LocalCache(maxsize=10, ttl_seconds=60, max_weight=10)
+        cache.set("a", 1, weight=4)
+        cache.set("b", 2, weight=11)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_replacing_entry_replaces_its_weight(self):
+        cache = LocalCache(maxsize=10, ttl_seconds=60, max_weight=10)
+        cache.set("a", 1, weight=6)
+        cache.set("a", 2, weight=3)
+
+        assert cache.get("a") == 2
+        assert cache.weight == 3
+
+    def test_zero_size_disables_caching(self):
+        cache = LocalCache(maxsize=0, ttl_seconds=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert (cache.hits, cache.misses) == (0, 1)
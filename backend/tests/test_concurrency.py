@@ -0,0 +1,80 @@
+import threading
+from itertools import pairwise
+from uuid import uuid4
+
+from app.database import engine
+from app.exceptions import BusinessRuleError
+from app.models.device import Device
+from app.models.placement import PlacementCreate, RackPlacement
+from app.models.rack import Rack
+from app.services import placement_service, rack_service
+from sqlmodel import Session, col, delete, select
+
+THREADS = 30
+
+
+def test_concurrent_placements_never_overbook_a_rack():
+    # Committed for real: the placing threads use their own connections
+    with Session(engine) as session:
+        rack = Rack(
+            name="Contended", serial_number=f"RACK-{uuid4()}", total_units=42, max_power_w=5000
+        )
+        devices = [
+            Device(
+                name=f"Server {i}",
+                serial_number=f"SRV-{uuid4()}",
+                units_required=2,
+                power_w=400,
+            )
+            for i in range(THREADS)
+        ]
+        session.add_all([rack, *devices])
+        session.commit()
+        rack_id = rack.id
+        device_ids = [device.id for device in devices]
+
+    # Pairs of devices race for the same 15 spans; power allows only 12 of them
+    barrier = threading.Barrier(THREADS)
+    placed: list[int] = []
+    unexpected: list[BaseException] = []
+
+    def place(index: int) -> None:
+        placement = PlacementCreate(
+            device_id=device_ids[index], start_unit=1 + 2 * (index // 2)
+        )
+        with Session(engine) as session:
+            barrier.wait()
+            try:
+                placement_service.place_device(session, rack_id, placement)
+                placed.append(index)
+            except BusinessRuleError:
+                pass
+            except BaseException as e:
+                unexpected.append(e)
+
+    threads = [threading.Thread(target=place, args=(i,)) for i in range(THREADS)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert unexpected == []
+        assert len(placed) == 12
+        with Session(engine) as session:
+            spans = sorted(
+                (p.start_unit, p.end_unit)
+                for p in session.exec(
+                    select(RackPlacement).where(RackPlacement.rack_id == rack_id)
+                )
+            )
+            assert all(a_end < b_start for (_, a_end), (b_start, _) in pairwise(spans))
+            rack = session.get(Rack, rack_id)
+            assert (rack.used_units, rack.current_power_w) == (24, 4800)
+            assert rack_service.find_rack_usage_drift(session) == []
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(RackPlacement).where(RackPlacement.rack_id == rack_id))
+            session.exec(delete(Device).where(col(Device.id).in_(device_ids)))
+            session.exec(delete(Rack).where(Rack.id == rack_id))
+            session.commit()
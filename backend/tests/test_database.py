@@ -0,0 +1,106 @@
+import pytest
+from app.database import InstrumentedQueuePool, pool_metrics
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import create_engine
+
+
+class TestPoolMetrics:
+    def test_counts_checkouts_waits_and_timeouts(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        try:
+            with engine.connect():
+                with pytest.raises(PoolTimeoutError):
+                    engine.connect()
+            with engine.connect():
+                pass
+
+            metrics = pool_metrics(engine.pool)
+            assert metrics["checkouts"] == 3
+            assert metrics["waits"] == 1
+            assert metrics["timeouts"] == 1
+            assert metrics["wait_seconds"] >= 0.05
+            assert metrics["checked_out"] == 0
+        finally:
+            engine.dispose()
+
+    def test_metrics_endpoint(self, client: TestClient):
+        client.get("/api/v1/devices/")
+
+        response = client.get("/api/v1/metrics")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data["pools"]) == {"sync", "async"}
+        assert data["pools"]["async"]["checkouts"] >= 1
+        assert {"size", "checked_out", "overflow", "waits"} <= set(data["pools"]["sync"])
+
+
+class TestWritesBeforeCommit:
+    def _listen(self, monkeypatch) -> list[set[str]]:
+        from app import database
+
+        seen: list[set[str]] = []
+        monkeypatch.setattr(
+            database, "_write_listeners", [lambda _session, tables: seen.append(tables)]
+        )
+        return seen
+
+    def test_reports_flushed_and_dml_tables_on_commit(self, session, monkeypatch):
+        from uuid import uuid4
+
+        from app.models.device import Device
+        from app.models.rack import Rack
+        from sqlmodel import update
+
+        seen = self._listen(monkeypatch)
+        session.add(
+            Device(name="d", serial_number=f"D-{uuid4()}", units_required=1, power_w=1)
+        )
+        session.exec(update(Rack).values(used_units=Rack.used_units))
+        assert seen == []
+
+        session.commit()
+
+        assert seen == [{"devices", "racks"}]
+
+    def test_uncommitted_writes_include_pending_changes(self, session):
+        from uuid import uuid4
+
+        from app.database import uncommitted_writes
+        from app.models.device import Device
+
+        assert uncommitted_writes(session) == set()
+        session.add(
+            Device(name="d", serial_number=f"D-{uuid4()}", units_required=1, power_w=1)
+        )
+
+        assert uncommitted_writes(session) == {"devices"}
+        session.commit()
+        assert uncommitted_writes(session) == set()
+
+    def test_rolled_back_writes_are_not_reported(self, monkeypatch):
+        from uuid import uuid4
+
+        from app.database import engine
+        from app.models.device import Device
+        from sqlmodel import Session
+
+        seen = self._listen(monkeypatch)
+        with Session(engine) as session:
+            session.add(
+                Device(
+                    name="d", serial_number=f"D-{uuid4()}", units_required=1, power_w=1
+                )
+            )
+            session.flush()
+            session.rollback()
+            session.commit()
+
+        assert seen == []
@@ -320,3 +320,1324 @@ class TestDistributionSummary:
             summary["placed_devices"] + summary["unplaced_devices"]
             == summary["total_devices"]
         )
+
+
+class TestDistributionLoading:
+
+    def test_all_missing_ids_reported(self, session: Session, sample_racks: list[Rack]):
+        from app.exceptions import NotFoundError
+
+        request = DistributionRequest(
+            device_ids=[99998, 99999],
+            rack_ids=[r.id for r in sample_racks],
+        )
+
+        with pytest.raises(NotFoundError) as exc_info:
+            calculate_distribution(session, request)
+
+        assert "99998" in exc_info.value.detail
+        assert "99999" in exc_info.value.detail
+
+    def test_request_order_preserved(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        rack_ids = [r.id for r in reversed(sample_racks)]
+        request = DistributionRequest(
+            device_ids=[d.id for d in sample_devices],
+            rack_ids=rack_ids,
+        )
+        result = calculate_distribution(session, request)
+
+        assert [r.rack_id for r in result.distribution] == rack_ids
+
+    def test_query_count_independent_of_id_count(
+        self, session: Session, count_statements
+    ):
+        racks = [
+            Rack(
+                name=f"Rack {i}",
+                serial_number=f"RACK-{uuid4()}",
+                total_units=42,
+                max_power_w=50000,
+            )
+            for i in range(20)
+        ]
+        devices = [
+            Device(
+                name=f"Server {i}",
+                serial_number=f"SRV-{uuid4()}",
+                units_required=1,
+                power_w=100,
+            )
+            for i in range(200)
+        ]
+        session.add_all(racks + devices)
+        session.commit()
+        device_ids = [d.id for d in devices]
+        rack_ids = [r.id for r in racks]
+
+        counts = []
+        for n_devices, n_racks in [(2, 1), (200, 20)]:
+            with count_statements() as statements:
+                calculate_distribution(
+                    session,
+                    DistributionRequest(
+                        device_ids=device_ids[:n_devices],
+                        rack_ids=rack_ids[:n_racks],
+                    ),
+                )
+            counts.append(len(statements))
+
+        # Data version, devices, racks
+        assert counts[0] == counts[1] == 3
+
+
+def _reference_distribution(
+    devices: list[Device], racks: list[Rack]
+) -> tuple[dict[int, list[int]], list[int]]:
+    """The original sort-per-device greedy, used to check result parity."""
+    state = {
+        r.id: {"rack": r, "devices": [], "units": 0, "power": 0, "util": 0.0}
+        for r in racks
+    }
+    unplaced = []
+    for device in sorted(devices, key=lambda d: d.power_w, reverse=True):
+        for entry in sorted(state.values(), key=lambda e: e["util"]):
+            rack = entry["rack"]
+            if entry["units"] + device.units_required > rack.total_units:
+                continue
+            if entry["power"] + device.power_w > rack.max_power_w:
+                continue
+            entry["devices"].append(device.id)
+            entry["units"] += device.units_required
+            entry["power"] += device.power_w
+            entry["util"] = round(entry["power"] / rack.max_power_w * 100, 2)
+            break
+        else:
+            unplaced.append(device.id)
+    return {rack_id: e["devices"] for rack_id, e in state.items()}, unplaced
+
+
+class TestDistributionParity:
+
+    @pytest.mark.parametrize("probe_limit", [1, 8])
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_matches_reference_greedy(
+        self, session: Session, seed: int, probe_limit: int, monkeypatch
+    ):
+        import random
+
+        from app.services import distribution_engine
+
+        # A limit of 1 routes most choices through the vectorized fallback
+        monkeypatch.setattr(distribution_engine, "HEAP_PROBE_LIMIT", probe_limit)
+
+        rng = random.Random(seed)
+        devices = [
+            Device(
+                name=f"Device {i}",
+                serial_number=f"PAR-{uuid4()}",
+                units_required=rng.choice([1, 1, 2, 4, 8]),
+                power_w=rng.choice([150, 300, 500, 800, 1200]),
+            )
+            for i in range(150)
+        ]
+        racks = [
+            Rack(
+                name=f"Rack {i}",
+                serial_number=f"PAR-RACK-{uuid4()}",
+                total_units=rng.choice([24, 42, 48]),
+                max_power_w=rng.choice([5000, 8000, 10000]),
+            )
+            for i in range(8)
+        ]
+        session.add_all(devices + racks)
+        session.commit()
+
+        # Duplicate ids exercise the request-order semantics as well
+        device_ids = [d.id for d in devices] + [devices[0].id]
+        rack_ids = [r.id for r in racks] + [racks[0].id]
+        request_devices = [*devices, devices[0]]
+        request_racks = [*racks, racks[0]]
+
+        result = calculate_distribution(
+            session, DistributionRequest(device_ids=device_ids, rack_ids=rack_ids)
+        )
+        expected_racks, expected_unplaced = _reference_distribution(
+            request_devices, request_racks
+        )
+
+        assert {
+            r.rack_id: [d.id for d in r.devices] for r in result.distribution
+        } == expected_racks
+        assert [u.device_id for u in result.unplaced_devices] == expected_unplaced
+
+
+class TestDistributionRespectPlacements:
+
+    def _place(self, session: Session, rack: Rack, device: Device, start_unit: int):
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import place_device
+
+        return place_device(
+            session, rack.id, PlacementCreate(device_id=device.id, start_unit=start_unit)
+        )
+
+    def test_seeds_from_existing_placements(
+        self, session: Session, make_rack, make_device
+    ):
+        rack = make_rack(total_units=10, max_power_w=5000)
+        existing = make_device(units=2, power=1000)
+        self._place(session, rack, existing, start_unit=4)
+        new = [make_device(units=3, power=500) for _ in range(2)]
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in new],
+                rack_ids=[rack.id],
+                respect_placements=True,
+            ),
+        )
+
+        rack_result = result.distribution[0]
+        assert rack_result.used_units == 8
+        assert rack_result.total_power_w == 2000
+        # Best fit: the 3U gap at 1-3 first, then the start of the 5U gap at 6-10
+        assert [(d.start_unit, d.end_unit) for d in rack_result.devices] == [
+            (1, 3),
+            (6, 8),
+        ]
+
+    def test_plan_can_be_applied(self, session: Session, make_rack, make_device):
+        rack = make_rack(total_units=12, max_power_w=10000)
+        self._place(session, rack, make_device(units=1, power=200), 6)
+        devices = [
+            make_device(units=units, power=300)
+            for units in (4, 3, 2, 1, 1)
+        ]
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_ids=[rack.id],
+                respect_placements=True,
+            ),
+        )
+
+        by_id = {d.id: d for d in devices}
+        for planned in result.distribution[0].devices:
+            self._place(session, rack, by_id[planned.id], planned.start_unit)
+        assert result.summary["placed_devices"] == len(devices)
+
+    def test_requires_contiguous_gap(self, session: Session, make_rack, make_device):
+        rack = make_rack(total_units=6, max_power_w=5000)
+        self._place(session, rack, make_device(units=1, power=100), 3)
+        device = make_device(units=4, power=100)
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[device.id], rack_ids=[rack.id], respect_placements=True
+            ),
+        )
+
+        assert len(result.unplaced_devices) == 1
+        assert "contiguous" in result.unplaced_devices[0].reason
+
+    def test_already_placed_device_is_unplaced(
+        self, session: Session, make_rack, make_device
+    ):
+        rack = make_rack(total_units=42, max_power_w=5000)
+        device = make_device(units=1, power=100)
+        self._place(session, rack, device, 1)
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[device.id], rack_ids=[rack.id], respect_placements=True
+            ),
+        )
+
+        assert result.unplaced_devices[0].device_id == device.id
+        assert "already placed" in result.unplaced_devices[0].reason
+
+
+class TestDistributionApply:
+
+    def _plan(self, session: Session, devices: list[Device], racks: list[Rack]):
+        return calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_ids=[r.id for r in racks],
+                respect_placements=True,
+            ),
+        )
+
+    def test_apply_writes_all_placements(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        from app.models.distribution import DistributionApplyRequest
+        from app.services.distribution_service import apply_distribution
+        from app.services.placement_service import get_rack_ids_for_devices
+
+        plan = self._plan(session, sample_devices, sample_racks)
+        result = apply_distribution(
+            session, DistributionApplyRequest(distribution=plan.distribution)
+        )
+
+        assert result.applied_placements == len(sample_devices)
+        placed = get_rack_ids_for_devices(session, [d.id for d in sample_devices])
+        assert placed == {
+            d.id: r.rack_id for r in plan.distribution for d in r.devices
+        }
+
+    def test_conflict_rolls_back_everything(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        from app.exceptions import BusinessRuleError
+        from app.models.distribution import DistributionApplyRequest
+        from app.models.placement import PlacementCreate
+        from app.services.distribution_service import apply_distribution
+        from app.services.placement_service import (get_rack_ids_for_devices,
+                                                    place_device)
+
+        plan = self._plan(session, sample_devices, sample_racks)
+        # Another device takes a planned slot before the plan is applied
+        rack = plan.distribution[0]
+        blocker = Device(
+            name="Blocker", serial_number=f"BLK-{uuid4()}", units_required=1, power_w=10
+        )
+        session.add(blocker)
+        session.commit()
+        place_device(
+            session,
+            rack.rack_id,
+            PlacementCreate(device_id=blocker.id, start_unit=rack.devices[0].start_unit),
+        )
+
+        with pytest.raises(BusinessRuleError) as exc_info:
+            apply_distribution(
+                session, DistributionApplyRequest(distribution=plan.distribution)
+            )
+
+        assert "existing placement" in exc_info.value.detail
+        assert get_rack_ids_for_devices(session, [d.id for d in sample_devices]) == {}
+
+    def test_plan_without_start_units_is_rejected(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        from app.exceptions import BusinessRuleError
+        from app.models.distribution import DistributionApplyRequest
+        from app.services.distribution_service import apply_distribution
+
+        plan = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in sample_devices],
+                rack_ids=[r.id for r in sample_racks],
+            ),
+        )
+
+        with pytest.raises(BusinessRuleError):
+            apply_distribution(
+                session, DistributionApplyRequest(distribution=plan.distribution)
+            )
+
+    def test_start_unit_below_one_is_rejected(self, client):
+        device = {"id": 1, "name": "Server", "power_w": 100, "units_required": 1}
+        rack = {
+            "rack_id": 1,
+            "rack_name": "Rack",
+            "total_units": 42,
+            "max_power_w": 5000,
+            "devices": [{**device, "start_unit": 0, "end_unit": 0}],
+        }
+
+        response = client.post(
+            "/api/v1/distribution/apply", json={"distribution": [rack]}
+        )
+
+        assert response.status_code == 422
+
+
+class TestDistributionBatch:
+
+    def _scenarios(
+        self, devices: list[Device], racks: list[Rack]
+    ) -> list[DistributionRequest]:
+        device_ids = [d.id for d in devices]
+        rack_ids = [r.id for r in racks]
+        return [
+            DistributionRequest(device_ids=device_ids, rack_ids=rack_ids),
+            DistributionRequest(device_ids=device_ids[:3], rack_ids=rack_ids[:1]),
+            DistributionRequest(device_ids=device_ids[2:], rack_ids=rack_ids[::-1]),
+            DistributionRequest(
+                device_ids=device_ids, rack_ids=rack_ids, respect_placements=True
+            ),
+        ]
+
+    def _batch(self, session: Session, scenarios: list[DistributionRequest]):
+        from app.models.distribution import (DistributionBatchRequest,
+                                             DistributionBatchResponse)
+        from app.services.distribution_service import calculate_distribution_batch
+
+        result = calculate_distribution_batch(
+            session, DistributionBatchRequest(scenarios=scenarios)
+        )
+        return DistributionBatchResponse.model_validate_json(result.to_json())
+
+    def _without_timing(self, response) -> dict:
+        data = response.model_dump()
+        data["summary"].pop("elapsed_ms", None)
+        return data
+
+    def test_matches_individual_calculations(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        scenarios = self._scenarios(sample_devices, sample_racks)
+        result = self._batch(session, scenarios)
+
+        assert result.summary["scenarios"] == len(scenarios)
+        assert [self._without_timing(r) for r in result.results] == [
+            calculate_distribution(session, s).model_dump() for s in scenarios
+        ]
+        assert all(r.summary["elapsed_ms"] >= 0 for r in result.results)
+
+    def test_process_pool_matches_inline(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        from app.config import settings
+        from app.services import distribution_service
+
+        scenarios = self._scenarios(sample_devices, sample_racks)
+        inline = self._batch(session, scenarios)
+
+        monkeypatch.setattr(distribution_service, "BATCH_INLINE_MAX_DEVICES", 0)
+        monkeypatch.setattr(settings, "DISTRIBUTION_WORKERS", 2)
+        try:
+            pooled = self._batch(session, scenarios)
+        finally:
+            distribution_service.shutdown_executor()
+
+        assert inline.summary["workers"] == 0
+        assert pooled.summary["workers"] == 2
+        assert [self._without_timing(r) for r in pooled.results] == [
+            self._without_timing(r) for r in inline.results
+        ]
+
+    def test_union_loaded_once(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        count_statements,
+    ):
+        from app.models.distribution import DistributionBatchRequest
+        from app.services.distribution_service import calculate_distribution_batch
+
+        scenarios = self._scenarios(sample_devices, sample_racks)
+        counts = []
+        for copies in (1, 10):
+            with count_statements() as statements:
+                calculate_distribution_batch(
+                    session, DistributionBatchRequest(scenarios=scenarios * copies)
+                )
+            counts.append(len(statements))
+
+        # Devices, racks, placement spans and placed devices
+        assert counts[0] == counts[1] == 4
+
+    def test_missing_id_fails_whole_batch(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        from app.exceptions import NotFoundError
+        from app.models.distribution import DistributionBatchRequest
+        from app.services.distribution_service import calculate_distribution_batch
+
+        scenarios = self._scenarios(sample_devices, sample_racks)
+        scenarios.append(DistributionRequest(device_ids=[99999], rack_ids=[]))
+
+        with pytest.raises(NotFoundError):
+            calculate_distribution_batch(
+                session, DistributionBatchRequest(scenarios=scenarios)
+            )
+
+    def test_endpoint_reports_each_scenario(self, client):
+        response = client.post(
+            "/api/v1/distribution/calculate-batch",
+            json={"scenarios": [{"device_ids": [], "rack_ids": []}] * 3},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["summary"]["scenarios"] == 3
+        assert [r["summary"]["total_devices"] for r in data["results"]] == [0, 0, 0]
+        assert all("elapsed_ms" in r["summary"] for r in data["results"])
+
+    def test_empty_batch_rejected(self, client):
+        response = client.post(
+            "/api/v1/distribution/calculate-batch", json={"scenarios": []}
+        )
+
+        assert response.status_code == 422
+
+
+class TestDistributionCache:
+
+    def _request(self, devices: list[Device], racks: list[Rack]) -> DistributionRequest:
+        return DistributionRequest(
+            device_ids=[d.id for d in devices], rack_ids=[r.id for r in racks]
+        )
+
+    def test_repeated_request_is_served_from_cache(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        count_statements,
+    ):
+        request = self._request(sample_devices, sample_racks)
+        first = calculate_distribution(session, request)
+
+        with count_statements() as statements:
+            second = calculate_distribution(session, request)
+
+        assert second is first
+        # Only the data version is read
+        assert len(statements) == 1
+        assert "data_versions" in statements[0]
+
+    def test_device_update_invalidates(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        request = self._request(sample_devices, sample_racks)
+        before = calculate_distribution(session, request)
+
+        sample_devices[0].power_w += 1
+        session.add(sample_devices[0])
+        session.commit()
+        after = calculate_distribution(session, request)
+
+        assert after is not before
+        assert sum(r.total_power_w for r in after.distribution) == (
+            sum(r.total_power_w for r in before.distribution) + 1
+        )
+
+    def test_placement_invalidates(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import place_device
+
+        request = DistributionRequest(
+            device_ids=[d.id for d in sample_devices[1:]],
+            rack_ids=[r.id for r in sample_racks],
+            respect_placements=True,
+        )
+        before = calculate_distribution(session, request)
+
+        place_device(
+            session,
+            sample_racks[0].id,
+            PlacementCreate(device_id=sample_devices[0].id, start_unit=1),
+        )
+        after = calculate_distribution(session, request)
+
+        assert after is not before
+        rack = next(r for r in after.distribution if r.rack_id == sample_racks[0].id)
+        first_free = sample_devices[0].units_required + 1
+        assert all(d.start_unit >= first_free for d in rack.devices)
+
+    def test_version_is_stored_with_the_commit(self, session: Session):
+        from app.services import data_version_service
+        from app.services.distribution_service import DISTRIBUTION_DATA_VERSION
+
+        def version() -> int:
+            return data_version_service.get_version(session, DISTRIBUTION_DATA_VERSION)
+
+        before = version()
+        session.add(
+            Rack(name="r", serial_number=f"R-{uuid4()}", total_units=1, max_power_w=1)
+        )
+        session.flush()
+        assert version() == before
+
+        session.commit()
+        assert version() != before
+
+    def test_uncommitted_writes_bypass_cache(
+        self, session: Session, sample_devices: list[Device], sample_racks: list[Rack]
+    ):
+        request = self._request(sample_devices, sample_racks)
+        before = calculate_distribution(session, request)
+
+        sample_devices[0].power_w += 1
+        session.add(sample_devices[0])
+        first = calculate_distribution(session, request)
+        second = calculate_distribution(session, request)
+
+        assert first is not before
+        assert second is not first
+        assert sum(r.total_power_w for r in first.distribution) == (
+            sum(r.total_power_w for r in before.distribution) + 1
+        )
+
+    def test_pool_workers_do_not_cache(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        monkeypatch,
+    ):
+        from app.services import distribution_service
+
+        monkeypatch.setattr(distribution_service, "_in_pool_worker", True)
+        request = self._request(sample_devices, sample_racks)
+
+        first = calculate_distribution(session, request)
+        second = calculate_distribution(session, request)
+
+        assert second is not first
+
+    def test_results_above_weight_bound_are_not_cached(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        monkeypatch,
+    ):
+        from app.cache import LocalCache
+        from app.services import distribution_service
+
+        cache = LocalCache(10, 60, max_weight=len(sample_devices) - 1)
+        monkeypatch.setattr(distribution_service, "_cache", cache)
+        request = self._request(sample_devices, sample_racks)
+
+        calculate_distribution(session, request)
+        calculate_distribution(
+            session, self._request(sample_devices[1:], sample_racks)
+        )
+
+        assert len(cache) == 1
+        assert cache.weight == len(sample_devices) - 1
+
+
+def _reference_strategy(
+    devices: list, racks: list, strategy: str
+) -> tuple[list[int], list[int]]:
+    """Each strategy's choice rule checked against every rack, one by one."""
+    mean_units = sum(r.total_units for r in racks) / len(racks)
+    mean_power = sum(r.max_power_w for r in racks) / len(racks)
+    order = sorted(
+        range(len(devices)),
+        key=lambda i: devices[i].units_required / mean_units
+        + devices[i].power_w / mean_power,
+        reverse=True,
+    )
+    free_units = [r.total_units for r in racks]
+    free_power = [r.max_power_w for r in racks]
+    rank = {
+        "first_fit": lambda d, j: (j,),
+        "best_fit": lambda d, j: (free_units[j], free_power[j], j),
+        "worst_fit": lambda d, j: (-free_units[j], -free_power[j], j),
+        "dot_product": lambda d, j: (
+            -(
+                d.units_required / racks[j].total_units
+                * free_units[j] / racks[j].total_units
+                + d.power_w / racks[j].max_power_w
+                * free_power[j] / racks[j].max_power_w
+            ),
+            j,
+        ),
+    }[strategy]
+
+    assignments = [-1] * len(devices)
+    for i in order:
+        device = devices[i]
+        fitting = [
+            j
+            for j in range(len(racks))
+            if free_units[j] >= device.units_required
+            and free_power[j] >= device.power_w
+        ]
+        if fitting:
+            j = min(fitting, key=lambda j: rank(device, j))
+            assignments[i] = j
+            free_units[j] -= device.units_required
+            free_power[j] -= device.power_w
+    return order, assignments
+
+
+class TestDistributionStrategies:
+
+    @pytest.mark.parametrize("probe_limit", [1, 8])
+    @pytest.mark.parametrize("seed", [1, 2])
+    @pytest.mark.parametrize(
+        "strategy", ["first_fit", "best_fit", "worst_fit", "dot_product"]
+    )
+    def test_matches_reference(
+        self, strategy: str, seed: int, probe_limit: int, monkeypatch, make_fleet
+    ):
+        from app.services import distribution_engine
+
+        # A limit of 1 routes most choices through the vectorized fallback
+        monkeypatch.setattr(distribution_engine, "HEAP_PROBE_LIMIT", probe_limit)
+        devices, racks = make_fleet(
+            seed,
+            devices=300,
+            racks=12,
+            device_power=[150, 300, 500, 800, 1200, 2500],
+            device_units=[1, 1, 2, 4, 8, 12],
+            rack_units=[24, 42, 48],
+            rack_power=[5000, 8000, 10000],
+        )
+
+        engine = distribution_engine.DistributionEngine(racks)
+        plan = engine.run(devices, strategy=strategy)
+
+        order, assignments = _reference_strategy(devices, racks, strategy)
+        assert plan.order == order
+        assert list(plan.assignments) == assignments
+
+    @pytest.mark.parametrize("strategy", ["first_fit", "best_fit", "worst_fit"])
+    def test_respects_contiguous_gaps(
+        self, session: Session, strategy: str, make_rack, make_device
+    ):
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import place_device
+
+        rack = make_rack(total_units=10, max_power_w=9000)
+        blocker = make_device(units=1, power=10)
+        devices = [make_device(units=units, power=100) for units in (4, 4, 1)]
+        place_device(
+            session, rack.id, PlacementCreate(device_id=blocker.id, start_unit=5)
+        )
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_ids=[rack.id],
+                respect_placements=True,
+                strategy=strategy,
+            ),
+        )
+
+        devices_placed = result.distribution[0].devices
+        spans = sorted((d.start_unit, d.end_unit) for d in devices_placed)
+        assert spans == [(1, 4), (6, 9), (10, 10)]
+
+    def test_unit_bound_fleet_places_more_than_balanced(
+        self, session: Session, make_rack, make_device
+    ):
+        # Power is plentiful; balanced spreads the small high-power devices
+        # over both racks and strands the 8U one
+        racks = [make_rack(total_units=10, max_power_w=100000) for _ in range(2)]
+        devices = [
+            make_device(units=units, power=power)
+            for units, power in [(2, 900), (2, 900), (2, 900), (6, 100), (8, 100)]
+        ]
+
+        placed = {}
+        for strategy in ("balanced", "first_fit", "best_fit"):
+            result = calculate_distribution(
+                session,
+                DistributionRequest(
+                    device_ids=[d.id for d in devices],
+                    rack_ids=[r.id for r in racks],
+                    strategy=strategy,
+                ),
+            )
+            placed[strategy] = result.summary["placed_devices"]
+
+        assert placed == {"balanced": 4, "first_fit": 5, "best_fit": 5}
+
+
+class TestDistributionOptimizer:
+
+    FLEET = {
+        "devices": 400,
+        "racks": 40,
+        "device_power": [150, 500, 900, 1500, 2500],
+        "device_units": [1, 2, 4, 8],
+        "rack_units": [42],
+        "rack_power": [10000],
+    }
+
+    def _distribute(self, devices: list, racks: list, time_budget_ms: int):
+        from app.services.distribution_service import Scenario, distribute
+
+        return distribute(Scenario(devices, racks, time_budget_ms=time_budget_ms))
+
+    def _assert_within_capacity(self, result) -> None:
+        for rack in result.distribution:
+            units = sum(d.units_required for d in rack.devices)
+            power = sum(d.power_w for d in rack.devices)
+            assert units == rack.used_units <= rack.total_units
+            assert power == rack.total_power_w <= rack.max_power_w
+
+    def _forbid_optimizer(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        from app.services import distribution_service
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("optimizer should not run")
+
+        monkeypatch.setattr(distribution_service, "_optimize", fail)
+
+    def test_zero_budget_keeps_greedy_plan(
+        self, monkeypatch: pytest.MonkeyPatch, make_fleet
+    ):
+        from app.services.distribution_engine import DistributionEngine
+        from app.services.distribution_optimizer import Problem, optimize
+
+        devices, racks = make_fleet(1, **self.FLEET)
+        plan = DistributionEngine(racks).run(devices)
+        problem = Problem(
+            units=[d.units_required for d in devices],
+            power=[d.power_w for d in devices],
+            total_units=[r.total_units for r in racks],
+            max_power_w=[r.max_power_w for r in racks],
+            assignments=list(plan.assignments),
+        )
+        self._forbid_optimizer(monkeypatch)
+
+        assert optimize(problem, 0).assignments == list(plan.assignments)
+        result = self._distribute(devices, racks, 0)
+        assert result.summary["placed_devices"] == sum(
+            position >= 0 for position in plan.assignments
+        )
+
+    @pytest.mark.parametrize("seed", [1, 2])
+    def test_spread_never_worse_and_capacity_kept(self, seed: int, make_fleet):
+        devices, racks = make_fleet(seed, **self.FLEET)
+
+        greedy = self._distribute(devices, racks, 0)
+        optimized = self._distribute(devices, racks, 300)
+
+        self._assert_within_capacity(optimized)
+        assert (
+            optimized.summary["unplaced_devices"] <= greedy.summary["unplaced_devices"]
+        )
+        assert (
+            optimized.summary["utilization_spread"]
+            <= greedy.summary["utilization_spread"]
+        )
+        placed = [d.id for rack in optimized.distribution for d in rack.devices]
+        unplaced = [d.device_id for d in optimized.unplaced_devices]
+        assert sorted(placed + unplaced) == [d.id for d in devices]
+
+    def test_places_device_greedy_strands(self):
+        from app.services.distribution_service import DeviceRow, RackRow
+
+        # Balanced puts one 5U device in each rack, leaving no room for 6U
+        devices = [
+            DeviceRow(1, "A", 3000, 5),
+            DeviceRow(2, "B", 3000, 5),
+            DeviceRow(3, "C", 100, 6),
+        ]
+        racks = [RackRow(1, "Rack 1", 10, 10000), RackRow(2, "Rack 2", 10, 10000)]
+
+        greedy = self._distribute(devices, racks, 0)
+        optimized = self._distribute(devices, racks, 200)
+
+        assert greedy.summary["unplaced_devices"] == 1
+        assert optimized.summary["unplaced_devices"] == 0
+        self._assert_within_capacity(optimized)
+
+    def test_budget_ignored_with_respect_placements(
+        self,
+        session: Session,
+        monkeypatch: pytest.MonkeyPatch,
+        make_rack,
+        make_device,
+    ):
+        rack = make_rack(total_units=10, max_power_w=1000)
+        devices = [make_device(units=2, power=100) for _ in range(3)]
+        self._forbid_optimizer(monkeypatch)
+
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_ids=[rack.id],
+                respect_placements=True,
+                time_budget_ms=200,
+            ),
+        )
+
+        devices_placed = result.distribution[0].devices
+        spans = sorted((d.start_unit, d.end_unit) for d in devices_placed)
+        assert spans == [(1, 2), (3, 4), (5, 6)]
+
+    def test_busy_executor_does_not_delay_result(self, make_fleet):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.services.distribution_engine import DistributionEngine
+        from app.services.distribution_optimizer import Problem, optimize
+
+        devices, racks = make_fleet(4, **self.FLEET)
+        problem = Problem(
+            units=[d.units_required for d in devices],
+            power=[d.power_w for d in devices],
+            total_units=[r.total_units for r in racks],
+            max_power_w=[r.max_power_w for r in racks],
+            assignments=list(DistributionEngine(racks).run(devices).assignments),
+        )
+        # The only worker stays busy for far longer than the budget
+        release = threading.Event()
+        timer = threading.Timer(5, release.set)
+        timer.start()
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(release.wait)
+        try:
+            started = time.perf_counter()
+            solution = optimize(problem, 50, executor, restarts=3)
+            elapsed = time.perf_counter() - started
+        finally:
+            timer.cancel()
+            release.set()
+            executor.shutdown()
+
+        assert elapsed < 2
+        assert len(solution.assignments) == len(devices)
+
+    def test_restarts_on_process_pool(
+        self, monkeypatch: pytest.MonkeyPatch, make_fleet
+    ):
+        from app.config import settings
+        from app.services import distribution_service
+
+        devices, racks = make_fleet(3, **self.FLEET)
+        greedy = self._distribute(devices, racks, 0)
+
+        monkeypatch.setattr(settings, "DISTRIBUTION_WORKERS", 2)
+        try:
+            optimized = self._distribute(devices, racks, 500)
+        finally:
+            distribution_service.shutdown_executor()
+
+        self._assert_within_capacity(optimized)
+        assert (
+            optimized.summary["utilization_spread"]
+            <= greedy.summary["utilization_spread"]
+        )
+
+
+class TestDistributionRebalance:
+
+    @pytest.fixture
+    def fill(self, session: Session, make_device):
+        """``fill(rack, [(units, power), ...])`` places devices back to back."""
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import place_device
+
+        def place(rack: Rack, devices: list[tuple[int, int]]) -> None:
+            start_unit = 1
+            for units, power in devices:
+                device = make_device(units=units, power=power)
+                place_device(
+                    session,
+                    rack.id,
+                    PlacementCreate(device_id=device.id, start_unit=start_unit),
+                )
+                start_unit += units
+
+        return place
+
+    def _rebalance(self, session: Session, racks: list[Rack], **values):
+        from app.models.distribution import DistributionRebalanceRequest
+        from app.services.distribution_service import calculate_rebalance
+
+        return calculate_rebalance(
+            session,
+            DistributionRebalanceRequest(rack_ids=[r.id for r in racks], **values),
+        )
+
+    def _replay(self, session: Session, racks: list[Rack], moves) -> dict[int, int]:
+        """Carry out ``moves`` in order on the stored placements; power per rack."""
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import (place_device,
+                                                    remove_device_from_rack)
+
+        for move in moves:
+            remove_device_from_rack(session, move.from_rack_id, move.device_id)
+            # Raises if the target lacks the units or the power at this point
+            place_device(
+                session,
+                move.to_rack_id,
+                PlacementCreate(device_id=move.device_id, start_unit=move.start_unit),
+            )
+        for rack in racks:
+            session.refresh(rack)
+        return {rack.id: rack.current_power_w for rack in racks}
+
+    def test_moves_into_added_rack(self, session: Session, make_rack, fill):
+        loaded = [make_rack() for _ in range(2)]
+        for rack in loaded:
+            fill(rack, [(2, 1000)] * 6)
+        added = make_rack()
+        racks = [*loaded, added]
+
+        result = self._rebalance(session, racks, target_spread_percent=10)
+
+        assert result.summary["spread_before"] == 60.0
+        assert result.summary["target_reached"]
+        assert {move.to_rack_id for move in result.moves} == {added.id}
+        assert result.summary["moves"] == len(result.moves) == 4
+        assert result.summary["moved_units"] == 8
+        power = self._replay(session, racks, result.moves)
+        assert power == {r.id: 4000 for r in racks}
+
+    def test_prefers_fewest_units(self, session: Session, make_rack, fill):
+        source = make_rack()
+        fill(source, [(8, 1500), (1, 1500), (4, 800)])
+        target = make_rack()
+
+        result = self._rebalance(session, [source, target], target_spread_percent=20)
+
+        assert [move.units_required for move in result.moves] == [1]
+        assert result.summary["spread_after"] == 8.0
+
+    def test_swaps_into_rack_full_in_units(self, session: Session, make_rack, fill):
+        full = make_rack(total_units=10)
+        fill(full, [(5, 200), (5, 200)])
+        busy = make_rack(total_units=42)
+        fill(busy, [(5, 2000)] * 4)
+        spare = make_rack(total_units=42)
+        racks = [full, busy, spare]
+
+        result = self._rebalance(session, racks, target_spread_percent=30)
+
+        assert result.summary["target_reached"]
+        assert any(move.from_rack_id == full.id for move in result.moves)
+        power = self._replay(session, racks, result.moves)
+        assert max(power.values()) - min(power.values()) <= 3000
+
+    def test_balanced_racks_need_no_moves(self, session: Session, make_rack, fill):
+        racks = [make_rack() for _ in range(2)]
+        for rack in racks:
+            fill(rack, [(2, 1000)] * 3)
+
+        result = self._rebalance(session, racks)
+
+        assert result.moves == []
+        assert result.summary["target_reached"]
+
+    def test_max_moves(self, session: Session, make_rack, fill):
+        loaded = make_rack()
+        fill(loaded, [(2, 1000)] * 8)
+        racks = [loaded, make_rack()]
+
+        result = self._rebalance(session, racks, target_spread_percent=0, max_moves=2)
+
+        assert len(result.moves) == 2
+        assert not result.summary["target_reached"]
+
+    def test_unknown_rack(self, client):
+        response = client.post(
+            "/api/v1/distribution/rebalance", json={"rack_ids": [999999]}
+        )
+
+        assert response.status_code == 404
+
+
+class TestDistributionSelectors:
+
+    @pytest.fixture
+    def fleet(self, session: Session) -> tuple[str, list[Device], list[Rack]]:
+        from app.models.placement import PlacementCreate
+        from app.services.placement_service import place_device
+
+        prefix = f"SEL-{uuid4().hex[:8]}-"
+        devices = [
+            Device(
+                name=f"Selected {i}",
+                serial_number=f"{prefix}{i}",
+                units_required=units,
+                power_w=power,
+            )
+            for i, (units, power) in enumerate(
+                [(1, 200), (2, 400), (4, 800), (1, 1600), (2, 3200)]
+            )
+        ]
+        racks = [
+            Rack(
+                name=f"{prefix}Room A {i}",
+                serial_number=f"{prefix}RACK-{i}",
+                total_units=units,
+                max_power_w=10000,
+            )
+            for i, units in enumerate([42, 42, 2])
+        ]
+        session.add_all([*devices, *racks])
+        session.commit()
+        # The small rack is full in units; device 0 is placed in it
+        place_device(
+            session, racks[2].id, PlacementCreate(device_id=devices[0].id, start_unit=1)
+        )
+        place_device(
+            session, racks[2].id, PlacementCreate(device_id=devices[3].id, start_unit=2)
+        )
+        return prefix, devices, racks
+
+    def _device_ids(self, result) -> list[int]:
+        placed = [d.id for rack in result.distribution for d in rack.devices]
+        return sorted(placed + [d.device_id for d in result.unplaced_devices])
+
+    def test_device_filters(self, session: Session, fleet):
+        from app.models.distribution import DeviceSelector
+
+        prefix, devices, racks = fleet
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_selector=DeviceSelector(
+                    serial_prefix=prefix, unplaced=True, min_power_w=400, max_units=2
+                ),
+                rack_ids=[racks[0].id],
+            ),
+        )
+
+        assert self._device_ids(result) == [devices[1].id, devices[4].id]
+
+    def test_id_ranges(self, session: Session, fleet):
+        from app.models.distribution import DeviceSelector, IdRange
+
+        prefix, devices, racks = fleet
+        selector = DeviceSelector(
+            serial_prefix=prefix,
+            id_ranges=[
+                IdRange(first=devices[0].id, last=devices[1].id),
+                IdRange(first=devices[4].id, last=devices[4].id),
+            ],
+        )
+        result = calculate_distribution(
+            session,
+            DistributionRequest(device_selector=selector, rack_ids=[racks[0].id]),
+        )
+
+        assert self._device_ids(result) == [d.id for d in devices[:2] + devices[4:]]
+
+    def test_serial_prefix_is_literal(self, session: Session, fleet):
+        from app.models.distribution import DeviceSelector
+
+        _, _, racks = fleet
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_selector=DeviceSelector(serial_prefix="%"),
+                rack_ids=[racks[0].id],
+            ),
+        )
+
+        assert result.summary["total_devices"] == 0
+
+    def test_racks_with_free_capacity(self, session: Session, fleet):
+        from app.models.distribution import DeviceSelector, RackSelector
+
+        prefix, devices, racks = fleet
+        result = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_selector=DeviceSelector(serial_prefix=prefix, unplaced=True),
+                rack_selector=RackSelector(
+                    name_prefix=f"{prefix}Room", with_free_capacity=True
+                ),
+                respect_placements=True,
+            ),
+        )
+
+        assert [r.rack_id for r in result.distribution] == [racks[0].id, racks[1].id]
+        assert result.summary["placed_devices"] == 3
+
+    def test_matches_listed_ids(self, session: Session, fleet):
+        from app.models.distribution import DeviceSelector, RackSelector
+
+        prefix, devices, racks = fleet
+        selected = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_selector=DeviceSelector(serial_prefix=prefix),
+                rack_selector=RackSelector(serial_prefix=prefix),
+                respect_placements=True,
+            ),
+        )
+        listed = calculate_distribution(
+            session,
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_ids=[r.id for r in racks],
+                respect_placements=True,
+            ),
+        )
+
+        assert selected == listed
+
+    def test_batch_scenarios_with_selectors(self, session: Session, fleet):
+        import json
+
+        from app.models.distribution import (DeviceSelector,
+                                             DistributionBatchRequest,
+                                             RackSelector)
+        from app.services.distribution_service import calculate_distribution_batch
+
+        prefix, devices, racks = fleet
+        scenarios = [
+            DistributionRequest(
+                device_selector=DeviceSelector(serial_prefix=prefix, unplaced=True),
+                rack_selector=RackSelector(serial_prefix=prefix),
+                respect_placements=True,
+            ),
+            DistributionRequest(
+                device_ids=[d.id for d in devices],
+                rack_selector=RackSelector(
+                    serial_prefix=prefix, min_free_units=10
+                ),
+            ),
+        ]
+        batch = calculate_distribution_batch(
+            session, DistributionBatchRequest(scenarios=scenarios)
+        )
+
+        results = json.loads(batch.to_json())["results"]
+        for result, scenario in zip(results, scenarios, strict=True):
+            expected = calculate_distribution(session, scenario).model_dump(mode="json")
+            result["summary"].pop("elapsed_ms")
+            assert result == expected
+
+    def test_selection_is_one_query_per_side(
+        self, session: Session, fleet, count_statements
+    ):
+        from app.models.distribution import DeviceSelector, RackSelector
+
+        prefix, _, _ = fleet
+        with count_statements() as statements:
+            calculate_distribution(
+                session,
+                DistributionRequest(
+                    device_selector=DeviceSelector(serial_prefix=prefix),
+                    rack_selector=RackSelector(serial_prefix=prefix),
+                ),
+            )
+
+        # Data version, then one query per side
+        assert len(statements) == 3
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            {"rack_ids": [1]},
+            {"device_ids": [1], "device_selector": {"unplaced": True}, "rack_ids": [1]},
+            {"device_ids": [1]},
+        ],
+    )
+    def test_exactly_one_of_ids_and_selector(self, client, values: dict):
+        response = client.post("/api/v1/distribution/calculate", json=values)
+
+        assert response.status_code == 400
+
+
+class TestDistributionNdjson:
+
+    def _request(self, devices: list[Device], racks: list[Rack], **values):
+        return DistributionRequest(
+            device_ids=[d.id for d in devices], rack_ids=[r.id for r in racks], **values
+        )
+
+    def _lines(self, chunks) -> list[dict]:
+        import json
+
+        body = b"".join(chunks)
+        assert body.endswith(b"\n")
+        return [json.loads(line) for line in body.splitlines()]
+
+    def _expected(self, response) -> list[dict]:
+        response = response.model_dump(mode="json")
+        return [
+            *({"type": "rack", **rack} for rack in response["distribution"]),
+            *({"type": "unplaced", **d} for d in response["unplaced_devices"]),
+            {"type": "summary", **response["summary"]},
+        ]
+
+    @pytest.mark.parametrize("respect_placements", [False, True])
+    def test_lines_match_response(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        respect_placements: bool,
+    ):
+        from app.services.distribution_service import calculate_distribution_stream
+
+        small = Rack(
+            name="Small", serial_number=f"ND-{uuid4()}", total_units=4, max_power_w=5000
+        )
+        other = Rack(
+            name="Other", serial_number=f"ND-{uuid4()}", total_units=2, max_power_w=5000
+        )
+        session.add_all([small, other])
+        session.commit()
+        request = self._request(
+            sample_devices, [small, other], respect_placements=respect_placements
+        )
+
+        streamed = self._lines(calculate_distribution_stream(session, request))
+        expected = self._expected(calculate_distribution(session, request))
+
+        assert streamed == expected
+        assert [line["type"] for line in streamed].count("unplaced") > 0
+        # Now served from the cache
+        cached = self._lines(calculate_distribution_stream(session, request))
+        assert cached == expected
+
+    def test_chunks_hold_whole_lines(
+        self,
+        session: Session,
+        sample_devices: list[Device],
+        sample_racks: list[Rack],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        from app.services import distribution_service
+
+        monkeypatch.setattr(distribution_service, "NDJSON_CHUNK_BYTES", 1)
+        request = self._request(sample_devices, sample_racks)
+
+        stream = distribution_service.calculate_distribution_stream(session, request)
+        chunks = list(stream)
+
+        assert len(chunks) == len(sample_racks) + 1
+        assert all(chunk.count(b"\n") == 1 for chunk in chunks)
+
+    def test_endpoint_streams_with_accept_header(self, client):
+        prefix = f"ND-NONE-{uuid4()}"
+        response = client.post(
+            "/api/v1/distribution/calculate",
+            json={
+                "device_selector": {"serial_prefix": prefix},
+                "rack_selector": {"serial_prefix": prefix},
+            },
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = self._lines([response.content])
+        assert [line["type"] for line in lines] == ["summary"]
+        assert lines[0]["total_devices"] == 0
+
+    def test_endpoint_errors_before_streaming(self, client):
+        response = client.post(
+            "/api/v1/distribution/calculate",
+            json={"device_ids": [999999], "rack_ids": [999999]},
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 404
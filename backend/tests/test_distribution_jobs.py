@@ -0,0 +1,253 @@
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from app.database import engine
+from app.models.device import Device
+from app.models.distribution import DistributionRequest
+from app.models.distribution_job import DistributionJob, utc_now
+from app.models.rack import Rack
+from app.services import distribution_job_service, distribution_service
+from sqlalchemy import func
+from sqlmodel import Session, col, delete, select
+
+
+@pytest.fixture
+def fleet() -> Generator[tuple[list[int], list[int]], None, None]:
+    # Committed for real: jobs run on their own connections
+    with Session(engine) as session:
+        racks = [
+            Rack(
+                name=f"Job Rack {i}",
+                serial_number=f"JOB-RACK-{uuid4()}",
+                total_units=42,
+                max_power_w=5000,
+            )
+            for i in range(2)
+        ]
+        devices = [
+            Device(
+                name=f"Job Server {i}",
+                serial_number=f"JOB-SRV-{uuid4()}",
+                units_required=2,
+                power_w=300,
+            )
+            for i in range(6)
+        ]
+        session.add_all([*racks, *devices])
+        session.commit()
+        device_ids = [device.id for device in devices]
+        rack_ids = [rack.id for rack in racks]
+        last_job_id = session.exec(select(func.max(DistributionJob.id))).one() or 0
+
+    yield device_ids, rack_ids
+
+    with Session(engine) as session:
+        session.exec(
+            delete(DistributionJob).where(col(DistributionJob.id) > last_job_id)
+        )
+        session.exec(delete(Device).where(col(Device.id).in_(device_ids)))
+        session.exec(delete(Rack).where(col(Rack.id).in_(rack_ids)))
+        session.commit()
+
+
+def _pending_job(request: DistributionRequest, **values) -> int:
+    """Store a job without queueing it, so it can be run in-process."""
+    with Session(engine) as session:
+        job = DistributionJob(request=request.model_dump(), **values)
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def _job(job_id: int) -> DistributionJob:
+    with Session(engine) as session:
+        return distribution_job_service.get_job(session, job_id)
+
+
+class TestRunJob:
+
+    def test_result_is_persisted(self, fleet):
+        device_ids, rack_ids = fleet
+        request = DistributionRequest(device_ids=device_ids, rack_ids=rack_ids)
+        job_id = _pending_job(request)
+
+        distribution_job_service.run_job(job_id)
+
+        job = _job(job_id)
+        assert job.status == "succeeded"
+        assert job.progress == 1.0
+        assert job.started_at is not None and job.finished_at is not None
+        with Session(engine) as session:
+            expected = distribution_service.calculate_distribution(session, request)
+        assert job.result == expected.model_dump_json()
+
+    def test_cancelled_while_pending_never_runs(self, fleet):
+        device_ids, rack_ids = fleet
+        job_id = _pending_job(
+            DistributionRequest(device_ids=device_ids, rack_ids=rack_ids)
+        )
+
+        with Session(engine) as session:
+            distribution_job_service.cancel_job(session, job_id)
+        distribution_job_service.run_job(job_id)
+
+        job = _job(job_id)
+        assert job.status == "cancelled"
+        assert job.started_at is None
+        assert job.result is None
+
+    def test_cancel_requested_stops_running_job(self, fleet):
+        device_ids, rack_ids = fleet
+        job_id = _pending_job(
+            DistributionRequest(device_ids=device_ids, rack_ids=rack_ids),
+            cancel_requested=True,
+        )
+
+        distribution_job_service.run_job(job_id)
+
+        job = _job(job_id)
+        assert job.status == "cancelled"
+        assert job.started_at is not None
+        assert job.result is None
+
+    def test_error_is_recorded(self, fleet):
+        _, rack_ids = fleet
+        job_id = _pending_job(
+            DistributionRequest(device_ids=[999999], rack_ids=rack_ids)
+        )
+
+        distribution_job_service.run_job(job_id)
+
+        job = _job(job_id)
+        assert job.status == "failed"
+        assert "999999" in job.error
+
+    def test_finished_job_cannot_be_cancelled(self, fleet):
+        from app.exceptions import BusinessRuleError
+
+        device_ids, rack_ids = fleet
+        job_id = _pending_job(
+            DistributionRequest(device_ids=device_ids, rack_ids=rack_ids)
+        )
+        distribution_job_service.run_job(job_id)
+
+        with Session(engine) as session, pytest.raises(BusinessRuleError):
+            distribution_job_service.cancel_job(session, job_id)
+
+
+class TestJobRecovery:
+
+    def _request(self, fleet) -> DistributionRequest:
+        device_ids, rack_ids = fleet
+        return DistributionRequest(device_ids=device_ids, rack_ids=rack_ids)
+
+    def test_running_job_with_stale_heartbeat_is_failed(self, fleet):
+        stale = utc_now() - distribution_job_service.HEARTBEAT_TIMEOUT * 2
+        job_id = _pending_job(
+            self._request(fleet), status="running", heartbeat_at=stale
+        )
+
+        job = _job(job_id)
+
+        assert job.status == "failed"
+        assert job.finished_at is not None
+        assert "stopped" in job.error
+
+    def test_running_job_with_fresh_heartbeat_is_kept(self, fleet):
+        job_id = _pending_job(
+            self._request(fleet), status="running", heartbeat_at=utc_now()
+        )
+
+        assert _job(job_id).status == "running"
+
+    def test_startup_requeues_pending_jobs(self, fleet, monkeypatch):
+        submitted: list[int] = []
+        monkeypatch.setattr(distribution_job_service, "_submit", submitted.append)
+        job_id = _pending_job(self._request(fleet))
+
+        with Session(engine) as session:
+            distribution_job_service.recover_jobs(session)
+
+        assert job_id in submitted
+
+    def test_jobs_still_queued_at_shutdown_are_cancelled(self, fleet, monkeypatch):
+        from app.services import distribution_service
+
+        # A single busy worker keeps the job in the queue
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(release.wait)
+        monkeypatch.setattr(distribution_service, "get_executor", lambda: executor)
+        job_id = _pending_job(self._request(fleet))
+        try:
+            distribution_job_service._submit(job_id)
+            cancelled = distribution_job_service.cancel_queued_jobs()
+        finally:
+            release.set()
+            executor.shutdown()
+
+        assert cancelled == 1
+        job = _job(job_id)
+        assert job.status == "cancelled"
+        assert "shut down" in job.error
+
+    def test_heartbeat_is_renewed_while_running(self, fleet, monkeypatch):
+        stale = utc_now() - distribution_job_service.HEARTBEAT_TIMEOUT * 2
+        job_id = _pending_job(
+            self._request(fleet), status="running", heartbeat_at=stale
+        )
+        monkeypatch.setattr(
+            distribution_job_service, "HEARTBEAT_INTERVAL", timedelta(seconds=0.01)
+        )
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=distribution_job_service._heartbeat, args=(job_id, stop)
+        )
+        heartbeat.start()
+        time.sleep(0.1)
+        stop.set()
+        heartbeat.join()
+
+        # Without a renewed heartbeat the job would be failed as orphaned
+        assert _job(job_id).status == "running"
+
+
+class TestJobEndpoints:
+
+    def test_job_runs_on_worker_pool(self, client, fleet):
+        device_ids, rack_ids = fleet
+        try:
+            response = client.post(
+                "/api/v1/distribution/jobs",
+                json={"device_ids": device_ids, "rack_ids": rack_ids},
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            deadline = time.monotonic() + 60
+            while True:
+                job = client.get(f"/api/v1/distribution/jobs/{job_id}").json()
+                finished = job["status"] not in ("pending", "running")
+                if finished or time.monotonic() > deadline:
+                    break
+                time.sleep(0.1)
+        finally:
+            distribution_service.shutdown_executor()
+
+        assert job["status"] == "succeeded"
+        assert job["result"]["summary"]["placed_devices"] == len(device_ids)
+
+    def test_unknown_job(self, client):
+        response = client.get("/api/v1/distribution/jobs/999999")
+
+        assert response.status_code == 404
+
+    def test_request_without_devices_is_rejected(self, client):
+        response = client.post("/api/v1/distribution/jobs", json={"rack_ids": [1]})
+
+        assert response.status_code == 400
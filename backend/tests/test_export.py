@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+
+import pytest
+from app.models.device import Device
+from app.models.placement import PlacementCreate, RackPlacement
+from app.models.rack import Rack
+from app.services import export_service, placement_service
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+
+def _export(session: Session, table, export_format: str) -> tuple[list[bytes], str]:
+    chunks = list(export_service.iter_export(session, table, export_format))
+    return chunks, b"".join(chunks).decode()
+
+
+class TestExport:
+    def test_ndjson_devices(self, session: Session, sample_devices: list[Device]):
+        _, text = _export(session, Device, "ndjson")
+
+        records = {r["id"]: r for r in map(json.loads, text.splitlines())}
+        for device in sample_devices:
+            assert records[device.id] == {
+                "id": device.id,
+                "name": device.name,
+                "description": None,
+                "serial_number": device.serial_number,
+                "units_required": device.units_required,
+                "power_w": device.power_w,
+            }
+
+    def test_csv_racks_header_and_quoting(self, session: Session, sample_racks: list[Rack]):
+        sample_racks[0].description = 'Row 1, "cold" aisle\nnorth'
+        session.add(sample_racks[0])
+        session.commit()
+
+        _, text = _export(session, Rack, "csv")
+
+        reader = csv.DictReader(io.StringIO(text))
+        assert reader.fieldnames[0] == "id"
+        records = {int(r["id"]): r for r in reader}
+        assert records[sample_racks[0].id]["description"] == 'Row 1, "cold" aisle\nnorth'
+        assert records[sample_racks[1].id]["used_units"] == "0"
+
+    def test_streams_in_batches(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        for unit, device in enumerate(sample_devices):
+            placement_service.place_device(
+                session,
+                sample_racks[0].id,
+                PlacementCreate(device_id=device.id, start_unit=1 + unit * 4),
+            )
+        monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 2)
+
+        chunks, text = _export(session, RackPlacement, "ndjson")
+
+        records = [json.loads(line) for line in text.splitlines()]
+        assert len(chunks) == (len(records) + 1) // 2
+        assert [r["id"] for r in records] == sorted(r["id"] for r in records)
+        assert {r["device_id"] for r in records} >= {d.id for d in sample_devices}
+
+    def test_endpoint_headers(self, client: TestClient):
+        response = client.get("/api/v1/export/devices", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="devices.csv"' in response.headers["content-disposition"]
+        assert response.text.splitlines()[0].startswith("id,name,")
+
+        assert client.get("/api/v1/export/racks", params={"format": "xml"}).status_code == 422
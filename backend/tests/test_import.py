@@ -0,0 +1,91 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+import pytest
+from app.exceptions import BadRequestError
+from app.models.bulk import BulkImportResponse
+from app.models.device import Device, DeviceCreate
+from app.models.rack import Rack, RackCreate
+from app.services import import_service
+from sqlmodel import Session, col, select
+
+
+def _run_import(
+    session: Session, payload: bytes, content_type: str, table=Device, schema=DeviceCreate
+) -> BulkImportResponse:
+    async def chunks() -> AsyncIterator[bytes]:
+        # Small chunks so lines and quoted fields span chunk boundaries
+        for start in range(0, len(payload), 7):
+            yield payload[start : start + 7]
+
+    return asyncio.run(
+        import_service.import_stream(session, chunks(), content_type, table, schema)
+    )
+
+
+def _device_line(serial: str, **overrides) -> str:
+    data = {"name": "Server", "serial_number": serial, "units_required": 2, "power_w": 400}
+    data.update(overrides)
+    return json.dumps(data)
+
+
+class TestBulkImport:
+
+    def test_ndjson_import_with_row_errors(self, session: Session):
+        existing = Device(
+            name="Existing", serial_number=f"IMP-{uuid4()}", units_required=1, power_w=10
+        )
+        session.add(existing)
+        session.commit()
+
+        serials = [f"IMP-{uuid4()}" for _ in range(3)]
+        lines = [
+            _device_line(serials[0]),
+            "{not json",
+            _device_line(serials[1], units_required=0),
+            _device_line(existing.serial_number),
+            _device_line(serials[2]),
+            _device_line(serials[2]),
+        ]
+        result = _run_import(
+            session, "\n".join(lines).encode(), "application/x-ndjson"
+        )
+
+        assert result.created == 2
+        assert result.failed == 4
+        assert [e.row for e in result.errors] == [2, 3, 4, 6]
+        assert "units_required" in result.errors[1].detail
+        created = session.exec(
+            select(Device.serial_number).where(col(Device.serial_number).in_(serials))
+        ).all()
+        assert sorted(created) == sorted([serials[0], serials[2]])
+
+    def test_csv_import_with_quoted_newlines(self, session: Session):
+        serial = f"IMP-RACK-{uuid4()}"
+        payload = (
+            "name,description,serial_number,total_units,max_power_w\r\n"
+            f'Rack A,"Row 1\nCold aisle",{serial},42,8000\r\n'
+            f"Rack B,,IMP-RACK-{uuid4()},42,100\r\n"
+        ).encode()
+
+        result = _run_import(session, payload, "text/csv", Rack, RackCreate)
+
+        assert result.created == 1
+        assert [e.row for e in result.errors] == [2]
+        rack = session.exec(select(Rack).where(Rack.serial_number == serial)).one()
+        assert rack.description == "Row 1\nCold aisle"
+
+    def test_import_spans_batches(self, session: Session, monkeypatch):
+        monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 4)
+        lines = [_device_line(f"IMP-{uuid4()}") for _ in range(10)]
+
+        result = _run_import(session, "\n".join(lines).encode(), "application/x-ndjson")
+
+        assert result.created == 10
+        assert result.failed == 0
+
+    def test_unsupported_content_type(self, session: Session):
+        with pytest.raises(BadRequestError):
+            _run_import(session, b"{}", "application/json")
@@ -0,0 +1,92 @@
+from uuid import uuid4
+
+import pytest
+from app.exceptions import BadRequestError
+from app.models.device import Device
+from app.pagination import encode_cursor, next_cursor
+from app.services import device_service
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+
+def _walk(session: Session, order_by: str, limit: int = 3) -> list[Device]:
+    seen: list[Device] = []
+    cursor = None
+    while True:
+        page = device_service.get_devices(
+            session, limit=limit, cursor=cursor, order_by=order_by
+        )
+        seen.extend(page)
+        cursor = next_cursor(page, limit, order_by)
+        if cursor is None:
+            return seen
+
+
+class TestCursorPagination:
+    @pytest.fixture
+    def devices(self, session: Session) -> list[Device]:
+        devices = [
+            Device(
+                name=f"Server {i}",
+                serial_number=f"PAGE-{9 - i}-{uuid4()}",
+                units_required=1,
+                power_w=100,
+            )
+            for i in range(10)
+        ]
+        session.add_all(devices)
+        session.commit()
+        return devices
+
+    @pytest.mark.parametrize("order_by", ["id", "serial_number"])
+    def test_pages_cover_every_row_once_in_order(
+        self, session: Session, devices: list[Device], order_by: str
+    ):
+        seen = _walk(session, order_by)
+
+        keys = [getattr(device, order_by) for device in seen]
+        assert keys == sorted(keys)
+        assert len(keys) == len(set(keys))
+        ours = [device.id for device in seen if device.serial_number.startswith("PAGE-")]
+        if order_by == "id":
+            assert ours == [device.id for device in devices]
+        else:
+            assert ours == [device.id for device in reversed(devices)]
+
+    def test_inserts_behind_the_cursor_do_not_shift_pages(
+        self, session: Session, devices: list[Device]
+    ):
+        first = device_service.get_devices(session, limit=3, order_by="serial_number")
+        cursor = next_cursor(first, 3, "serial_number")
+        second = device_service.get_devices(
+            session, limit=3, cursor=cursor, order_by="serial_number"
+        )
+
+        session.add(
+            Device(name="Early", serial_number="AAA-FIRST", units_required=1, power_w=1)
+        )
+        session.commit()
+
+        assert device_service.get_devices(
+            session, limit=3, cursor=cursor, order_by="serial_number"
+        ) == second
+
+    def test_skip_still_works(self, session: Session, devices: list[Device]):
+        everything = device_service.get_devices(session, limit=1000)
+
+        assert device_service.get_devices(session, skip=2, limit=3) == everything[2:5]
+
+    def test_rejects_bad_cursors(self, session: Session):
+        with pytest.raises(BadRequestError):
+            device_service.get_devices(session, cursor="not-a-cursor")
+        with pytest.raises(BadRequestError):
+            device_service.get_devices(
+                session, cursor=encode_cursor("id", 5), order_by="serial_number"
+            )
+        with pytest.raises(BadRequestError):
+            device_service.get_devices(session, skip=5, cursor=encode_cursor("id", 5))
+
+    def test_api_rejects_bad_cursor(self, client: TestClient):
+        response = client.get("/api/v1/racks/", params={"cursor": "%%%"})
+
+        assert response.status_code == 400
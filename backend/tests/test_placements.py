@@ -0,0 +1,107 @@
+import pytest
+from app.exceptions import BusinessRuleError
+from app.models.device import Device
+from app.models.placement import PlacementCreate
+from app.models.rack import Rack
+from app.services import placement_service
+from sqlmodel import Session
+
+
+class TestPlacementOverlap:
+    def test_overlap_reports_shared_units(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack = sample_racks[0]
+        placement_service.place_device(
+            session, rack.id, PlacementCreate(device_id=sample_devices[0].id, start_unit=3)
+        )
+
+        with pytest.raises(BusinessRuleError) as exc_info:
+            placement_service.place_device(
+                session,
+                rack.id,
+                PlacementCreate(device_id=sample_devices[1].id, start_unit=5),
+            )
+
+        assert "Units [5, 6] are already occupied" in exc_info.value.detail
+
+    def test_adjacent_spans_do_not_overlap(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack = sample_racks[0]
+        for device, start_unit in [(sample_devices[0], 3), (sample_devices[2], 1)]:
+            placement_service.place_device(
+                session, rack.id, PlacementCreate(device_id=device.id, start_unit=start_unit)
+            )
+        placement_service.place_device(
+            session, rack.id, PlacementCreate(device_id=sample_devices[1].id, start_unit=7)
+        )
+
+        assert placement_service.get_overlapping_placements(session, rack.id, 11, 42) == []
+        spans = {
+            (p.start_unit, p.end_unit)
+            for p in placement_service.get_overlapping_placements(session, rack.id, 2, 7)
+        }
+        assert spans == {(1, 2), (3, 6), (7, 10)}
+
+    def test_overlap_lookup_uses_span_index(self, session: Session):
+        if session.get_bind().dialect.name != "sqlite":
+            pytest.skip("checks the SQLite query plan")
+        plan = session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM rack_placements "
+            "WHERE rack_id = 1 AND start_unit <= 10 AND end_unit >= 5"
+        )
+        assert any("ix_rack_placements_rack_span" in row[-1] for row in plan)
+
+
+class TestFreeSlots:
+    def _setup(
+        self, session: Session, racks: list[Rack], devices: list[Device]
+    ) -> tuple[Rack, Rack]:
+        rack_a, rack_b = racks
+        for device, start_unit in [(devices[0], 1), (devices[2], 7)]:
+            placement_service.place_device(
+                session, rack_a.id, PlacementCreate(device_id=device.id, start_unit=start_unit)
+            )
+        return rack_a, rack_b
+
+    def test_best_fit_first(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack_a, rack_b = self._setup(session, sample_racks, sample_devices)
+
+        slots = [
+            (slot.rack_id, slot.start_unit, slot.end_unit, slot.free_run_units)
+            for slot in placement_service.find_free_slots(session, units=2, limit=1000)
+            if slot.rack_id in (rack_a.id, rack_b.id)
+        ]
+
+        assert slots == [
+            (rack_a.id, 5, 6, 2),
+            (rack_a.id, 9, 10, 34),
+            (rack_b.id, 1, 2, 42),
+        ]
+
+    def test_power_and_units_filter(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack_a, rack_b = self._setup(session, sample_racks, sample_devices)
+
+        rack_ids = {
+            slot.rack_id
+            for slot in placement_service.find_free_slots(
+                session, units=2, power_w=4000, limit=1000
+            )
+        }
+        assert rack_a.id not in rack_ids
+        assert rack_b.id in rack_ids
+
+        slots = placement_service.find_free_slots(session, units=35, rack_id=rack_a.id)
+        assert slots == []
+
+    def test_single_rack_endpoint(self, client, session: Session):
+        response = client.get("/api/v1/racks/999999/free-slots", params={"units": 1})
+        assert response.status_code == 404
+
+        response = client.get("/api/v1/racks/free-slots", params={"units": 0})
+        assert response.status_code == 422
@@ -0,0 +1,168 @@
+from uuid import uuid4
+
+import pytest
+from app.exceptions import BusinessRuleError
+from app.models.device import Device, DeviceUpdate
+from app.models.placement import PlacementCreate
+from app.models.rack import Rack
+from app.services import placement_service, rack_service
+from sqlalchemy import update
+from sqlmodel import Session
+
+
+def _place(session: Session, rack: Rack, device: Device, start_unit: int) -> None:
+    placement_service.place_device(
+        session, rack.id, PlacementCreate(device_id=device.id, start_unit=start_unit)
+    )
+
+
+class TestRackStats:
+    def test_stats_are_aggregated(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+    ):
+        rack = sample_racks[0]
+        _place(session, rack, sample_devices[0], 1)
+        _place(session, rack, sample_devices[3], 10)
+
+        stats = rack_service.calculate_rack_stats(rack)
+
+        assert stats == {
+            "current_power_w": 950,
+            "used_units": 5,
+            "available_units": 37,
+            "power_utilization_percent": 19.0,
+        }
+
+    def test_empty_rack(self, session: Session, sample_racks: list[Rack]):
+        stats = rack_service.calculate_rack_stats(sample_racks[0])
+
+        assert stats["current_power_w"] == 0
+        assert stats["used_units"] == 0
+        assert stats["available_units"] == 42
+
+    def test_list_with_stats_uses_one_query(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+        count_statements,
+    ):
+        _place(session, sample_racks[0], sample_devices[0], 1)
+        _place(session, sample_racks[0], sample_devices[1], 5)
+        _place(session, sample_racks[1], sample_devices[2], 1)
+        rack_ids = [rack.id for rack in sample_racks]
+        extra = Rack(
+            name="Rack C", serial_number=f"RACK-{uuid4()}", total_units=42, max_power_w=5000
+        )
+        session.add(extra)
+        session.commit()
+        rack_ids.append(extra.id)
+
+        with count_statements() as statements:
+            racks = rack_service.get_racks_with_stats(session, limit=100_000)
+
+        assert len(statements) == 1
+        by_id = {rack["id"]: rack for rack in racks}
+        assert [by_id[rack_id]["current_power_w"] for rack_id in rack_ids] == [1550, 400, 0]
+        assert [by_id[rack_id]["used_units"] for rack_id in rack_ids] == [8, 2, 0]
+        assert by_id[rack_ids[0]]["power_utilization_percent"] == 31.0
+        assert [rack["id"] for rack in racks] == sorted(by_id)
+
+
+class TestRackUsageCounters:
+    def _usage(self, session: Session, rack: Rack) -> tuple[int, int]:
+        session.refresh(rack)
+        return rack.used_units, rack.current_power_w
+
+    def test_counters_follow_placement_writes(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+    ):
+        from app.services import device_service
+
+        rack = sample_racks[0]
+        server, _, small, switch, _ = sample_devices
+        _place(session, rack, server, 1)
+        _place(session, rack, small, 10)
+        _place(session, rack, switch, 20)
+        assert self._usage(session, rack) == (7, 1350)
+
+        placement_service.remove_device_from_rack(session, rack.id, small.id)
+        assert self._usage(session, rack) == (5, 950)
+
+        device_service.update_device(session, server.id, DeviceUpdate(power_w=1000))
+        assert self._usage(session, rack) == (5, 1150)
+
+        device_service.delete_device(session, switch.id)
+        assert self._usage(session, rack) == (4, 1000)
+        assert rack_service.find_rack_usage_drift(session) == []
+
+    def test_power_limit_uses_counters(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack = sample_racks[0]
+        session.execute(
+            update(Rack).where(Rack.id == rack.id).values(current_power_w=4900)
+        )
+        session.commit()
+
+        with pytest.raises(BusinessRuleError) as exc_info:
+            _place(session, rack, sample_devices[0], 1)
+
+        assert "Current: 4900W" in exc_info.value.detail
+
+    def test_reconcile_repairs_drift(
+        self, session: Session, sample_racks: list[Rack], sample_devices: list[Device]
+    ):
+        rack, empty_rack = sample_racks
+        _place(session, rack, sample_devices[0], 1)
+        session.execute(
+            update(Rack)
+            .where(Rack.id.in_([rack.id, empty_rack.id]))
+            .values(used_units=1, current_power_w=1)
+        )
+        session.commit()
+
+        drift = {
+            row["rack_id"]: row for row in rack_service.reconcile_rack_usage(session)
+        }
+
+        assert drift[rack.id]["expected_used_units"] == 4
+        assert drift[rack.id]["expected_current_power_w"] == 800
+        assert drift[empty_rack.id]["expected_used_units"] == 0
+        assert self._usage(session, rack) == (4, 800)
+        assert self._usage(session, empty_rack) == (0, 0)
+        assert rack_service.find_rack_usage_drift(session) == []
+
+    def test_reconcile_keeps_placement_committed_during_repair(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        rack = sample_racks[0]
+        _place(session, rack, sample_devices[0], 1)
+        session.execute(
+            update(Rack).where(Rack.id == rack.id).values(used_units=1, current_power_w=1)
+        )
+        session.commit()
+
+        lock_racks = rack_service.lock_racks
+
+        def place_then_lock(db: Session, rack_ids: list[int]):
+            # Another writer commits after the drift was read, before the lock
+            monkeypatch.setattr(rack_service, "lock_racks", lock_racks)
+            _place(session, rack, sample_devices[1], 10)
+            return lock_racks(db, rack_ids)
+
+        monkeypatch.setattr(rack_service, "lock_racks", place_then_lock)
+        rack_service.reconcile_rack_usage(session)
+
+        assert self._usage(session, rack) == (8, 1550)
+        assert rack_service.find_rack_usage_drift(session) == []
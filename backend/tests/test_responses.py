@@ -0,0 +1,53 @@
+import json
+
+from app.models.device import Device, DeviceRead
+from app.models.placement import PlacementCreate, PlacementReadWithDevice
+from app.models.rack import Rack, RackReadWithPower
+from app.responses import json_response
+from app.services import device_service, placement_service, rack_service
+from pydantic import TypeAdapter
+from sqlmodel import Session
+
+
+def _body(items) -> list[dict]:
+    return json.loads(json_response(items).body)
+
+
+class TestJsonResponse:
+    def test_device_rows_match_response_model(
+        self, session: Session, sample_devices: list[Device]
+    ):
+        rows = device_service.get_devices(
+            session, limit=1000, columns=device_service.DEVICE_READ_COLUMNS
+        )
+        devices = device_service.get_devices(session, limit=1000)
+
+        expected = TypeAdapter(list[DeviceRead]).dump_python(
+            [DeviceRead.model_validate(d) for d in devices], mode="json"
+        )
+        assert _body([row._asdict() for row in rows]) == expected
+
+    def test_rack_stats_and_rack_devices_match_response_models(
+        self,
+        session: Session,
+        sample_racks: list[Rack],
+        sample_devices: list[Device],
+    ):
+        rack = sample_racks[0]
+        placement_service.place_device(
+            session, rack.id, PlacementCreate(device_id=sample_devices[0].id, start_unit=1)
+        )
+
+        racks = _body(rack_service.get_racks_with_stats(session, limit=1000))
+        assert racks == [
+            RackReadWithPower.model_validate(r).model_dump(mode="json") for r in racks
+        ]
+        by_id = {r["id"]: r for r in racks}
+        assert by_id[rack.id] == rack_service.rack_with_stats(rack).model_dump(mode="json")
+
+        placements = _body(placement_service.get_rack_devices(session, rack.id))
+        assert placements == [
+            PlacementReadWithDevice.model_validate(p).model_dump(mode="json")
+            for p in placements
+        ]
+        assert placements[0]["device_power_w"] == sample_devices[0].power_w